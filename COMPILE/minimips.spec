@@ -1,9 +1,16 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# O executável é gerado direto da interface (MINIMIPS_SIMULATOR/minimips.py), que importa o motor da pasta LOGICA
+# (back_end, montador, imagem_binaria). Não existe mais uma cópia do simulador nesta pasta
+# Uso, de dentro da pasta COMPILE: pyinstaller minimips.spec
+
+import os
+
+RAIZ = os.path.join(SPECPATH, '..')
 
 a = Analysis(
-    ['minimips.py'],
-    pathex=[],
+    [os.path.join(RAIZ, 'MINIMIPS_SIMULATOR', 'minimips.py')],
+    pathex=[os.path.join(RAIZ, 'LOGICA')],
     binaries=[],
     datas=[],
     hiddenimports=[],
@@ -35,5 +42,5 @@ exe = EXE(
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-    icon=['icon.ico'],
+    icon=[os.path.join(SPECPATH, 'icon.ico')],
 )
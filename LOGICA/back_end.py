@@ -1,12 +1,321 @@
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from types import MappingProxyType
+
+import cache_dados
+import imagem_binaria
+import montador
+import perfil
+import pipeline
+import rastreio
+
 #               (VÁRIAVEIS PARA A SIMULAR OS REGISTRADORES E INSTRUÇÕES) 
 
-# O vetor memória simula a pilha, podendo ser carregado em até 256 valores 
-memoria = [0] * 256  
+# Este módulo é o motor do simulador (estado da máquina, carregamento e execução), junto com o montador.py, o
+# imagem_binaria.py, o rastreio.py, o perfil.py, o pipeline.py e o cache_dados.py. A interface (MINIMIPS_SIMULATOR/minimips.py) só o embrulha: nada aqui importa o tkinter,
+# então a linha de comando e os processos do lote.py sobem sem carregar o Tk
+# argparse (linha de comando) só é importado quando usado, para o import ser rápido
+
+# O vetor memória simula a pilha, por padrão com 256 valores (ver definir_tamanho_memoria)
+# É um array de inteiros de 64 bits com sinal ('q'): 8 bytes por célula em um bloco contínuo,
+# em vez de uma lista de objetos int. Dá para ter megabytes de dados e pilha sem estourar a RAM
+TAMANHO_MEMORIA_PADRAO = 256
+memoria = array('q', bytes(8 * TAMANHO_MEMORIA_PADRAO))
+
+
+# --- MEMÓRIA PAGINADA ---
+# Programas MIPS de verdade usam endereços altos: a .data começa em 0x10010000 e a pilha perto de 0x7fffeffc
+# Um array com 2**32 células ocuparia 32 GB, então a memória é dividida em páginas de TAMANHO_PAGINA células
+# Uma página só é alocada na primeira ESCRITA; ler uma página que nunca foi escrita devolve 0 sem alocar nada
+# A última página acessada fica guardada: acessos seguidos na mesma página (pilha, vetores) não passam pelo dicionário
+class MemoriaPaginada:
+    """Memória esparsa com 2**bits_endereco células, usada como o array (memoria[endereco], len(memoria))."""
+
+    BITS_PAGINA = 12
+    TAMANHO_PAGINA = 1 << BITS_PAGINA # 4096 células por página
+    MASCARA_PAGINA = TAMANHO_PAGINA - 1
+
+    def __init__(self, bits_endereco=32):
+        self.tamanho = 1 << bits_endereco
+        self.paginas = {} # número da página -> TAMANHO_PAGINA células (ver _nova_pagina)
+        # Páginas que ainda apontam para um arquivo mapeado (imagem .mbin, ver mapear): somente leitura,
+        # copiadas para uma página própria na primeira escrita. Nunca viram a "última página" do caminho rápido
+        self.mapeadas = set()
+        self.imagens = [] # Imagens donas das páginas mapeadas, fechadas quando nenhuma página aponta mais para elas
+        self._numero_ultima = -1
+        self._ultima = None
+
+    def __len__(self):
+        return self.tamanho
+
+    def __getitem__(self, endereco):
+        if isinstance(endereco, slice):
+            return self._fatia([self[i] for i in range(*endereco.indices(self.tamanho))])
+        numero = endereco >> self.BITS_PAGINA
+        # Caminho rápido: mesma página do último acesso
+        if numero == self._numero_ultima:
+            return self._ultima[endereco & self.MASCARA_PAGINA]
+        pagina = self.paginas.get(numero)
+        if pagina is None:
+            return 0
+        if numero not in self.mapeadas:
+            self._numero_ultima, self._ultima = numero, pagina
+        return pagina[endereco & self.MASCARA_PAGINA]
+
+    def __setitem__(self, endereco, valor):
+        if isinstance(endereco, slice):
+            for i, v in zip(range(*endereco.indices(self.tamanho)), valor):
+                self[i] = v
+            return
+        numero = endereco >> self.BITS_PAGINA
+        if numero != self._numero_ultima:
+            pagina = self.paginas.get(numero)
+            if pagina is None:
+                # Primeira escrita nesta página: aloca já zerada
+                pagina = self.paginas[numero] = self._nova_pagina()
+            elif numero in self.mapeadas:
+                pagina = self._copiar_mapeada(numero)
+            self._numero_ultima, self._ultima = numero, pagina
+        self._ultima[endereco & self.MASCARA_PAGINA] = valor
+
+    def _pagina(self, endereco, criar):
+        """Página do endereço (None se nunca foi escrita e criar=False), pelo caminho rápido quando possível."""
+        numero = endereco >> self.BITS_PAGINA
+        if numero == self._numero_ultima:
+            return self._ultima
+        pagina = self.paginas.get(numero)
+        if pagina is None:
+            if not criar:
+                return None
+            pagina = self.paginas[numero] = self._nova_pagina()
+        elif numero in self.mapeadas:
+            if not criar:
+                return pagina
+            pagina = self._copiar_mapeada(numero)
+        self._numero_ultima, self._ultima = numero, pagina
+        return pagina
+
+    def string(self, endereco):
+        """Valores do endereço até o primeiro 0 (sem ele), com uma busca por página."""
+        resultado = self._fatia([])
+        while endereco < self.tamanho:
+            pagina = self._pagina(endereco, False)
+            if pagina is None:
+                break # Página nunca escrita: só zeros, a string acaba aqui
+            inicio = endereco & self.MASCARA_PAGINA
+            if isinstance(pagina, memoryview):
+                pagina = self._fatia(pagina) # Página mapeada: o memoryview não tem index()
+            try:
+                fim = pagina.index(0, inicio)
+            except ValueError:
+                # Sem 0 nesta página: a string continua na próxima
+                resultado += pagina[inicio:]
+                endereco += self.TAMANHO_PAGINA - inicio
+                continue
+            resultado += pagina[inicio:fim]
+            break
+        return resultado
+
+    def _nova_pagina(self):
+        return array('q', bytes(8 * self.TAMANHO_PAGINA))
+
+    def _fatia(self, valores):
+        return array('q', valores)
+
+    def _copiar_mapeada(self, numero):
+        """Primeira escrita em uma página mapeada: troca o memoryview por uma cópia própria."""
+        pagina = self._nova_pagina()
+        memoryview(pagina)[:] = self.paginas[numero] # Uma cópia direta do buffer
+        self.paginas[numero] = pagina
+        self.mapeadas.discard(numero)
+        self._soltar_imagens()
+        return pagina
+
+    def _soltar_imagens(self):
+        """Fecha as imagens .mbin quando nenhuma página aponta mais para elas."""
+        if self.mapeadas:
+            return
+        while self.imagens:
+            try:
+                self.imagens[-1].close()
+            except BufferError:
+                return # Ainda há alguém lendo um pedaço do arquivo: tenta de novo na próxima vez
+            self.imagens.pop()
+
+    def mapear(self, endereco, dados, imagem=None):
+        """
+        Usa 'dados' (memoryview de um arquivo mapeado) como conteúdo a partir do endereço, sem copiar.
+
+        As páginas inteiras apontam direto para o memoryview; só as pontas que ocupam um pedaço de página são copiadas.
+        Se alguma página ficou apontando para os dados, a 'imagem' (dona do arquivo) passa a ser fechada pela memória
+        e o retorno é True; senão nada ficou mapeado e quem chamou continua responsável por ela.
+        """
+        fim = endereco + len(dados)
+        primeira = (endereco + self.MASCARA_PAGINA) >> self.BITS_PAGINA # Primeira página inteira
+        ultima = fim >> self.BITS_PAGINA                               # Página depois da última inteira
+        if primeira >= ultima:
+            self[endereco:fim] = dados
+            return False
+        self[endereco:primeira << self.BITS_PAGINA] = dados[:(primeira << self.BITS_PAGINA) - endereco]
+        for numero in range(primeira, ultima):
+            inicio = (numero << self.BITS_PAGINA) - endereco
+            self.paginas[numero] = dados[inicio:inicio + self.TAMANHO_PAGINA]
+            self.mapeadas.add(numero)
+        self[ultima << self.BITS_PAGINA:fim] = dados[(ultima << self.BITS_PAGINA) - endereco:]
+        self._numero_ultima, self._ultima = -1, None
+        if imagem is not None:
+            self.imagens.append(imagem)
+        return True
+
+    def zerar(self):
+        """Descarta todas as páginas (volta a não ocupar memória nenhuma)."""
+        self.paginas.clear()
+        self.mapeadas.clear()
+        self._numero_ultima, self._ultima = -1, None
+        self._soltar_imagens()
+
+    def hash(self):
+        """SHA-256 das páginas com algum valor, cada uma precedida pelo seu número."""
+        h = hashlib.sha256()
+        for numero in sorted(self.paginas):
+            pagina = self.paginas[numero]
+            if any(pagina):
+                h.update(numero.to_bytes(8, "little"))
+                h.update(pagina)
+        return h.hexdigest()
+
+    def celulas_nao_zero(self):
+        """Gera (endereco, valor) das células diferentes de zero, em ordem de endereço."""
+        for numero in sorted(self.paginas):
+            base = numero << self.BITS_PAGINA
+            for deslocamento, valor in enumerate(self.paginas[numero]):
+                if valor != 0:
+                    yield base + deslocamento, valor
+
+
+# --- MEMÓRIA ENDEREÇADA A BYTE ---
+# No modo "byte" cada endereço é um byte, como no MIPS real: lw 4($sp) lê os 4 bytes a partir de $sp + 4
+# Os dados ficam em um bytearray e as palavras / meias palavras são lidas e escritas com struct.Struct
+# pré-compilados (unpack_from / pack_into direto no buffer, sem copiar nada)
+# A ordem dos bytes das palavras (little ou big endian) é escolhida ao criar a memória
+# O alinhamento (lw/sw em múltiplos de 4, lh/sh em múltiplos de 2) é conferido pelos handlers
+
+# Bits que cabem em cada tamanho de acesso: o valor escrito é truncado como num barramento de 32 bits
+MASCARAS_ACESSO = {1: 0xFF, 2: 0xFFFF, 4: 0xFFFFFFFF}
+
+def formatos_acesso(ordem):
+    """Struct (com sinal, sem sinal) de cada tamanho de acesso para a ordem de bytes pedida."""
+    prefixo = "<" if ordem == "little" else ">"
+    return {
+        1: (struct.Struct("b"), struct.Struct("B")),
+        2: (struct.Struct(prefixo + "h"), struct.Struct(prefixo + "H")),
+        4: (struct.Struct(prefixo + "i"), struct.Struct(prefixo + "I")),
+    }
+
+class MemoriaBytes:
+    """Memória contínua endereçada a byte (bytearray), com leituras e escritas de 1, 2 e 4 bytes."""
+
+    def __init__(self, tamanho, ordem="little"):
+        self.dados = bytearray(tamanho)
+        self.ordem = ordem
+        self.formatos = formatos_acesso(ordem)
+
+    def __len__(self):
+        return len(self.dados)
+
+    def __getitem__(self, endereco):
+        return self.dados[endereco]
+
+    def __setitem__(self, endereco, valor):
+        self.dados[endereco] = valor
+
+    def ler(self, endereco, tamanho, sinal=True):
+        """Lê 1, 2 ou 4 bytes a partir do endereço, com ou sem extensão de sinal."""
+        return self.formatos[tamanho][0 if sinal else 1].unpack_from(self.dados, endereco)[0]
+
+    def escrever(self, endereco, tamanho, valor):
+        """Escreve os 'tamanho' bytes menos significativos do valor a partir do endereço."""
+        self.formatos[tamanho][1].pack_into(self.dados, endereco, valor & MASCARAS_ACESSO[tamanho])
+
+    def string(self, endereco):
+        """Bytes do endereço até o NUL (sem ele), achado com uma única busca no buffer."""
+        fim = self.dados.find(0, endereco)
+        if fim < 0:
+            fim = len(self.dados)
+        return bytes(memoryview(self.dados)[endereco:fim])
+
+    def redimensionar(self, tamanho):
+        """Muda o tamanho no mesmo bytearray."""
+        if tamanho < len(self.dados):
+            del self.dados[tamanho:]
+        else:
+            self.dados.extend(bytes(tamanho - len(self.dados)))
+
+    def zerar(self):
+        # Atribuição do mesmo tamanho: copia por cima, sem realocar o bytearray
+        self.dados[:] = bytes(len(self.dados))
+
+    def hash(self):
+        return hashlib.sha256(self.dados).hexdigest()
+
+    def celulas_nao_zero(self):
+        return ((i, v) for i, v in enumerate(self.dados) if v != 0)
+
+class MemoriaPaginadaBytes(MemoriaPaginada):
+    """Memória esparsa de 2**32 bytes, em páginas de 4096 bytes alocadas na primeira escrita."""
+
+    def __init__(self, ordem="little", bits_endereco=32):
+        super().__init__(bits_endereco)
+        self.ordem = ordem
+        self.formatos = formatos_acesso(ordem)
+
+    def _nova_pagina(self):
+        return bytearray(self.TAMANHO_PAGINA)
+
+    def _fatia(self, valores):
+        return bytearray(valores)
+
+    # Acessos alinhados nunca atravessam o limite de uma página (4096 é múltiplo de 4)
+    def ler(self, endereco, tamanho, sinal=True):
+        pagina = self._pagina(endereco, False)
+        if pagina is None:
+            return 0
+        return self.formatos[tamanho][0 if sinal else 1].unpack_from(pagina, endereco & self.MASCARA_PAGINA)[0]
+
+    def escrever(self, endereco, tamanho, valor):
+        pagina = self._pagina(endereco, True)
+        self.formatos[tamanho][1].pack_into(pagina, endereco & self.MASCARA_PAGINA, valor & MASCARAS_ACESSO[tamanho])
+
+
+# --- LAYOUTS DE MEMÓRIA ---
+# "compacto": o layout original, .data no endereço 0 e $sp na última célula do array (tamanho de --memoria)
+# "mars"    : layout padrão do MARS, .data em 0x10010000 e $sp em 0x7fffeffc (memória paginada de 32 bits)
+# "spim"    : layout do SPIM, .data em 0x10000000 e $sp em 0x7ffffffc (memória paginada de 32 bits)
+# Valor: (início da .data, valor inicial do $sp) ou None para o compacto
+LAYOUTS_MEMORIA = {
+    "compacto": None,
+    "mars": (0x10010000, 0x7FFFEFFC),
+    "spim": (0x10000000, 0x7FFFFFFC),
+}
+layout_memoria = "compacto"
+# "palavra": cada endereço é uma célula inteira (o modelo original); "byte": endereços de byte (MemoriaBytes)
+MODOS_ENDERECAMENTO = ("palavra", "byte")
+modo_enderecamento = "palavra"
+ordem_bytes = "little" # Ordem dos bytes das palavras no modo byte ("little" como o MARS, ou "big")
+base_dados = 0 # Endereço onde o read_arq começa a escrever a seção .data
+fim_dados = 0  # Primeiro endereço livre depois da .data do último arquivo lido
 
 # Vetor de registradores 
-# Fizemos uma simplificação, diminuindo a quantidade de registradores para apenas 10 
+# Fizemos uma simplificação, diminuindo a quantidade de registradores para apenas 11 
 # Aqui será salvo cada valor para os registradores, com excessão de sp 
-vetor_reg = [0] * 10 # $zero, $v0, $a0, $t0-$t3, $sp, $HI, $LO 
+vetor_reg = [0] * 11 # $zero, $v0, $a0, $t0-$t3, $sp, $HI, $LO, $ra 
 
 
 # O vetor de índice 7 representa o $sp 
@@ -14,6 +323,7 @@ vetor_reg = [0] * 10 # $zero, $v0, $a0, $t0-$t3, $sp, $HI, $LO
 # Nada mais é que um índice que indica uma posição no vetor memória 
 # Começa apontando para o último índice e precisa ser "subtraido" para abrir espaço na pilha 
 vetor_reg[7] = len(memoria) - 1 # "Len(memoria)" retorna o tamanho do vetor memória em python 
+# (nos layouts "mars" e "spim" o $sp começa no topo da pilha do layout, ver topo_pilha())
 
 # Um dicionário para ler os registradores que o .s nos enviar 
 # Cada instrução retorna um número que a posição do registrador no vetor de registradores 
@@ -28,7 +338,8 @@ reg_dic = {
     "$t3": 6, 
     "$sp": 7, 
     "$HI": 8, # Usado em mult quando ultrapassar os 32bits para armazenar seus 16 bist mais sign 
-    "$LO": 9  # Usado em mult quando ultrapassar os 32bits para armazenar seus 16 bits menos sign 
+    "$LO": 9, # Usado em mult quando ultrapassar os 32bits para armazenar seus 16 bits menos sign 
+    "$ra": 10 # Endereço de retorno: o jal guarda aqui o PC da instrução seguinte, o jr $ra volta para ele 
 } 
 
 # LEMBRAR: Não esquecer de pesquisar como funcionam os regs $HI e $LO 
@@ -56,15 +367,356 @@ inst_dic = {
     "slt":   [0, 0, 1, 0, 0], 
     "slti":  [1, 0, 1, 0, 0],
     "la":    [0, 0, 1, 0, 0],
-    "syscall": [0, 0, 0, 0, 0]
-} 
+    "syscall": [0, 0, 0, 0, 0],
+    # Cargas e armazenamentos de byte / meia palavra (fazem mais sentido no modo de endereçamento "byte")
+    "lb":    [1, 1, 1, 1, 0],
+    "lbu":   [1, 1, 1, 1, 0],
+    "lh":    [1, 1, 1, 1, 0],
+    "lhu":   [1, 1, 1, 1, 0],
+    "sb":    [1, 0, 0, 0, 1],
+    "sh":    [1, 0, 0, 0, 1],
+    # Desvios e saltos: o alvo é um rótulo da .text, resolvido para o PC na montagem
+    "beq":   [0, 0, 0, 0, 0],
+    "bne":   [0, 0, 0, 0, 0],
+    "j":     [0, 0, 0, 0, 0],
+    "jal":   [0, 0, 1, 0, 0],  # Escreve o $ra
+    "jr":    [0, 0, 0, 0, 0]
+}
+
+# Instruções de memória: quantos bytes cada uma acessa e se a carga estende o sinal
+CARGAS = {"lw": (4, True), "lh": (2, True), "lhu": (2, False), "lb": (1, True), "lbu": (1, False)}
+ARMAZENAMENTOS = {"sw": 4, "sh": 2, "sb": 1}
 
-# --- VARIÁVEIS DE ESTADO DO SIMULADOR --- 
-file_path = "TESTES_ASSEMBLY\\teste-1.s" # Path do arquivo a ser lido
+# --- CÓDIGOS DAS INSTRUÇÕES PRÉ-DECODIFICADAS ---
+# Cada instrução do inst_dic recebe um código inteiro (sua posição no dicionário)
+# O programa pré-decodificado guarda esse código no lugar da string do opcode
+op_cod = {nome: cod for cod, nome in enumerate(inst_dic)}
+
+OP_ADD, OP_ADDI, OP_SUB, OP_MULT = op_cod["add"], op_cod["addi"], op_cod["sub"], op_cod["mult"]
+OP_AND, OP_OR, OP_SLL, OP_LW = op_cod["and"], op_cod["or"], op_cod["sll"], op_cod["lw"]
+OP_SW, OP_LUI, OP_SLT, OP_SLTI = op_cod["sw"], op_cod["lui"], op_cod["slt"], op_cod["slti"]
+OP_LA, OP_SYSCALL = op_cod["la"], op_cod["syscall"]
+OP_LB, OP_LBU, OP_LH, OP_LHU = op_cod["lb"], op_cod["lbu"], op_cod["lh"], op_cod["lhu"]
+OP_SB, OP_SH = op_cod["sb"], op_cod["sh"]
+OP_BEQ, OP_BNE, OP_J, OP_JAL, OP_JR = op_cod["beq"], op_cod["bne"], op_cod["j"], op_cod["jal"], op_cod["jr"]
+# lb/lbu/lh/lhu/sb/sh: sempre executadas pelos handlers da tabela de despacho
+OPS_MEMORIA_PARCIAL = {OP_LB, OP_LBU, OP_LH, OP_LHU, OP_SB, OP_SH}
+
+# Códigos extras que não existem no inst_dic:
+# OP_SW_IMEDIATO = 'sw' que guarda um número direto na memória (ex: sw 100, 4($sp))
+# OP_ERRO = linha que não pôde ser decodificada, o registro carrega a mensagem de erro
+OP_SW_IMEDIATO = len(inst_dic)
+OP_ERRO = len(inst_dic) + 1
+
+# --- VARIÁVEIS DE ESTADO DO SIMULADOR ---
+# Arquivo usado quando a linha de comando não recebe nenhum .s
+file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "TESTES_ASSEMBLY", "teste-1.s")
 PC = 0 # Program Counter 
+encerrado_por_syscall = False # True depois de um syscall 10 (o PC foi para o fim do programa)
 EPC = 0 # EPC  
 CAUSE = 0 # CAUSE 
 
+# --- SAÍDAS DO SIMULADOR ---
+# Quatro tipos de mensagem:
+#   escrever_saida  -> saída do programa simulado (syscall 1 e 4)
+#   log             -> mensagens do simulador (ex: fim da execução), somem no modo silencioso
+#   log_resultado   -> resultados pedidos na linha de comando (ex: --pipeline), no modo silencioso vão para o stderr
+#   registrar_erro  -> erros, sempre guardados na lista 'erros'; no modo silencioso vão para o stderr
+# No modo silencioso o stdout recebe apenas a saída das syscalls, sem o prefixo "Saída do Sistema:"
+#
+# A saída das syscalls não vai direto para o stdout: ela se acumula no buffer_saida e é escrita de uma vez
+# quando passa de LIMITE_BUFFER_SAIDA caracteres, no fim do executar() ou antes de qualquer log / erro
+# (assim a ordem das mensagens no terminal continua a mesma). Um programa com milhares de syscalls de
+# impressão faz poucas chamadas de write em vez de uma por syscall
+#
+# Com uma função em 'destino_saida' (a interface gráfica usa o seu log_saida) todas vão direto para ela,
+# uma mensagem por chamada e sem o prefixo, em vez de irem para o stdout / stderr
+silencioso = False
+destino_saida = None
+erros = []
+buffer_saida = []
+tamanho_buffer_saida = 0
+LIMITE_BUFFER_SAIDA = 64 * 1024
+
+def escrever_saida(texto):
+    """Guarda a saída de uma syscall do programa simulado no buffer_saida."""
+    global tamanho_buffer_saida
+    if destino_saida is not None:
+        destino_saida(texto)
+        return
+    linha = f"{texto}\n" if silencioso else f"Saída do Sistema: {texto}\n"
+    buffer_saida.append(linha)
+    tamanho_buffer_saida += len(linha)
+    if tamanho_buffer_saida >= LIMITE_BUFFER_SAIDA:
+        descarregar_saida()
+
+def descarregar_saida():
+    """Escreve no stdout tudo o que estiver no buffer_saida, numa única chamada."""
+    global tamanho_buffer_saida
+    if buffer_saida:
+        sys.stdout.write("".join(buffer_saida))
+        buffer_saida.clear()
+        tamanho_buffer_saida = 0
+        sys.stdout.flush()
+
+def log(mensagem):
+    """Mensagem informativa do simulador."""
+    if destino_saida is not None:
+        destino_saida(mensagem)
+    elif not silencioso:
+        descarregar_saida()
+        print(mensagem)
+
+def log_resultado(mensagem):
+    """Resultado que o usuário pediu (resumo do pipeline, das caches): nunca some, nem no modo silencioso."""
+    if destino_saida is not None:
+        destino_saida(mensagem)
+        return
+    descarregar_saida()
+    print(mensagem, file=sys.stderr if silencioso else sys.stdout)
+
+def registrar_erro(mensagem):
+    """Guarda o erro na lista 'erros' e mostra para o usuário."""
+    erros.append(mensagem)
+    if destino_saida is not None:
+        destino_saida(mensagem)
+        return
+    descarregar_saida()
+    if silencioso:
+        print(mensagem, file=sys.stderr)
+    else:
+        print(mensagem)
+
+def hash_memoria():
+    """Hash SHA-256 do conteúdo atual da memória (para comparar execuções sem guardar a memória inteira)."""
+    if isinstance(memoria, array):
+        return hashlib.sha256(memoria.tobytes()).hexdigest()
+    return memoria.hash()
+
+def celulas_nao_zero():
+    """Gera (endereco, valor) das células (ou bytes, no modo byte) da memória diferentes de zero."""
+    if isinstance(memoria, array):
+        return ((i, v) for i, v in enumerate(memoria) if v != 0)
+    return memoria.celulas_nao_zero()
+
+def topo_pilha():
+    """Valor inicial do $sp no layout de memória atual."""
+    layout = LAYOUTS_MEMORIA[layout_memoria]
+    if layout is not None:
+        return layout[1]
+    # No modo byte o $sp aponta para a última PALAVRA alinhada
+    return (len(memoria) - 4) & ~3 if modo_enderecamento == "byte" else len(memoria) - 1
+
+def palavra(valor):
+    """Reduz um inteiro Python ao intervalo de uma célula da memória (64 bits com sinal), como um registrador real faria."""
+    return ((valor + (1 << 63)) & 0xFFFFFFFFFFFFFFFF) - (1 << 63)
+
+def zerar_memoria():
+    """Zera a memória inteira de uma vez, escrevendo direto nos bytes do array."""
+    if not isinstance(memoria, array):
+        memoria.zerar()
+        return
+    # bytes(n) já nasce zerado; o memoryview é temporário (um array com view aberta não pode mudar de tamanho)
+    with memoryview(memoria) as mv:
+        mv.cast('B')[:] = bytes(len(memoria) * memoria.itemsize)
+
+def configurar_memoria(layout="compacto", tamanho=TAMANHO_MEMORIA_PADRAO, enderecamento="palavra", ordem="little"):
+    """
+    Monta a memória do simulador e reinicia o estado.
+
+    - layout: "compacto", "mars" ou "spim" (ver LAYOUTS_MEMORIA).
+    - tamanho: células (modo palavra) ou bytes (modo byte) do layout compacto; os outros têm sempre 2**32.
+    - enderecamento: "palavra" ou "byte".
+    - ordem: "little" ou "big", ordem dos bytes das palavras no modo byte.
+    """
+    global memoria, layout_memoria, modo_enderecamento, ordem_bytes, base_dados, _ultima_traducao
+    if layout not in LAYOUTS_MEMORIA:
+        raise ValueError(f"Layout de memória desconhecido: '{layout}'")
+    if enderecamento not in MODOS_ENDERECAMENTO:
+        raise ValueError(f"Modo de endereçamento desconhecido: '{enderecamento}'")
+    if ordem not in ("little", "big"):
+        raise ValueError(f"Ordem de bytes desconhecida: '{ordem}'")
+    paginada = LAYOUTS_MEMORIA[layout] is not None
+
+    # Mesma configuração: só muda o tamanho no próprio objeto (ou só reinicia)
+    if (layout, enderecamento, ordem) == (layout_memoria, modo_enderecamento, ordem_bytes):
+        if paginada:
+            resetar_estado()
+        else:
+            definir_tamanho_memoria(tamanho)
+        return
+
+    if enderecamento == "byte":
+        memoria = MemoriaPaginadaBytes(ordem) if paginada else MemoriaBytes(tamanho, ordem)
+    else:
+        memoria = MemoriaPaginada() if paginada else array('q', bytes(8 * tamanho))
+    layout_memoria, modo_enderecamento, ordem_bytes = layout, enderecamento, ordem
+    base_dados = LAYOUTS_MEMORIA[layout][0] if paginada else 0
+    # lw/sw/lb/... têm handlers diferentes em cada modo, e os blocos traduzidos também mudam
+    tabela_despacho[:] = montar_tabela_despacho()
+    tabela_anotada[:] = montar_tabela_despacho(anotar=True)
+    _ultima_traducao = (None, None, None)
+    resetar_estado()
+
+def definir_tamanho_memoria(tamanho):
+    """Muda o tamanho da memória (no mesmo objeto) e reinicia o estado. Só vale para o layout compacto."""
+    if tamanho < 1:
+        raise ValueError("A memória precisa ter pelo menos 1 célula")
+    if isinstance(memoria, MemoriaPaginada):
+        raise ValueError("A memória paginada sempre tem 2**32 endereços, o tamanho não pode ser mudado")
+    if tamanho < 4 and modo_enderecamento == "byte":
+        raise ValueError("A memória endereçada a byte precisa ter pelo menos 4 bytes")
+    if isinstance(memoria, MemoriaBytes):
+        memoria.redimensionar(tamanho)
+    elif tamanho < len(memoria):
+        del memoria[tamanho:]
+    else:
+        memoria.frombytes(bytes((tamanho - len(memoria)) * memoria.itemsize))
+    resetar_estado()
+
+def resetar_estado():
+    """Volta registradores, memória, PC e lista de erros para o estado inicial (sem alocar uma memória nova)."""
+    global PC, encerrado_por_syscall
+    zerar_memoria()
+    vetor_reg[:] = [0] * len(vetor_reg)
+    vetor_reg[reg_dic["$sp"]] = topo_pilha()
+    PC = 0
+    encerrado_por_syscall = False
+    erros.clear()
+
+# --- INSTANTÂNEOS DO ESTADO ---
+# Um instantâneo guarda o PC, os registradores e a memória, esta em páginas de bytes imutáveis
+# Páginas iguais às do instantâneo anterior não são copiadas de novo: o novo aponta para o mesmo objeto bytes
+# (copy-on-write por página), então vários instantâneos seguidos só ocupam memória com as páginas que mudaram
+# Páginas zeradas são todas o mesmo objeto, e na memória paginada as que nunca foram escritas nem entram
+BYTES_PAGINA_INSTANTANEO = 32 * 1024
+_PAGINAS_ZERO = {} # tamanho -> bytes zerado, compartilhado por todas as páginas zeradas
+
+class Instantaneo:
+    """
+    Estado da máquina em um ponto da execução (ver capturar_estado). Imutável: o mesmo instantâneo pode ser
+    restaurado quantas vezes for preciso (ex: o estado logo depois de carregar, para rodar o programa de novo).
+    """
+
+    __slots__ = ("PC", "registradores", "paginas", "encerrado", "quantidade_erros", "configuracao")
+
+    def __init__(self, PC, registradores, paginas, encerrado, quantidade_erros, configuracao):
+        atribuir = object.__setattr__
+        atribuir(self, "PC", PC)
+        atribuir(self, "registradores", registradores)          # tuple com os valores do vetor_reg
+        atribuir(self, "paginas", MappingProxyType(paginas))    # número da página -> bytes (somente leitura)
+        atribuir(self, "encerrado", encerrado)                  # encerrado_por_syscall
+        atribuir(self, "quantidade_erros", quantidade_erros)    # len(erros) no momento da captura
+        atribuir(self, "configuracao", configuracao)            # (layout, endereçamento, ordem, tamanho) da memória
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("Instantaneo é imutável")
+
+def _configuracao_memoria():
+    return (layout_memoria, modo_enderecamento, ordem_bytes, len(memoria))
+
+def _pagina_zero(tamanho):
+    zero = _PAGINAS_ZERO.get(tamanho)
+    if zero is None:
+        zero = _PAGINAS_ZERO[tamanho] = bytes(tamanho)
+    return zero
+
+def _bytes_memoria():
+    """memoryview ('B') com os bytes da memória contínua (array ou MemoriaBytes)."""
+    return memoryview(memoria.dados if isinstance(memoria, MemoriaBytes) else memoria).cast('B')
+
+def capturar_estado(anterior=None):
+    """
+    Instantâneo do estado atual da máquina.
+
+    - anterior: instantâneo da mesma memória; as páginas que não mudaram desde ele são compartilhadas, não copiadas.
+    """
+    paginas = {}
+    velhas = anterior.paginas if anterior is not None and anterior.configuracao == _configuracao_memoria() else {}
+    if isinstance(memoria, MemoriaPaginada):
+        fontes = [(numero, memoryview(pagina).cast('B')) for numero, pagina in memoria.paginas.items()]
+    else:
+        buffer = _bytes_memoria()
+        tamanho = BYTES_PAGINA_INSTANTANEO
+        fontes = [(inicio // tamanho, buffer[inicio:inicio + tamanho]) for inicio in range(0, len(buffer), tamanho)]
+        del buffer
+    for numero, fatia in fontes:
+        # A página vira bytes antes de comparar: bytes == bytes é um memcmp, memoryview == bytes compara célula a célula
+        # A cópia só fica guardada se a página mudou
+        dados = bytes(fatia)
+        velha = velhas.get(numero)
+        if velha is not None and dados == velha:
+            paginas[numero] = velha
+        elif dados == _pagina_zero(len(dados)):
+            if not isinstance(memoria, MemoriaPaginada):
+                paginas[numero] = _pagina_zero(len(dados))
+        else:
+            paginas[numero] = dados
+    # Os memoryviews precisam sumir antes de alguém mudar o tamanho do array
+    fontes = fatia = None
+    return Instantaneo(PC, tuple(vetor_reg), paginas, encerrado_por_syscall, len(erros), _configuracao_memoria())
+
+def restaurar_estado(instantaneo):
+    """Volta a máquina para o estado do instantâneo, copiando as páginas em bloco para a memória atual."""
+    global PC, encerrado_por_syscall
+    if instantaneo.configuracao != _configuracao_memoria():
+        raise ValueError("O instantâneo é de outra configuração de memória (layout, endereçamento ou tamanho)")
+    if isinstance(memoria, MemoriaPaginada):
+        memoria.zerar()
+        for numero, dados in instantaneo.paginas.items():
+            pagina = memoria.paginas[numero] = memoria._nova_pagina()
+            memoryview(pagina).cast('B')[:] = dados
+    else:
+        buffer = _bytes_memoria()
+        tamanho = BYTES_PAGINA_INSTANTANEO
+        for numero, dados in instantaneo.paginas.items():
+            buffer[numero * tamanho:numero * tamanho + len(dados)] = dados
+        buffer.release()
+    vetor_reg[:] = instantaneo.registradores
+    PC = instantaneo.PC
+    encerrado_por_syscall = instantaneo.encerrado
+    # Os erros depois da captura deixam de ter acontecido
+    del erros[instantaneo.quantidade_erros:]
+
+# --- VÁRIAS ENTRADAS PARA O MESMO PROGRAMA ---
+# Sem interface: o programa é lido e montado uma vez, o estado logo depois do carregamento vira um instantâneo
+# e cada entrada começa da restauração dele (cópia das páginas), sem passar de novo pelo arquivo
+
+def aplicar_entrada(entrada):
+    """
+    Escreve uma entrada no estado atual da máquina.
+
+    - entrada: {"registradores": {"$a0": 5, ...}, "memoria": {endereço: valor, ...}}, as duas chaves opcionais.
+      Registradores pelo nome (ou índice); no modo byte cada valor de memória é uma palavra de 4 bytes.
+    """
+    for registrador, valor in entrada.get("registradores", {}).items():
+        idx = reg_dic[registrador] if isinstance(registrador, str) else registrador
+        if idx != 0:
+            vetor_reg[idx] = valor
+    for endereco, valor in entrada.get("memoria", {}).items():
+        endereco = int(endereco) # Chaves de um JSON chegam como texto
+        if modo_enderecamento == "byte":
+            memoria.escrever(endereco, 4, valor)
+        else:
+            memoria[endereco] = palavra(valor)
+
+def simular_entradas(arquivo, entradas, modo=None, limite_instrucoes=None):
+    """
+    Roda o mesmo arquivo uma vez para cada entrada (ver aplicar_entrada), sempre a partir do estado pós-carregamento.
+
+    Gerador: depois de cada execução devolve a quantidade de instruções executadas, com a máquina (vetor_reg,
+    memoria, erros, interrupcao) ainda no estado final daquela entrada. Não gera nada se o arquivo não puder ser lido.
+    """
+    resetar_estado()
+    matriz_programa, data_table, programa_decodificado = carregar_programa(arquivo)
+    if matriz_programa is None:
+        return
+    inicial = capturar_estado()
+    for entrada in entradas:
+        restaurar_estado(inicial)
+        aplicar_entrada(entrada)
+        yield executar(matriz_programa, programa_decodificado, data_table, modo, limite_instrucoes)
+
 # FUNÇÕES: 
 
 # --- READ ARQ --- 
@@ -74,106 +726,384 @@ CAUSE = 0 # CAUSE
 # Trata linhas vazias e comentários, excluindo e ignorando respectivamente
 # Em .data: Separa e armazena endereços na memória a depender da directive (.ascizz ou .word)
 # Em .text: Separa as instruções em uma  matriz Programa, onde as colunas são as instruções e reg
+#           Os rótulos ('loop:') marcam o PC da instrução seguinte, para os desvios e saltos
 # Retorna uma matriz_programa (armazena todas as instruções) e uma data_table (endereços para o vetor memória)
-def read_arq(file_path): 
+def read_arq(file_path, conteudo=None): 
     """ 
-    Lê um arquivo .s com seções .data e .text. 
+    Lê um arquivo .s com seções .data e .text, uma linha por vez (o arquivo nunca fica inteiro na memória).
 
     - Popula a memória global 'memoria' com os dados da seção .data. 
-    - Cria uma tabela de símbolos para os rótulos de dados. 
-    - Retorna a matriz de instruções da seção .text e a tabela de dados. 
+    - Cria uma tabela de símbolos para os rótulos de dados (e o montador guarda os rótulos da .text). 
+    - Retorna o programa montado (montador.ProgramaMontado, usado como a antiga matriz_programa) e a tabela de dados. 
+    - Se 'conteudo' (bytes do arquivo) for passado, o arquivo não é lido de novo.
     """ 
-    global memoria # Váriavel global para ser modificada pela função
+    global memoria, fim_dados # Váriaveis globais para serem modificadas pela função
 
     data_table = {} 
-    matriz_programa = [] 
+    # As instruções vão direto para o montador, que guarda só as palavras de 32 bits
+    matriz_programa = montador.ProgramaMontado(data_table, inst_dic)
      
-    # Ponteiro para o próximo endereço livre na memória de dados. Começa em 0.
-    # Sempre começa do indice 0 no vetor memoria
-    data_pointer = 0 
-    topico_atual = None #   Os tópicos podem ser .data ou . text
+    # Ponteiro para o próximo endereço livre na memória de dados.
+    # Começa em base_dados: 0 no layout compacto, 0x10010000 no MARS, 0x10000000 no SPIM
+    data_pointer = base_dados 
 
     try: 
-        with open(file_path, 'r', encoding='utf-8') as f: 
-            linhas = f.readlines() 
+        if conteudo is not None:
+            arquivo = io.StringIO(conteudo.decode('utf-8'))
+        else:
+            arquivo = open(file_path, 'r', encoding='utf-8')
     except FileNotFoundError: 
-        print(f"Erro: Arquivo '{file_path}' não encontrado.")
+        registrar_erro(f"Erro: Arquivo '{file_path}' não encontrado.")
         # Fazer um código Cause (Não conseguiu ler o arquivo)
         return None, None 
 
-    for linha in linhas: 
-        # Tratamento linha a linha, exclui coméntarios e linhas vazias
-        linha_limpa = linha.split('#', 1)[0].strip() 
-
-        if not linha_limpa: 
-            continue 
-
-        # --- Tópicos --- 
-        if linha_limpa == '.data': 
-            topico_atual = 'data' 
-            continue 
-        elif linha_limpa == '.text': 
-            topico_atual = 'text' 
-            continue 
-
-        # --- Tratamento baseado nos tópicos ---
-        # Para .data, preenche data_table 
-        # Para .text, preenche a matriz_programa
-
-        # Apartir daqui será criada a data_table (Tabela de dados com endereços para o vetor memoria)
-        if topico_atual == 'data': 
-            try: 
-                # Separa a string em:
-                # Label = "Nome da variável que será salva com o endereço na data_table"
-                # Resto = "Código que será tratado depois e oque será salvo"
-                label, resto = linha_limpa.split(':', 1) 
-                # Tratamento de espaços desnecessários
-                label = label.strip() 
-                # Salva a diretiva e o dado que será armazenado na memória em uma tupla  
-                directive_value = resto.strip().split(maxsplit=1) # Só pode separar uma vez, pois só terá um espaço
-                # Salva o valor da diretiva, pode ser .asciiz ou .word nesse simulador
-                directive = directive_value[0] 
-                 
-                # Armazena o endereço ATUAL na tabela de dados para este rótulo 
-                data_table[label] = data_pointer
-
-                if directive == '.asciiz': 
-                    # .ascizz serve para strings, salva a string já ->SEM ASPAS<-
-                    str = directive_value[1].strip('"') 
-                    for char in str: 
-                        # Armazena cada caractere como um byte (seu valor ASCII, com a função ord()) na memória 
-                        # Isso acontece para evitar erros no vetor memoria]
-                        memoria[data_pointer] = ord(char) 
-                        data_pointer += 1 
-                    # Adiciona uma 'Flag' para avisar ao código o fim da string
-                    memoria[data_pointer] = 0 
-                    data_pointer += 1 
-                 
-                elif directive == '.word': 
-                    # .word vai servir para armazenar números inteiros ou caracteres
-                    # Você pode armazenar vetores colocando os números ou caracteres entre vírgulas
-                    # Cria uma lista com todos os valores separados por ','
-                    values = directive_value[1].split(',') 
-                    for val in values: 
-                        memoria[data_pointer] = int(val.strip()) 
-                        data_pointer += 1  
-
-            except Exception as e: 
-                print(f"Erro ao processar linha de dados '{linha_limpa}': {e}")
-                # Adicionar um CAUSE aq para erros ao ler uma linha 
-
-        # Neste tópico se encontram as instruções
-        # Apartir daqui será criada a matriz de instruções
-        elif topico_atual == 'text': 
-            # Separa a instruçãi em fatias (Slices) já tratadas, cada fatia:
-                # Retira as vírgulas 
-                # Retira '(' e ')' para instruções do tipo offset($sp)
-            slices = linha_limpa.replace(',', ' ').replace('(', ' ').replace(')', ' ').split()
-
-            # Função .append() adiciona um elemento no final da matriz, assim elas se empilham de baixo para cima
-            matriz_programa.append(slices) 
-
-    return matriz_programa, data_table 
+    # O ler_fonte separa os tópicos (.data / .text), descarta comentários e linhas vazias e quebra cada linha em tokens
+    with arquivo:
+        for topico_atual, tokens, linha in montador.ler_fonte(arquivo): 
+
+            # --- Tratamento baseado nos tópicos ---
+            # Para .data, preenche data_table e a memória
+            # Para .text, manda a instrução para o montador
+
+            if topico_atual == 'data': 
+                try: 
+                    # label = "Nome da variável que será salva com o endereço na data_table"
+                    # directive = .asciiz ou .word nesse simulador, values = o que será salvo
+                    label, directive, values = montador.dado_da_linha(tokens)
+                     
+                    # No modo byte um .word começa sempre em um endereço múltiplo de 4 (alinhado)
+                    if directive == '.word' and modo_enderecamento == "byte":
+                        data_pointer = (data_pointer + 3) & ~3
+
+                    # Armazena o endereço ATUAL na tabela de dados para este rótulo 
+                    data_table[label] = data_pointer
+
+                    if directive == '.asciiz': 
+                        # .ascizz serve para strings, salva a string já ->SEM ASPAS<-
+                        str = " ".join(values).strip('"') 
+                        if modo_enderecamento == "byte":
+                            # Modo byte: a string vira bytes (UTF-8) com o NUL no final, copiados de uma vez
+                            dados = str.encode('utf-8') + b"\0"
+                            if data_pointer + len(dados) > len(memoria):
+                                raise IndexError("memória cheia")
+                        else:
+                            # Cada caractere vira o seu valor (ord()) em uma célula, com a 'Flag' 0 marcando o fim
+                            dados = array('q', map(ord, str))
+                            dados.append(0)
+                            if data_pointer + len(dados) > len(memoria):
+                                # Como no laço caractere por caractere: grava o que couber e para no fim da memória
+                                memoria[data_pointer:] = dados[:len(memoria) - data_pointer]
+                                data_pointer = len(memoria)
+                                raise IndexError("memória cheia")
+                        memoria[data_pointer:data_pointer + len(dados)] = dados
+                        data_pointer += len(dados)
+                     
+                    elif directive == '.word': 
+                        # .word vai servir para armazenar números inteiros ou caracteres
+                        # Você pode armazenar vetores colocando os números ou caracteres entre vírgulas
+                        for val in values: 
+                            if modo_enderecamento == "byte":
+                                # Cada valor ocupa 4 bytes, na ordem de bytes configurada
+                                memoria.escrever(data_pointer, 4, int(val))
+                                data_pointer += 4
+                            else:
+                                memoria[data_pointer] = int(val) 
+                                data_pointer += 1  
+
+                except Exception as e: 
+                    registrar_erro(f"Erro ao processar linha de dados '{linha.split('#', 1)[0].strip()}': {e}")
+                    # Adicionar um CAUSE aq para erros ao ler uma linha 
+
+            # Neste tópico se encontram as instruções, já em tokens (sem vírgulas e sem os '(' ')' do offset($sp))
+            elif topico_atual == 'text': 
+                # 'rótulo:' no começo da linha (pode vir sozinho ou antes da instrução)
+                while len(tokens) >= 2 and tokens[1] == ':':
+                    try:
+                        matriz_programa.adicionar_rotulo(tokens[0])
+                    except ValueError as e:
+                        registrar_erro(f"Erro na linha de código '{linha.split('#', 1)[0].strip()}': {e}")
+                    tokens = tokens[2:]
+                if tokens:
+                    matriz_programa.adicionar(tokens) 
+
+    # 'la' para rótulos da .data e desvios para rótulos da .text que apareceram depois da instrução
+    matriz_programa.finalizar()
+    fim_dados = data_pointer
+    return matriz_programa, data_table
+
+# --- PRÉ-DECODIFICAÇÃO ---
+# Roda UMA vez depois do read_arq
+# Transforma cada linha da matriz_programa (lista de strings) em uma tupla compacta:
+#   (código, a, b, c)
+# Onde a, b e c já são os índices dos registradores no vetor_reg ou os imediatos já convertidos com int()
+# Assim o loop de execução não precisa mais procurar strings no reg_dic nem converter números a cada passo
+#
+# Formato de cada registro:
+#   add/sub/and/or/slt : (cod, RD, RS, RT)
+#   mult               : (cod, RS, RT, 0)
+#   sll                : (cod, RD, RT, SHAMT)
+#   addi/slti          : (cod, RT, RS, IMEDIATO)
+#   lui                : (cod, RT, IMEDIATO, 0)
+#   lw/sw (e lb, lbu,  : (cod, RT, OFFSET, RS)
+#   lh, lhu, sb, sh)
+#   sw imediato        : (OP_SW_IMEDIATO, VALOR, OFFSET, RS)
+#   la                 : (cod, RT, ENDEREÇO, 0)   -> A label já é resolvida aqui pela data_table
+#   beq/bne            : (cod, RS, RT, ALVO)      -> ALVO é o PC do rótulo, o desvio tomado só faz PC = ALVO
+#   j                  : (cod, ALVO, 0, 0)
+#   jal                : (cod, $ra, ALVO, 0)      -> O $ra no 'a', como o destino das outras instruções
+#   jr                 : (cod, RS, 0, 0)
+#   syscall            : (cod, 0, 0, 0)
+#   erro               : (OP_ERRO, MENSAGEM, 0, 0) -> A mensagem só é mostrada quando o PC chegar na linha
+def decodificar_instrucao(instrucao, PC, data_table):
+    """Converte uma instrução (lista de strings) em um registro pré-decodificado."""
+    # A conferência da linha é a 1ª passagem do montador, aqui só o nome vira o código do back_end
+    nome, a, b, c = montador.registro_da_instrucao(instrucao, PC, data_table, inst_dic)
+    return (COD_POR_NOME[nome], a, b, c)
+
+# --- IMAGEM DE CÓDIGO DE MÁQUINA ---
+# O montador (montador.py) transforma o programa em um array('I') com uma palavra de 32 bits por linha
+# Os registros pré-decodificados saem da IMAGEM (e não das strings), então o que é mostrado e o que é
+# executado vêm da mesma fonte. O motor "imagem" busca e decodifica a palavra a cada instrução
+
+# Nome do registro do montador -> código do back_end
+COD_POR_NOME = dict(op_cod)
+COD_POR_NOME[montador.SW_IMEDIATO] = OP_SW_IMEDIATO
+COD_POR_NOME[montador.ERRO] = OP_ERRO
+
+def montar_programa(matriz_programa, data_table):
+    """Monta o programa. Retorna (imagem, extras), ver montador.montar."""
+    if isinstance(matriz_programa, montador.ProgramaMontado):
+        # Saído do read_arq: já está montado
+        return matriz_programa.palavras, matriz_programa.extras
+    return montador.montar(matriz_programa, data_table, inst_dic, getattr(matriz_programa, "rotulos", None))
+
+def decodificar_imagem(imagem, extras):
+    """Decodifica a imagem inteira em registros (cod, a, b, c)."""
+    return [(COD_POR_NOME[nome], a, b, c) for nome, a, b, c in montador.decodificar_imagem(imagem, extras)]
+
+def predecodificar(matriz_programa, data_table):
+    """Pré-decodifica todo o programa (montagem + decodificação da imagem). Retorna uma lista de registros (cod, a, b, c)."""
+    return decodificar_imagem(*montar_programa(matriz_programa, data_table))
+
+# --- CACHE DE PROGRAMAS CARREGADOS ---
+# Carregar o mesmo arquivo de novo (ex: o professor rodando o mesmo teste várias vezes) não precisa
+# ler, separar e pré-decodificar tudo outra vez nem remontar a memória de dados caractere por caractere
+# A chave é o hash SHA-256 do CONTEÚDO do arquivo (e do tamanho da memória), não o caminho
+# Cada entrada guarda: (matriz_programa, data_table, programa_decodificado, imagem_memoria, erros_carga)
+#   imagem_memoria = (início, valores): as células da .data escritas pelo read_arq
+#   erros_carga    = erros reportados pelo read_arq, mostrados de novo a cada carregamento
+#
+# Dois níveis:
+#   - Memória (LRU): os TAMANHO_CACHE_PROGRAMAS arquivos usados mais recentemente
+#   - Disco (opcional): uma imagem .mbin por programa em pasta_cache_disco, sobrevive entre execuções
+#     O cache em disco usa o mesmo formato das imagens (palavras, .data e metadados em JSON, ver imagem_binaria),
+#     que só tem dados: quem consegue escrever na pasta pode, no máximo, trocar o programa carregado,
+#     nunca executar código no simulador (como aconteceria abrindo um pickle)
+
+VERSAO_CACHE = 6 # Mudar sempre que o formato dos registros pré-decodificados mudar
+TAMANHO_CACHE_PROGRAMAS = 32
+TAMANHO_BLOCO_LEITURA = 1 << 20 # Bytes lidos por vez para o hash do arquivo
+cache_programas = OrderedDict()
+pasta_cache_disco = os.environ.get("MINIMIPS_CACHE") or None
+
+def _ler_cache_disco(chave):
+    """Procura a entrada no cache em disco. Retorna None se não existir, estiver corrompida ou for de outra memória."""
+    if not pasta_cache_disco:
+        return None
+    try:
+        imagem = imagem_binaria.ImagemPrograma(os.path.join(pasta_cache_disco, chave + imagem_binaria.EXTENSAO))
+    except (OSError, imagem_binaria.ErroImagem):
+        # A imagem confere o arquivo inteiro na abertura: qualquer entrada estragada é só uma falta,
+        # e o carregamento grava uma entrada nova por cima dela
+        return None
+    with imagem:
+        if (imagem.layout, imagem.enderecamento, imagem.ordem) != (layout_memoria, modo_enderecamento, ordem_bytes):
+            return None
+        matriz_programa = imagem.matriz_programa()
+        try:
+            programa_decodificado = decodificar_imagem(matriz_programa.palavras, matriz_programa.extras)
+        except IndexError:
+            return None # Palavra 0x3F apontando para um extra que não existe
+        # Cópia da .data no tipo que a memória aceita em uma atribuição de fatia
+        if modo_enderecamento == "byte":
+            valores = bytes(imagem.dados)
+        else:
+            valores = array('q')
+            valores.frombytes(imagem.dados.cast('B'))
+        return (matriz_programa, imagem.simbolos, programa_decodificado, (imagem.base_dados, valores), imagem.avisos)
+
+def _gravar_cache_disco(chave, entrada):
+    """Grava a entrada no cache em disco (falhas de escrita são ignoradas, o cache é só um atalho)."""
+    if not pasta_cache_disco:
+        return
+    matriz_programa, data_table, _, (inicio, valores), erros_carga = entrada
+    palavras, extras = montar_programa(matriz_programa, data_table)
+    try:
+        os.makedirs(pasta_cache_disco, exist_ok=True)
+        caminho = os.path.join(pasta_cache_disco, chave + imagem_binaria.EXTENSAO)
+        # Escreve em um temporário e renomeia, para outro processo nunca ler um arquivo pela metade
+        temporario = caminho + f".{os.getpid()}.tmp"
+        imagem_binaria.salvar(temporario, palavras, extras, data_table, matriz_programa, valores, inicio,
+                              layout_memoria, modo_enderecamento, ordem_bytes, erros_carga)
+        os.replace(temporario, caminho)
+    except OSError:
+        pass
+
+def carregar_programa(arquivo):
+    """
+    Carrega um arquivo .s usando o cache de programas (ou uma imagem .mbin, ver carregar_imagem).
+
+    - Escreve a imagem inicial da seção .data na memória global.
+    - Retorna (matriz_programa, data_table, programa_decodificado) ou (None, None, None) se o arquivo não puder ser lido.
+    """
+    global fim_dados
+    if arquivo.endswith(imagem_binaria.EXTENSAO):
+        return carregar_imagem(arquivo)
+    # O hash é calculado em blocos: o conteúdo do arquivo nunca fica inteiro na memória
+    h = hashlib.sha256()
+    try:
+        with open(arquivo, "rb") as f:
+            for bloco in iter(lambda: f.read(TAMANHO_BLOCO_LEITURA), b""):
+                h.update(bloco)
+    except OSError:
+        registrar_erro(f"Erro: Arquivo '{arquivo}' não encontrado.")
+        return None, None, None
+
+    h.update(f"|{VERSAO_CACHE}|{layout_memoria}|{modo_enderecamento}|{ordem_bytes}|{len(memoria)}".encode())
+    chave = h.hexdigest()
+
+    entrada = cache_programas.get(chave)
+    if entrada is None:
+        entrada = _ler_cache_disco(chave)
+    if entrada is None:
+        # Cache miss: faz o trabalho completo uma única vez
+        erros_antes = len(erros)
+        matriz_programa, data_table = read_arq(arquivo)
+        if matriz_programa is None:
+            return None, None, None
+        programa_decodificado = predecodificar(matriz_programa, data_table)
+        # Só o trecho da .data (a memória paginada tem 2**32 células, não dá para varrer tudo)
+        fim = min(fim_dados, len(memoria))
+        imagem_memoria = (base_dados, memoria[base_dados:fim])
+        entrada = (matriz_programa, data_table, programa_decodificado, imagem_memoria, erros[erros_antes:])
+        _gravar_cache_disco(chave, entrada)
+    else:
+        # Cache hit: só copia a imagem da memória e repete os avisos do carregamento
+        matriz_programa, data_table, programa_decodificado, imagem_memoria, erros_carga = entrada
+        inicio, valores = imagem_memoria
+        memoria[inicio:inicio + len(valores)] = valores
+        fim_dados = inicio + len(valores)
+        for mensagem in erros_carga:
+            registrar_erro(mensagem)
+
+    cache_programas[chave] = entrada
+    cache_programas.move_to_end(chave)
+    while len(cache_programas) > TAMANHO_CACHE_PROGRAMAS:
+        cache_programas.popitem(last=False)
+
+    return entrada[0], entrada[1], entrada[2]
+
+# --- IMAGEM BINÁRIA (.mbin) ---
+# Depois de carregar um .s, o resultado (código montado, .data inicial e símbolos) pode ser salvo em um .mbin
+# Abrir o .mbin não passa pelo read_arq nem pelo montador: o arquivo é mapeado (mmap) e as palavras são decodificadas
+# Na memória paginada a .data é usada direto do arquivo mapeado e só é copiada, página por página, na primeira escrita
+# Nas memórias contínuas (array / bytearray) ela entra com uma única cópia do buffer
+
+def salvar_imagem(caminho, matriz_programa, data_table, avisos=(), dados=None):
+    """
+    Grava o programa carregado por último (código, .data e símbolos) em uma imagem .mbin.
+
+    - dados: a .data a gravar (ex: a guardada logo depois do carregamento); se None, a .data atual da memória.
+    """
+    palavras, extras = montar_programa(matriz_programa, data_table)
+    if dados is None:
+        dados = trecho_dados()
+    imagem_binaria.salvar(
+        caminho, palavras, extras, data_table, matriz_programa, dados, base_dados,
+        layout_memoria, modo_enderecamento, ordem_bytes, avisos,
+    )
+
+def trecho_dados():
+    """Trecho da memória com a .data do último arquivo carregado (de base_dados até fim_dados)."""
+    return memoria[base_dados:min(fim_dados, len(memoria))]
+
+def carregar_dados(endereco, dados, imagem=None):
+    """
+    Coloca a .data de uma imagem na memória a partir do endereço (sem cópia na memória paginada).
+
+    Retorna True se a memória ficou com páginas apontando para o arquivo (e passou a ser a dona da 'imagem').
+    """
+    if endereco + len(dados) > len(memoria):
+        raise IndexError(f"a .data da imagem ({len(dados)} posições) não cabe na memória ({len(memoria)})")
+    if isinstance(memoria, MemoriaPaginada):
+        return memoria.mapear(endereco, dados, imagem)
+    if isinstance(memoria, MemoriaBytes):
+        memoria.dados[endereco:endereco + len(dados)] = dados
+    else:
+        with memoryview(memoria) as mv:
+            mv[endereco:endereco + len(dados)] = dados
+    return False
+
+def carregar_imagem(arquivo):
+    """
+    Abre uma imagem .mbin. Retorna (matriz_programa, data_table, programa_decodificado) como o carregar_programa.
+
+    Se a imagem foi gerada com outro layout / endereçamento / ordem de bytes, a memória é reconfigurada para ela.
+    """
+    global fim_dados
+    try:
+        imagem = imagem_binaria.ImagemPrograma(arquivo)
+    except OSError:
+        registrar_erro(f"Erro: Arquivo '{arquivo}' não encontrado.")
+        return None, None, None
+    except imagem_binaria.ErroImagem as e:
+        registrar_erro(f"Erro: {e}")
+        return None, None, None
+
+    # O código é copiado e decodificado aqui; o arquivo só continua aberto se a memória paginada
+    # ficou com páginas da .data apontando para ele (ela fecha a imagem quando essas páginas saírem)
+    mapeada = False
+    try:
+        if (imagem.layout, imagem.enderecamento, imagem.ordem) != (layout_memoria, modo_enderecamento, ordem_bytes):
+            tamanho = len(memoria) if layout_memoria == "compacto" else TAMANHO_MEMORIA_PADRAO
+            configurar_memoria(imagem.layout, max(tamanho, imagem.base_dados + len(imagem.dados)), imagem.enderecamento, imagem.ordem)
+        matriz_programa = imagem.matriz_programa()
+        programa_decodificado = decodificar_imagem(matriz_programa.palavras, matriz_programa.extras)
+        fim_dados = imagem.base_dados + len(imagem.dados)
+        mapeada = carregar_dados(imagem.base_dados, imagem.dados, imagem)
+    except (IndexError, ValueError) as e:
+        # .data maior que a memória, ou layout desconhecido nos metadados (ValueError do configurar_memoria)
+        registrar_erro(f"Erro ao carregar '{arquivo}': {e}")
+        return None, None, None
+    finally:
+        if not mapeada:
+            imagem.close()
+    for mensagem in imagem.avisos:
+        registrar_erro(mensagem)
+
+    return matriz_programa, imagem.simbolos, programa_decodificado
+
+def ler_string(endereco):
+    """Texto terminado em NUL que começa no endereço (syscall 4)."""
+    if not 0 <= endereco < len(memoria):
+        return ""
+    # Nada de concatenar caractere por caractere: uma busca pela 'flag' (0) e uma conversão do trecho todo
+    if modo_enderecamento == "byte":
+        return memoria.string(endereco).decode('utf-8', errors='replace')
+    if isinstance(memoria, array):
+        try:
+            fim = memoria.index(0, endereco) # Busca feita em C dentro do array
+        except ValueError:
+            fim = len(memoria)
+        valores = memoria[endereco:fim]
+    else:
+        valores = memoria.string(endereco)
+    return "".join(map(chr, valores))
+
+def _encerrar():
+    """Syscall 10: marca o fim pedido pelo programa (a interface não mostra o "FIM DA EXECUÇÃO" nesse caso)."""
+    global encerrado_por_syscall
+    encerrado_por_syscall = True
 
 def decode_execute(instrucao, PC, data_table, programa): 
 
@@ -182,7 +1112,7 @@ def decode_execute(instrucao, PC, data_table, programa):
 
     opcode = instrucao[0] 
     if opcode not in inst_dic: 
-        print(f"Erro na linha {PC+1}: Instrução '{opcode}' desconhecida.") 
+        registrar_erro(f"Erro na linha {PC+1}: Instrução '{opcode}' desconhecida.") 
         return PC + 1 
         # Colocar um CAUSE aqui para Instrução não encontrada
 
@@ -220,7 +1150,7 @@ def decode_execute(instrucao, PC, data_table, programa):
         if idx_dst != 0: 
             vetor_reg[idx_dst] = resultado 
         else:
-            print(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
+            registrar_erro(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
             # Colocar um CAUSE como erro tentativa de modificação do reg $zero
             # Tratamento: Pulando essa ação e avisando ao usuário na saída
 
@@ -287,6 +1217,12 @@ def decode_execute(instrucao, PC, data_table, programa):
         if idx_temp != 0: 
             vetor_reg[idx_temp] = resultado 
 
+    # --- Instruções de memória no modo byte e lb/lbu/lh/lhu/sb/sh ---
+    # O caminho de referência só interpreta lw/sw de células inteiras
+    # O resto é pré-decodificado na hora e executado pelo handler da tabela de despacho
+    elif (opcode in CARGAS or opcode in ARMAZENAMENTOS) and (modo_enderecamento == "byte" or opcode not in ["lw", "sw"]):
+        return decode_execute_tabela(decodificar_instrucao(instrucao, PC, data_table), PC, programa)
+
     # --- Instruções Type-I para memoria --- 
     # Utilizam do vetor memoria
     elif opcode in ["lw", "sw"]:
@@ -297,26 +1233,29 @@ def decode_execute(instrucao, PC, data_table, programa):
         mem_adress = offset + vetor_reg[reg_dic[reg_src_name]]
 
         if not (0 <= mem_adress < len(memoria)):
-            print(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
+            registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
             # Aplicar CAUSE para erro ao acessar endereço de memória inválido
             # Aplicar tratamento, igonarar essa linhar, avisar o usuário e ir para a próxima inst
         else:
             if opcode == "lw":
                 if reg_temp_name not in reg_dic:
-                    print(f"ERRO DE SINTAXE: 'lw' requer um registrador de destino, mas recebeu '{reg_temp_name}' na linha {PC+1}")
+                    registrar_erro(f"ERRO DE SINTAXE: 'lw' requer um registrador de destino, mas recebeu '{reg_temp_name}' na linha {PC+1}")
                     # Aplicar CAUSE para registrador de destino para load inválido
                 else:
                     vetor_reg[reg_dic[reg_temp_name]] = memoria[mem_adress]
             elif opcode == "sw":
                 if reg_temp_name in reg_dic:
                     val_temp = vetor_reg[reg_dic[reg_temp_name]]
-                    memoria[mem_adress] = val_temp
+                    try:
+                        memoria[mem_adress] = val_temp
+                    except OverflowError:
+                        memoria[mem_adress] = palavra(val_temp)
                 else:
                     try:
                         imediate = int(reg_temp_name)
-                        memoria[mem_adress] = imediate
+                        memoria[mem_adress] = palavra(imediate)
                     except ValueError:
-                        print(f"ERRO DE SINTAXE: Operando '{reg_temp_name}' para 'sw' não é um registrador válido nem um número inteiro na linha {PC+1}")
+                        registrar_erro(f"ERRO DE SINTAXE: Operando '{reg_temp_name}' para 'sw' não é um registrador válido nem um número inteiro na linha {PC+1}")
                         # Aplicar CAUSE para valor de alocação para a memória inválido
 
     # --- LOAD ADRESS ---
@@ -337,9 +1276,29 @@ def decode_execute(instrucao, PC, data_table, programa):
             if idx_temp != 0: 
                 vetor_reg[idx_temp] = adress
         else: 
-            print(f"ERRO: Etiqueta de dados '{label_name}' não encontrada na linha {PC + 1}.")
+            registrar_erro(f"ERRO: Etiqueta de dados '{label_name}' não encontrada na linha {PC + 1}.")
             # Aplicar CAUSE, erro ao buscar Label em dados (data_table)
 
+    # --- DESVIOS E SALTOS ---
+    # Aqui o rótulo é procurado a cada execução (motor de referência); nos outros motores o alvo já é o PC
+    elif opcode in ["beq", "bne", "j", "jal"]:
+        rotulo = instrucao[3] if opcode in ["beq", "bne"] else instrucao[1]
+        alvo = montador.alvo_do_rotulo(rotulo, getattr(programa, "rotulos", {}))
+        if alvo is None:
+            registrar_erro(f"ERRO: Rótulo '{rotulo}' não encontrado na .text na linha {PC + 1}.")
+        elif opcode == "j":
+            return alvo
+        elif opcode == "jal":
+            vetor_reg[reg_dic["$ra"]] = PC + 1
+            return alvo
+        else:
+            iguais = vetor_reg[reg_dic[instrucao[1]]] == vetor_reg[reg_dic[instrucao[2]]]
+            if iguais == (opcode == "beq"):
+                return alvo
+
+    elif opcode == "jr":
+        return _exec_jr(reg_dic[instrucao[1]], 0, 0, PC, programa)
+
     # --- Syscall --- 
     # Tem o processo mais diferente e sempre acessa os reg ($v0 e $a0)
     elif opcode == "syscall": 
@@ -352,56 +1311,1228 @@ def decode_execute(instrucao, PC, data_table, programa):
         call_code = vetor_reg[reg_dic["$v0"]] 
          
         if call_code == 1: # Imprimir Inteiro 
-            print(f"Saída do Sistema: {vetor_reg[reg_dic['$a0']]}")
+            escrever_saida(f"{vetor_reg[reg_dic['$a0']]}")
 
         elif call_code == 4: # Imprimir String
 
             starting = vetor_reg[reg_dic["$a0"]] # Começa no endereço armazenado em $a0
-            string = "" 
-    
-            # Loop para ler caractere por caractere da memória até achar a 'flag' (0) 
-            while 0 <= starting < len(memoria) and memoria[starting] != 0:
-                string += chr(memoria[starting]) # Vai somando caracteres até formar a string completa
-                starting += 1 
-            print(f"Saída do Sistema: {string}") # Printa a String completa
+            # Lê da memória até achar a 'flag' (0), ver ler_string
+            string = ler_string(starting)
+            escrever_saida(f"{string}") # Printa a String completa
 
         elif call_code == 10: # Sair (Padrão MIPS) 
-            print("--- Syscall: Fim da Execução ---") 
+            log("--- Syscall: Fim da Execução ---")
+            _encerrar()
             return len(programa) # Pula o PC para o final para parar o loop 
         else: 
-            print(f"ERRO: Syscall com código desconhecido ({call_code}) na linha {PC + 1}.")
+            registrar_erro(f"ERRO: Syscall com código desconhecido ({call_code}) na linha {PC + 1}.")
             # Aplicar um CAUSE, para código de chamada de sistema desconhecido
 
     # SEMPRE REINICIA O REG $zero PARA EVITAR ERROS
     vetor_reg[0] = 0
      
     # ADDER PARA O PC, basicamente vai para a próxima linha da matriz, ou próxima instrução
-    return PC + 1 
+    return PC + 1
 
+def decode_execute_decodificado(registro, PC, programa):
+    """Executa um registro pré-decodificado (ver predecodificar). Retorna o novo PC."""
+    global vetor_reg, memoria
 
-# EXECUÇÃO DO PROGRAMA:
+    # Aqui não tem mais string nem int(): só o código e os índices já prontos
+    cod, a, b, c = registro
+
+    if cod == OP_ADDI:
+        if a != 0:
+            vetor_reg[a] = vetor_reg[b] + c
+
+    elif cod in (OP_ADD, OP_SUB, OP_AND, OP_OR, OP_SLT):
+        val_src = vetor_reg[b]
+        val_temp = vetor_reg[c]
+        if cod == OP_ADD:
+            resultado = val_src + val_temp
+        elif cod == OP_SUB:
+            resultado = val_src - val_temp
+        elif cod == OP_AND:
+            resultado = val_src & val_temp
+        elif cod == OP_OR:
+            resultado = val_src | val_temp
+        else:
+            resultado = 1 if val_src < val_temp else 0
 
-matriz_programa, data_table = read_arq(file_path) 
+        if a != 0:
+            vetor_reg[a] = resultado
+        else:
+            registrar_erro(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
 
+    elif cod == OP_SYSCALL:
+        call_code = vetor_reg[1] # $v0
 
+        if call_code == 1: # Imprimir Inteiro
+            escrever_saida(f"{vetor_reg[2]}") # $a0
 
-if matriz_programa: 
-    print("--- INÍCIO DA SIMULAÇÃO ---") 
+        elif call_code == 4: # Imprimir String
+            escrever_saida(ler_string(vetor_reg[2]))
+
+        elif call_code == 10: # Sair
+            log("--- Syscall: Fim da Execução ---")
+            _encerrar()
+            return len(programa)
+        else:
+            registrar_erro(f"ERRO: Syscall com código desconhecido ({call_code}) na linha {PC + 1}.")
+
+    elif cod == OP_LA:
+        if a != 0:
+            vetor_reg[a] = b
+
+    elif cod in OPS_MEMORIA_PARCIAL or (modo_enderecamento == "byte" and cod in (OP_LW, OP_SW, OP_SW_IMEDIATO)):
+        # lb/lh/sb/sh e todo acesso no modo byte: mesmo handler da tabela de despacho
+        return tabela_despacho[cod](a, b, c, PC, programa)
+
+    elif cod in (OP_LW, OP_SW, OP_SW_IMEDIATO):
+        mem_adress = b + vetor_reg[c]
+        if not (0 <= mem_adress < len(memoria)):
+            registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
+        elif cod == OP_LW:
+            vetor_reg[a] = memoria[mem_adress]
+        elif cod == OP_SW:
+            try:
+                memoria[mem_adress] = vetor_reg[a]
+            except OverflowError:
+                memoria[mem_adress] = palavra(vetor_reg[a])
+        else:
+            memoria[mem_adress] = palavra(a)
+
+    elif cod == OP_SLTI:
+        if a != 0:
+            vetor_reg[a] = 1 if vetor_reg[b] < c else 0
+
+    elif cod == OP_SLL:
+        if a != 0:
+            vetor_reg[a] = vetor_reg[b] << c
+
+    elif cod == OP_LUI:
+        if a != 0:
+            vetor_reg[a] = b << 16
+
+    elif cod == OP_MULT:
+        resultado_64bits = vetor_reg[a] * vetor_reg[b]
+        vetor_reg[9] = resultado_64bits & 0xFFFFFFFF # $LO
+        vetor_reg[8] = resultado_64bits >> 32 # $HI
+
+    elif cod in OPS_CONTROLE:
+        # Desvios e saltos devolvem o próprio PC de destino: mesmo handler da tabela de despacho
+        return tabela_despacho[cod](a, b, c, PC, programa)
+
+    elif cod == OP_ERRO:
+        # A mensagem foi montada na pré-decodificação
+        registrar_erro(a)
+
+    vetor_reg[0] = 0
+    return PC + 1
+
+
+# --- MOTOR POR TABELA DE DESPACHO ---
+# Em vez da escada de if/elif, cada instrução tem a sua própria função (handler)
+# A tabela_despacho é uma lista indexada pelo código da instrução (op_cod), montada a partir do inst_dic
+# Assim o 'syscall' e o 'la' custam o mesmo que o 'add': um acesso à lista e uma chamada
+# Todo handler recebe (a, b, c, PC, programa) do registro pré-decodificado e retorna o novo PC
+
+def _exec_add(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = vetor_reg[b] + vetor_reg[c]
+    else:
+        registrar_erro(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
+    return PC + 1
+
+def _exec_sub(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = vetor_reg[b] - vetor_reg[c]
+    else:
+        registrar_erro(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
+    return PC + 1
+
+def _exec_and(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = vetor_reg[b] & vetor_reg[c]
+    else:
+        registrar_erro(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
+    return PC + 1
+
+def _exec_or(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = vetor_reg[b] | vetor_reg[c]
+    else:
+        registrar_erro(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
+    return PC + 1
+
+def _exec_slt(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = 1 if vetor_reg[b] < vetor_reg[c] else 0
+    else:
+        registrar_erro(f"REGISTRADOR $zero IDENTIFICADO COMO DESTINO, ERRO AO ALOCAR VALOR")
+    return PC + 1
+
+def _exec_mult(a, b, c, PC, programa):
+    resultado_64bits = vetor_reg[a] * vetor_reg[b]
+    vetor_reg[9] = resultado_64bits & 0xFFFFFFFF # $LO
+    vetor_reg[8] = resultado_64bits >> 32 # $HI
+    return PC + 1
+
+def _exec_sll(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = vetor_reg[b] << c
+    return PC + 1
+
+def _exec_addi(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = vetor_reg[b] + c
+    return PC + 1
+
+def _exec_slti(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = 1 if vetor_reg[b] < c else 0
+    return PC + 1
+
+def _exec_lui(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = b << 16
+    return PC + 1
+
+def _exec_lw(a, b, c, PC, programa):
+    mem_adress = b + vetor_reg[c]
+    if 0 <= mem_adress < len(memoria):
+        vetor_reg[a] = memoria[mem_adress]
+        # Único handler que consegue escrever no $zero, então só ele precisa reiniciar
+        vetor_reg[0] = 0
+    else:
+        registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
+    return PC + 1
+
+def _exec_sw(a, b, c, PC, programa):
+    mem_adress = b + vetor_reg[c]
+    if 0 <= mem_adress < len(memoria):
+        try:
+            memoria[mem_adress] = vetor_reg[a]
+        except OverflowError:
+            # O registrador passou de 64 bits (ex: vários sll seguidos), guarda só os bits que cabem na célula
+            memoria[mem_adress] = palavra(vetor_reg[a])
+    else:
+        registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
+    return PC + 1
+
+def _exec_sw_imediato(a, b, c, PC, programa):
+    mem_adress = b + vetor_reg[c]
+    if 0 <= mem_adress < len(memoria):
+        memoria[mem_adress] = palavra(a)
+    else:
+        registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
+    return PC + 1
+
+# --- Cargas e armazenamentos parciais / modo byte ---
+# Os handlers destas instruções só mudam no tamanho do acesso e no sinal, então são criados por funções
+# (uma closure por instrução, com tamanho e sinal já fixados)
+
+def estender(valor, tamanho, sinal):
+    """Trunca o valor para 'tamanho' bytes e, se pedido, estende o sinal (lb/lh no modo palavra)."""
+    valor &= MASCARAS_ACESSO[tamanho]
+    if sinal and valor >> (8 * tamanho - 1):
+        valor -= 1 << (8 * tamanho)
+    return valor
+
+def _erro_acesso(endereco, tamanho, PC):
+    if 0 <= endereco <= len(memoria) - tamanho:
+        registrar_erro(f"ERRO: Endereço desalinhado ({endereco}) para acesso de {tamanho} bytes na linha {PC + 1}")
+    else:
+        registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({endereco}) na linha {PC + 1}")
+
+def _handler_carga_celula(tamanho, sinal):
+    """lb/lbu/lh/lhu no modo palavra: lê a célula inteira e fica só com os bits do tamanho pedido."""
+    def handler(a, b, c, PC, programa):
+        mem_adress = b + vetor_reg[c]
+        if 0 <= mem_adress < len(memoria):
+            if a != 0:
+                vetor_reg[a] = estender(memoria[mem_adress], tamanho, sinal)
+        else:
+            registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
+        return PC + 1
+    return handler
+
+def _handler_armazenamento_celula(tamanho):
+    """sb/sh no modo palavra: a célula recebe só os bits do tamanho pedido."""
+    def handler(a, b, c, PC, programa):
+        mem_adress = b + vetor_reg[c]
+        if 0 <= mem_adress < len(memoria):
+            memoria[mem_adress] = vetor_reg[a] & MASCARAS_ACESSO[tamanho]
+        else:
+            registrar_erro(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {PC + 1}")
+        return PC + 1
+    return handler
+
+def _handler_carga_bytes(tamanho, sinal):
+    """Carga no modo byte: acesso alinhado de 'tamanho' bytes pelo struct da memória."""
+    def handler(a, b, c, PC, programa):
+        mem_adress = b + vetor_reg[c]
+        if 0 <= mem_adress <= len(memoria) - tamanho and mem_adress % tamanho == 0:
+            if a != 0:
+                vetor_reg[a] = memoria.ler(mem_adress, tamanho, sinal)
+        else:
+            _erro_acesso(mem_adress, tamanho, PC)
+        return PC + 1
+    return handler
+
+def _handler_armazenamento_bytes(tamanho, imediato=False):
+    """Armazenamento no modo byte. Com imediato=True o valor é o próprio 'a' (sw 100, 4($sp))."""
+    def handler(a, b, c, PC, programa):
+        mem_adress = b + vetor_reg[c]
+        if 0 <= mem_adress <= len(memoria) - tamanho and mem_adress % tamanho == 0:
+            memoria.escrever(mem_adress, tamanho, a if imediato else vetor_reg[a])
+        else:
+            _erro_acesso(mem_adress, tamanho, PC)
+        return PC + 1
+    return handler
+
+def _exec_la(a, b, c, PC, programa):
+    if a != 0:
+        vetor_reg[a] = b
+    return PC + 1
+
+def _exec_syscall(a, b, c, PC, programa):
+    call_code = vetor_reg[1] # $v0
+
+    if call_code == 1: # Imprimir Inteiro
+        escrever_saida(f"{vetor_reg[2]}") # $a0
+
+    elif call_code == 4: # Imprimir String
+        escrever_saida(ler_string(vetor_reg[2]))
+
+    elif call_code == 10: # Sair
+        log("--- Syscall: Fim da Execução ---")
+        _encerrar()
+        return len(programa)
+    else:
+        registrar_erro(f"ERRO: Syscall com código desconhecido ({call_code}) na linha {PC + 1}.")
+    return PC + 1
+
+def _exec_erro(a, b, c, PC, programa):
+    # A mensagem foi montada na pré-decodificação
+    registrar_erro(a)
+    return PC + 1
+
+# --- Desvios e saltos ---
+# O alvo já é o PC (resolvido na montagem): desviar é só devolver o número
+
+def _exec_beq(a, b, c, PC, programa):
+    return c if vetor_reg[a] == vetor_reg[b] else PC + 1
+
+def _exec_bne(a, b, c, PC, programa):
+    return c if vetor_reg[a] != vetor_reg[b] else PC + 1
+
+def _exec_j(a, b, c, PC, programa):
+    return a
+
+def _exec_jal(a, b, c, PC, programa):
+    vetor_reg[a] = PC + 1 # $ra
+    return b
+
+def _exec_jr(a, b, c, PC, programa):
+    # Único alvo que vem de um registrador: precisa ser um PC do programa (ou o fim dele)
+    alvo = vetor_reg[a]
+    if 0 <= alvo <= len(programa):
+        return alvo
+    registrar_erro(f"ERRO: jr para uma instrução inexistente ({alvo}) na linha {PC + 1}")
+    return PC + 1
+
+# Handler de cada instrução do inst_dic
+handlers_dic = {
+    "add": _exec_add,
+    "addi": _exec_addi,
+    "sub": _exec_sub,
+    "mult": _exec_mult,
+    "and": _exec_and,
+    "or": _exec_or,
+    "sll": _exec_sll,
+    "lw": _exec_lw,
+    "sw": _exec_sw,
+    "lui": _exec_lui,
+    "slt": _exec_slt,
+    "slti": _exec_slti,
+    "la": _exec_la,
+    "syscall": _exec_syscall,
+    "lb": _handler_carga_celula(1, True),
+    "lbu": _handler_carga_celula(1, False),
+    "lh": _handler_carga_celula(2, True),
+    "lhu": _handler_carga_celula(2, False),
+    "sb": _handler_armazenamento_celula(1),
+    "sh": _handler_armazenamento_celula(2),
+    "beq": _exec_beq,
+    "bne": _exec_bne,
+    "j": _exec_j,
+    "jal": _exec_jal,
+    "jr": _exec_jr
+}
+
+# No modo byte as instruções de memória trocam de handler (o resto é igual)
+handlers_bytes = {nome: _handler_carga_bytes(tamanho, sinal) for nome, (tamanho, sinal) in CARGAS.items()}
+handlers_bytes.update({nome: _handler_armazenamento_bytes(tamanho) for nome, tamanho in ARMAZENAMENTOS.items()})
+
+def montar_tabela_despacho(anotar=False):
+    """
+    Monta a tabela de despacho para o modo de endereçamento atual.
+    A posição na lista é o próprio código da instrução (mesma ordem do inst_dic)
+    Os códigos extras (OP_SW_IMEDIATO e OP_ERRO) ficam no final, na mesma ordem em que foram criados
+    Com anotar=True os handlers também anotam o que escrevem (ver ESCRITAS ANOTADAS)
+    """
+    if modo_enderecamento == "byte":
+        handlers = {**handlers_dic, **handlers_bytes}
+        sw_imediato = _handler_armazenamento_bytes(4, imediato=True)
+    else:
+        handlers, sw_imediato = handlers_dic, _exec_sw_imediato
+    tabela = [handlers[nome] for nome in inst_dic] + [sw_imediato, _exec_erro]
+    if anotar:
+        tabela = [_handler_anotado(cod, handler) for cod, handler in enumerate(tabela)]
+    return tabela
+
+# --- ESCRITAS ANOTADAS ---
+# Com conjuntos em 'regs_escritos' e 'enderecos_escritos', cada instrução executada anota o registrador ou o
+# endereço de memória que escreveu (a interface redesenha só essas linhas). Desligado (None) por padrão
+# Anotar custa uma chamada a mais por instrução, então os handlers que anotam ficam em uma tabela à parte
+# (tabela_anotada), escolhida uma vez no executar(); os blocos traduzidos ganham uma versão que anota no fim
+# Só os motores de MOTORES_ANOTAM_ESCRITAS anotam: nos outros quem lê os conjuntos precisa olhar tudo
+regs_escritos = None
+enderecos_escritos = None
+
+def _handler_anotado(cod, handler):
+    """Handler que anota o que a instrução 'cod' escreve e depois executa. Devolve o próprio handler se ela não escreve nada."""
+    if cod == OP_ERRO:
+        return handler
+    _, _, reg_write, _, mem_write = inst_dic[NOMES_INSTRUCOES[cod]]
+    if cod == OP_MULT:
+        def anotado(a, b, c, PC, programa):
+            regs_escritos.update((8, 9)) # $HI e $LO
+            return handler(a, b, c, PC, programa)
+    elif mem_write:
+        def anotado(a, b, c, PC, programa):
+            # Endereço calculado antes, como no rastreio (acessos inválidos também são anotados, quem lê ignora)
+            enderecos_escritos.add(b + vetor_reg[c])
+            return handler(a, b, c, PC, programa)
+    elif reg_write:
+        def anotado(a, b, c, PC, programa):
+            # O registrador escrito é sempre o 'a' do registro (no jal, o $ra)
+            regs_escritos.add(a)
+            return handler(a, b, c, PC, programa)
+    else:
+        return handler
+    return anotado
+
+# Nome de cada código de instrução, com os códigos extras no final (o OP_SW_IMEDIATO também é um "sw")
+NOMES_INSTRUCOES = list(inst_dic) + ["sw", "erro"]
+
+tabela_despacho = montar_tabela_despacho()
+tabela_anotada = montar_tabela_despacho(anotar=True)
+
+def decode_execute_tabela(registro, PC, programa):
+    """Executa um registro pré-decodificado pela tabela de despacho. Retorna o novo PC."""
+    cod, a, b, c = registro
+    return tabela_despacho[cod](a, b, c, PC, programa)
+
+# --- TRADUÇÃO EM BLOCOS BÁSICOS ---
+# Para execuções longas, trechos em linha reta do programa viram funções Python geradas
+# Cada bloco guarda os registradores em variáveis locais (r3, r4, ...) e só escreve de volta no vetor_reg no final
+# O código de todos os blocos é gerado como texto e compilado UMA vez com compile()
+#
+# Um bloco termina:
+#   - Antes de uma instrução que não pode ser traduzida (syscall, linha com erro, R-type com destino $zero, jr)
+#   - Logo depois de um desvio/salto (beq, bne, j, jal): ele é a última instrução e o bloco devolve o PC de destino
+#   - Antes do alvo de um desvio/salto, que sempre começa um bloco novo (um laço roda inteiro em blocos)
+#   - Ao atingir TAMANHO_MAX_BLOCO instruções
+# As instruções que não podem ser traduzidas continuam sendo executadas uma a uma pela tabela de despacho
+
+TAMANHO_MAX_BLOCO = 256
+
+# Instruções que mudam o fluxo do PC: sempre fecham um bloco (o bloco devolve o PC de destino)
+OPS_CONTROLE = {OP_BEQ, OP_BNE, OP_J, OP_JAL, OP_JR}
+
+# Blocos já traduzidos, indexados pelo hash do programa pré-decodificado
+# Recarregar o mesmo arquivo reaproveita a tradução
+cache_blocos = {}
+# (programa, anotar, blocos) da última tradução
+_ultima_traducao = (None, None, None)
+
+def hash_programa(programa_decodificado):
+    """Hash do programa pré-decodificado (os endereços do 'la' já resolvidos entram no hash)."""
+    return hashlib.sha256(repr(programa_decodificado).encode('utf-8')).hexdigest()
+
+def _traduzivel(registro):
+    """Diz se o registro pode entrar em um bloco traduzido."""
+    cod, a, b, c = registro
+    # jr: o alvo vem de um registrador e precisa ser conferido, fica com o handler
+    if cod in (OP_SYSCALL, OP_ERRO, OP_JR) or cod in OPS_MEMORIA_PARCIAL:
+        return False
+    # No modo byte os acessos à memória passam pelos handlers (struct + alinhamento)
+    if modo_enderecamento == "byte" and cod in (OP_LW, OP_SW, OP_SW_IMEDIATO):
+        return False
+    # R-type com destino $zero precisa mostrar o aviso, fica com a tabela de despacho
+    if cod in (OP_ADD, OP_SUB, OP_AND, OP_OR, OP_SLT) and a == 0:
+        return False
+    return True
+
+def _traduzir_instrucao(registro, PC, usados, escritos, anotar=False):
+    """
+    Gera as linhas de código Python de uma instrução.
+    'usados' recebe os registradores tocados e 'escritos' os que recebem valor. Com anotar=True os armazenamentos
+    anotam o endereço em 'ms' (ver ESCRITAS ANOTADAS)
+    """
+    cod, a, b, c = registro
+
+    def reg(i):
+        # O $zero é sempre 0, então vira a constante direto
+        if i == 0:
+            return "0"
+        usados.add(i)
+        return f"r{i}"
+
+    def endereco():
+        # Endereço do armazenamento em 'e' (anotado antes da conferência, como nos handlers)
+        return [f"e = {b} + {reg(c)}"] + (["ms.add(e)"] if anotar else [])
+
+    def dst(i, expressao):
+        # Escrita no $zero é ignorada, igual aos handlers
+        if i == 0:
+            return []
+        usados.add(i)
+        escritos.add(i)
+        return [f"r{i} = {expressao}"]
+
+    erro_memoria = f'log(f"ERRO: Acesso a endereço de memória inválido ({{e}}) na linha {PC + 1}")'
+
+    if cod == OP_ADD: return dst(a, f"{reg(b)} + {reg(c)}")
+    if cod == OP_SUB: return dst(a, f"{reg(b)} - {reg(c)}")
+    if cod == OP_AND: return dst(a, f"{reg(b)} & {reg(c)}")
+    if cod == OP_OR: return dst(a, f"{reg(b)} | {reg(c)}")
+    if cod == OP_SLT: return dst(a, f"1 if {reg(b)} < {reg(c)} else 0")
+    if cod == OP_ADDI: return dst(a, f"{reg(b)} + {c}")
+    if cod == OP_SLTI: return dst(a, f"1 if {reg(b)} < {c} else 0")
+    if cod == OP_SLL: return dst(a, f"{reg(b)} << {c}")
+    if cod == OP_LUI: return dst(a, f"{b << 16}")
+    if cod == OP_LA: return dst(a, f"{b}")
+    if cod == OP_MULT:
+        return [f"t = {reg(a)} * {reg(b)}"] + dst(9, "t & 0xFFFFFFFF") + dst(8, "t >> 32")
+    if cod == OP_LW:
+        carga = dst(a, "m[e]") or ["pass"]
+        return [f"e = {b} + {reg(c)}", "if 0 <= e < n:"] + ["    " + l for l in carga] + ["else:", "    " + erro_memoria]
+    if cod == OP_SW:
+        escrita = [f"try: m[e] = {reg(a)}", f"except OverflowError: m[e] = palavra({reg(a)})"]
+        return endereco() + ["if 0 <= e < n:"] + ["    " + l for l in escrita] + ["else:", "    " + erro_memoria]
+    if cod == OP_SW_IMEDIATO:
+        return endereco() + ["if 0 <= e < n:", f"    m[e] = {palavra(a)}", "else:", "    " + erro_memoria]
+    # Desvios e saltos: última instrução do bloco, o PC de destino fica em 'p'
+    if cod == OP_BEQ: return [f"p = {c} if {reg(a)} == {reg(b)} else {PC + 1}"]
+    if cod == OP_BNE: return [f"p = {c} if {reg(a)} != {reg(b)} else {PC + 1}"]
+    if cod == OP_J: return [f"p = {a}"]
+    if cod == OP_JAL: return dst(a, f"{PC + 1}") + [f"p = {b}"]
+    raise ValueError(f"Instrução de código {cod} não pode ser traduzida")
+
+def _gerar_bloco(programa_decodificado, inicio, fim, anotar=False):
+    """Gera o código-fonte da função do bloco [inicio, fim). Com anotar=True ela recebe também os conjuntos (rs, ms)."""
+    usados, escritos = set(), set()
+    corpo = []
+    for PC in range(inicio, fim):
+        corpo += _traduzir_instrucao(programa_decodificado[PC], PC, usados, escritos, anotar)
+
+    regs = sorted(usados)
+    parametros = "r, m, log, rs, ms" if anotar else "r, m, log"
+    linhas = [f"def bloco_{inicio}({parametros}):", "    n = len(m)"]
+    # Carrega os registradores usados em variáveis locais
+    linhas += [f"    r{i} = r[{i}]" for i in regs]
+    linhas += ["    " + l for l in corpo]
+    # Escreve de volta no vetor_reg
+    linhas += [f"    r[{i}] = r{i}" for i in regs]
+    # Os registradores escritos pelo bloco são conhecidos na tradução: anotados de uma vez
+    if anotar and escritos:
+        linhas.append(f"    rs.update({tuple(sorted(escritos))})")
+    # Bloco terminado em desvio/salto devolve o destino calculado, os outros seguem para a instrução seguinte
+    linhas.append("    return p" if programa_decodificado[fim - 1][0] in OPS_CONTROLE else f"    return {fim}")
+    return "\n".join(linhas)
+
+def _lideres(programa_decodificado):
+    """PCs que começam um bloco: os alvos dos desvios e saltos e a instrução depois de cada um (retorno do jal / jr)."""
+    lideres = set()
+    for PC, (cod, a, b, c) in enumerate(programa_decodificado):
+        if cod in OPS_CONTROLE:
+            lideres.add(PC + 1)
+            if cod in (OP_BEQ, OP_BNE):
+                lideres.add(c)
+            elif cod == OP_J:
+                lideres.add(a)
+            elif cod == OP_JAL:
+                lideres.add(b)
+    return lideres
+
+def traduzir_blocos(programa_decodificado, anotar=False):
+    """
+    Traduz o programa em blocos básicos e compila tudo de uma vez.
+    Retorna uma lista do tamanho do programa: na posição de início de cada bloco fica (funcao, tamanho),
+    nas outras posições fica None (executa pela tabela de despacho).
+    Com anotar=True as funções anotam as escritas e recebem (r, m, log, rs, ms) (ver ESCRITAS ANOTADAS).
+    Usa o cache_blocos para não traduzir de novo o mesmo programa.
+    """
+    global _ultima_traducao
+    # Atalho: o mesmo objeto de programa da última chamada não precisa nem ser hasheado de novo
+    if _ultima_traducao[0] is programa_decodificado and _ultima_traducao[1] == anotar:
+        return _ultima_traducao[2]
+
+    # O modo de endereçamento muda quais instruções entram nos blocos
+    chave = hash_programa(programa_decodificado) + "|" + modo_enderecamento + ("|anotado" if anotar else "")
+    if chave in cache_blocos:
+        _ultima_traducao = (programa_decodificado, anotar, cache_blocos[chave])
+        return cache_blocos[chave]
+
+    n = len(programa_decodificado)
+    lideres = _lideres(programa_decodificado)
+    limites = []
+    PC = 0
+    while PC < n:
+        if not _traduzivel(programa_decodificado[PC]):
+            PC += 1
+            continue
+        inicio = PC
+        while PC < n and PC - inicio < TAMANHO_MAX_BLOCO and _traduzivel(programa_decodificado[PC]):
+            if PC > inicio and PC in lideres:
+                break
+            PC += 1
+            if programa_decodificado[PC - 1][0] in OPS_CONTROLE:
+                break
+        limites.append((inicio, PC))
+
+    fonte = "\n\n".join(_gerar_bloco(programa_decodificado, inicio, fim, anotar) for inicio, fim in limites)
+    namespace = {"palavra": palavra}
+    exec(compile(fonte, f"<blocos {chave[:12]}>", "exec"), namespace)
+
+    blocos = [None] * n
+    for inicio, fim in limites:
+        blocos[inicio] = (namespace[f"bloco_{inicio}"], fim - inicio)
+
+    cache_blocos[chave] = blocos
+    _ultima_traducao = (programa_decodificado, anotar, blocos)
+    return blocos
+
+# --- RASTREIO DE EXECUÇÃO ---
+# Com um rastreio.GravadorRastreio em 'gravador_rastreio' (criado com novo_rastreio), o executar() grava um passo por
+# instrução executada: PC, registrador escrito e valor, endereço de memória escrito e valor (formato em rastreio.py)
+# Nesse modo todo passo vai pela tabela de despacho, qualquer que seja o motor (os blocos não param a cada instrução)
+# O que cada instrução escreve é calculado uma vez por programa e vai no cabeçalho do arquivo: no passo sobra
+# guardar o PC e, conforme o tipo do PC, o valor e o endereço escritos, direto nos arrays do lote
+gravador_rastreio = None
+
+ESCREVE_NADA, ESCREVE_REGISTRADOR, ESCREVE_MEMORIA, ESCREVE_HI_LO = (
+    rastreio.ESCREVE_NADA, rastreio.ESCREVE_REGISTRADOR, rastreio.ESCREVE_MEMORIA, rastreio.ESCREVE_HI_LO)
+# Desvios, saltos e syscall (o 10 vai para o fim): o passo guarda o PC seguinte. O jal também escreve o $ra
+DESVIO, DESVIO_REGISTRADOR = rastreio.DESVIO, rastreio.DESVIO + rastreio.ESCREVE_REGISTRADOR
+# Bytes escritos por cada armazenamento no modo byte (no modo palavra é sempre a célula inteira)
+TAMANHO_ARMAZENAMENTO = {OP_SW: 4, OP_SH: 2, OP_SB: 1, OP_SW_IMEDIATO: 4}
+# (programa, alvos, registros com os alvos) do último programa rastreado
+_ultimos_alvos = (None, None, None)
+
+def alvos_rastreio(programa_decodificado):
+    """
+    Lista com o que a instrução de cada PC escreve (ESCREVE_*, DESVIO ou DESVIO_REGISTRADOR) e a mesma lista junto
+    dos registros, (cod, a, b, c, alvo),
+    para o laço do rastreio desempacotar tudo de uma vez. O registrador escrito é sempre o 'a' do registro (no jal, o $ra).
+    """
+    global _ultimos_alvos
+    if _ultimos_alvos[0] is programa_decodificado:
+        return _ultimos_alvos[1], _ultimos_alvos[2]
+    alvos = []
+    for cod, a, b, c in programa_decodificado:
+        if cod == OP_MULT:
+            alvos.append(ESCREVE_HI_LO)
+        elif cod in TAMANHO_ARMAZENAMENTO:
+            alvos.append(ESCREVE_MEMORIA)
+        elif cod == OP_JAL:
+            alvos.append(DESVIO_REGISTRADOR)
+        elif cod in OPS_CONTROLE or cod == OP_SYSCALL:
+            alvos.append(DESVIO)
+        elif cod == OP_ERRO or a == 0:
+            alvos.append(ESCREVE_NADA) # Escrita no $zero é descartada pelos handlers
+        else:
+            alvos.append(ESCREVE_REGISTRADOR)
+    registros = [registro + (alvo,) for registro, alvo in zip(programa_decodificado, alvos)]
+    _ultimos_alvos = (programa_decodificado, alvos, registros)
+    return alvos, registros
+
+def novo_rastreio(caminho, programa_decodificado):
+    """Gravador de rastreio em 'caminho' para o programa, com a tabela do que cada PC escreve já no cabeçalho."""
+    alvos, _ = alvos_rastreio(programa_decodificado)
+    registradores = [rastreio.REGISTRADOR_HI_LO if alvo == ESCREVE_HI_LO else
+                     a if alvo in (ESCREVE_REGISTRADOR, DESVIO_REGISTRADOR) else rastreio.SEM_REGISTRADOR
+                     for alvo, (_, a, _, _) in zip(alvos, programa_decodificado)]
+    return rastreio.GravadorRastreio(caminho, alvos, registradores)
+
+def memoria_escrita(endereco, tamanho):
+    """(endereço, valor) de um armazenamento que acabou de ser executado, ou (SEM_ENDERECO, 0) se o acesso foi inválido."""
+    if modo_enderecamento == "byte":
+        if 0 <= endereco <= len(memoria) - tamanho and endereco % tamanho == 0:
+            return endereco, memoria.ler(endereco, tamanho, False)
+    elif 0 <= endereco < len(memoria):
+        return endereco, memoria[endereco]
+    return rastreio.SEM_ENDERECO, 0
+
+# --- PERFIL DE EXECUÇÃO ---
+# Com um perfil.Perfil em 'perfil_execucao', o executar() conta as execuções de cada PC, as leituras e escritas
+# de cada endereço e as syscalls por código (ver perfil.py)
+# Como no rastreio, é um laço à parte pela tabela de despacho, escolhido uma vez por lote:
+# com o perfil desligado os laços dos motores não têm nenhuma instrução a mais
+perfil_execucao = None
+
+ACESSO_NENHUM, ACESSO_LEITURA, ACESSO_ESCRITA, ACESSO_SYSCALL = range(4)
+# (programa, acessos) do último programa com perfil
+_ultimos_acessos = (None, None)
+
+def acessos_perfil(programa_decodificado):
+    """Lista com o acesso que a instrução de cada PC faz (ACESSO_*), para o laço do perfil."""
+    global _ultimos_acessos
+    if _ultimos_acessos[0] is programa_decodificado:
+        return _ultimos_acessos[1]
+    leituras = {op_cod[nome] for nome in CARGAS}
+    acessos = []
+    for cod, _, _, _ in programa_decodificado:
+        if cod in leituras:
+            acessos.append(ACESSO_LEITURA)
+        elif cod in TAMANHO_ARMAZENAMENTO:
+            acessos.append(ACESSO_ESCRITA)
+        elif cod == OP_SYSCALL:
+            acessos.append(ACESSO_SYSCALL)
+        else:
+            acessos.append(ACESSO_NENHUM)
+    _ultimos_acessos = (programa_decodificado, acessos)
+    return acessos
+
+def novo_perfil(programa_decodificado):
+    """Perfil zerado para o programa e a memória atuais (contagens por endereço em array, menos na paginada)."""
+    return perfil.Perfil(len(programa_decodificado), None if isinstance(memoria, MemoriaPaginada) else len(memoria))
+
+# --- MODELO DE PIPELINE ---
+# Com um pipeline.ModeloPipeline em 'modelo_pipeline', o executar() conta em que ciclo cada instrução passaria
+# pelo ID de um pipeline de 5 estágios, com as paradas por dependência de dados (ver pipeline.py)
+# Mesmo esquema do perfil: laço à parte pela tabela de despacho, sem custo nenhum com o modelo desligado
+modelo_pipeline = None
+
+# (programa, adiantamento, etapas, cargas) do último programa com o modelo ligado
+_ultimas_etapas = (None, None, None, None)
+
+def etapas_pipeline(programa_decodificado, adiantamento):
+    """
+    Tabelas do laço do pipeline: (etapas, cargas).
+
+    - etapas[pc]: (fonte1, fonte2, destino, latência, penalidade). Sem segundo operando a fonte é o $zero, que nunca espera.
+      A penalidade são os ciclos descartados se a instrução mudar o PC (0 para as que não são desvios).
+    - cargas[pc]: True se a instrução é uma carga (MemRead), para separar as paradas de carga-uso.
+    """
+    global _ultimas_etapas
+    if _ultimas_etapas[0] is programa_decodificado and _ultimas_etapas[1] == adiantamento:
+        return _ultimas_etapas[2], _ultimas_etapas[3]
+    latencia_ula, latencia_carga = pipeline.latencias(adiantamento)
+    # $HI e $LO são escritos juntos pelo mult: um lugar só no placar. Destino descartado no índice len(vetor_reg)
+    hi_lo = reg_dic["$LO"]
+    sem_destino = len(vetor_reg)
+    etapas, cargas = [], []
+    for cod, a, b, c in programa_decodificado:
+        fontes, destino, carga = (), sem_destino, False
+        if cod == OP_SW_IMEDIATO:
+            fontes = (c,)
+        elif cod != OP_ERRO:
+            nome = NOMES_INSTRUCOES[cod]
+            alu_src, _, reg_write, mem_read, mem_write = inst_dic[nome]
+            carga = bool(mem_read)
+            if mem_write:
+                fontes = (a, c)
+            elif mem_read:
+                fontes = (c,)
+            elif cod in (OP_BEQ, OP_BNE):
+                fontes = (a, b)
+            elif cod == OP_JR:
+                fontes = (a,)
+            elif cod in (OP_J, OP_JAL):
+                fontes = ()
+            elif cod == OP_SYSCALL:
+                fontes = (reg_dic["$v0"], reg_dic["$a0"])
+            elif nome == "mult":
+                fontes = (a, b)
+            elif nome not in ("lui", "la"):
+                fontes = (b,) if alu_src else (b, c)
+            if reg_write:
+                destino = hi_lo if nome == "mult" else (a if a != 0 else sem_destino)
+        fontes = [hi_lo if f == reg_dic["$HI"] else f for f in fontes] + [0, 0]
+        if cod in (OP_J, OP_JAL):
+            penalidade = pipeline.PENALIDADE_SALTO
+        elif cod in OPS_CONTROLE:
+            penalidade = pipeline.PENALIDADE_DESVIO
+        else:
+            penalidade = 0
+        etapas.append((fontes[0], fontes[1], destino, latencia_carga if carga else latencia_ula, penalidade))
+        cargas.append(carga)
+    _ultimas_etapas = (programa_decodificado, adiantamento, etapas, cargas)
+    return etapas, cargas
+
+def novo_pipeline(adiantamento=True):
+    """Modelo de pipeline zerado, no início da execução."""
+    return pipeline.ModeloPipeline(adiantamento, len(vetor_reg))
+
+# --- CACHES DE DADOS ---
+# Com uma lista de cache_dados.Cache em 'caches_dados', o executar() grava o endereço de cada carga e armazenamento
+# em um fluxo de acessos e, no fim de cada lote, passa o mesmo fluxo por todas as caches (ver cache_dados.py)
+# Mesmo esquema do perfil: laço à parte pela tabela de despacho, sem custo nenhum com as caches desligadas
+caches_dados = None
+
+# Instruções por lote com as caches ligadas: o fluxo de acessos nunca fica inteiro na memória
+PASSOS_POR_LOTE_CACHE = 1 << 16
+
+def alimentar_caches(caches, fluxo):
+    """Passa o fluxo de acessos do lote por todas as caches e o esvazia para o próximo lote."""
+    for cache in caches:
+        cache.processar(fluxo)
+    del fluxo[:]
+
+# --- MODOS DO MOTOR ---
+# "referencia"   : decode_execute original, direto das strings da matriz_programa
+# "decodificado" : registros pré-decodificados com a escada de if/elif
+# "tabela"       : registros pré-decodificados com a tabela de despacho (padrão)
+# "blocos"       : blocos básicos traduzidos para Python, o resto pela tabela de despacho
+# "imagem"       : busca a palavra de 32 bits na imagem montada e decodifica pelas tabelas de opcode/funct
+MOTORES = ("referencia", "decodificado", "tabela", "blocos", "imagem")
+motor = "tabela"
+# Motores que preenchem regs_escritos / enderecos_escritos (os outros não passam pela tabela de despacho)
+MOTORES_ANOTAM_ESCRITAS = ("tabela", "blocos", "imagem")
+
+# Motivo da última parada antecipada do executar(): None, "limite_instrucoes" ou "tempo_esgotado"
+interrupcao = None
+
+# De quantas em quantas instruções o executar() confere o limite e o relógio
+# Conferir a cada instrução deixaria o laço quente bem mais lento
+LOTE_VERIFICACAO = 4096
+
+def executar(matriz_programa, programa_decodificado, data_table, modo=None, limite_instrucoes=None, prazo=None):
+    """
+    Roda o programa do PC atual até o fim, sem imprimir o estado a cada passo.
+    Retorna a quantidade de instruções executadas.
+
+    - limite_instrucoes: para depois de (aproximadamente) essa quantidade de instruções.
+    - prazo: instante de time.monotonic() a partir do qual a execução é interrompida.
+    Se a execução parar antes do fim, o motivo fica na variável global 'interrupcao'.
+    """
+    global PC, interrupcao
+    modo = modo or motor
+    fim = len(matriz_programa)
+    executadas = 0
+    interrupcao = None
+    # Sem limite nem prazo o lote pode ser do tamanho que quiser
+    lote = LOTE_VERIFICACAO if (limite_instrucoes is not None or prazo is not None) else sys.maxsize
+    # Rastreio: cada lote vira um lote do gravador, entregue à thread de escrita assim que termina
+    gravador = gravador_rastreio
+    lote_rastreio = None
+    if gravador is not None:
+        if len(gravador.tipos) != len(programa_decodificado):
+            raise ValueError("O rastreio é de outro programa (crie um com novo_rastreio)")
+        lote = min(lote, rastreio.PASSOS_POR_LOTE)
+        _, registros_rastreio = alvos_rastreio(programa_decodificado)
+        # No modo palavra o valor escrito é a própria célula: sem passar pelo memoria_escrita
+        por_palavra = modo_enderecamento == "palavra"
+        celulas = len(memoria)
+    # Perfil: contadores preenchidos direto pelo laço do perfil
+    contadores = perfil_execucao
+    modelo = modelo_pipeline
+    caches = caches_dados
+    if (gravador is not None) + (contadores is not None) + (modelo is not None) + (caches is not None) > 1:
+        raise ValueError("O rastreio, o perfil, o modelo de pipeline e as caches de dados não podem ser ligados ao mesmo tempo")
+    if contadores is not None:
+        if len(contadores.execucoes) != len(programa_decodificado):
+            raise ValueError("O perfil é de outro programa (crie um com novo_perfil)")
+        acessos = acessos_perfil(programa_decodificado)
+        execucoes, leituras, escritas, syscalls = contadores.execucoes, contadores.leituras, contadores.escritas, contadores.syscalls
+        celulas = len(memoria)
+    # Pipeline: o placar e as contagens ficam em variáveis locais e voltam para o modelo no finally
+    if modelo is not None:
+        etapas, cargas = etapas_pipeline(programa_decodificado, modelo.adiantamento)
+        disponivel, paradas_por_pc = modelo.disponivel, modelo.paradas_por_pc
+        ciclo, paradas, paradas_carga, anterior = modelo.ciclo, modelo.paradas, modelo.paradas_carga, modelo.anterior
+        descartes = modelo.descartes
+    # Caches: cada acesso vira (endereço em bytes << 1) | escrita = endereço * passo_fluxo + (acesso - ACESSO_LEITURA)
+    if caches is not None:
+        lote = min(lote, PASSOS_POR_LOTE_CACHE)
+        acessos = acessos_perfil(programa_decodificado)
+        celulas = len(memoria)
+        passo_fluxo = 2 if modo_enderecamento == "byte" else 8
+        fluxo = array('q')
+    # Rastreio, perfil, pipeline e caches vão sempre pela tabela: os blocos nem precisam ser traduzidos
+    instrumentado = gravador is not None or contadores is not None or modelo is not None or caches is not None
+
+    # Escritas anotadas: outra tabela de despacho e outra tradução dos blocos, o laço é o mesmo
+    anotar = regs_escritos is not None
+    tabela = tabela_anotada if anotar else tabela_despacho
+    programa = programa_decodificado
+    blocos = traduzir_blocos(programa_decodificado, anotar) if modo == "blocos" and not instrumentado else None
+    if modo == "imagem":
+        imagem, extras = montar_programa(matriz_programa, data_table)
+        decodificar_palavra = montador.decodificar_palavra
+        cod_por_nome = COD_POR_NOME
+    pc = PC
+
+    try:
+        while pc < fim:
+            # --- Confere o orçamento antes de cada lote ---
+            if limite_instrucoes is not None and executadas >= limite_instrucoes:
+                interrupcao = "limite_instrucoes"
+                break
+            if prazo is not None and time.monotonic() >= prazo:
+                interrupcao = "tempo_esgotado"
+                break
+            parada = executadas + lote
+            if limite_instrucoes is not None:
+                parada = min(parada, limite_instrucoes)
+
+            if gravador is not None:
+                # Arrays pré-alocados do lote: conforme o tipo do PC, o passo guarda o valor e o endereço escritos
+                # e o PC seguinte (só nos desvios); nos outros o leitor refaz o PC a partir do PC inicial do lote
+                lote_rastreio = valores, enderecos, destinos = gravador.novo_lote()
+                pc_inicial = pc
+                passos = quantidade_valores = quantidade_enderecos = quantidade_destinos = 0
+                passos_lote = parada - executadas
+                while pc < fim and passos < passos_lote:
+                    cod, a, b, c, alvo = registros_rastreio[pc]
+                    if alvo == ESCREVE_REGISTRADOR:
+                        pc = tabela[cod](a, b, c, pc, matriz_programa)
+                        try:
+                            valores[quantidade_valores] = vetor_reg[a]
+                        except OverflowError:
+                            # Registrador com mais de 64 bits (ex: sll seguidos): grava o valor reduzido a 64 bits,
+                            # como uma célula da memória guardaria
+                            valores[quantidade_valores] = palavra(vetor_reg[a])
+                        quantidade_valores += 1
+                    elif alvo == ESCREVE_NADA:
+                        pc = tabela[cod](a, b, c, pc, matriz_programa)
+                    elif alvo == DESVIO:
+                        pc = tabela[cod](a, b, c, pc, matriz_programa)
+                        destinos[quantidade_destinos] = pc
+                        quantidade_destinos += 1
+                    elif alvo == ESCREVE_MEMORIA:
+                        # Endereço calculado antes: o armazenamento não muda o registrador base
+                        endereco = b + vetor_reg[c]
+                        pc = tabela[cod](a, b, c, pc, matriz_programa)
+                        if por_palavra and 0 <= endereco < celulas:
+                            enderecos[quantidade_enderecos] = endereco
+                            valores[quantidade_valores] = memoria[endereco]
+                        else:
+                            enderecos[quantidade_enderecos], valores[quantidade_valores] = memoria_escrita(endereco, TAMANHO_ARMAZENAMENTO[cod])
+                        quantidade_enderecos += 1
+                        quantidade_valores += 1
+                    elif alvo == ESCREVE_HI_LO:
+                        pc = tabela[cod](a, b, c, pc, matriz_programa)
+                        try:
+                            valores[quantidade_valores] = (vetor_reg[8] << 32) | vetor_reg[9]
+                        except OverflowError:
+                            valores[quantidade_valores] = palavra((vetor_reg[8] << 32) | vetor_reg[9])
+                        quantidade_valores += 1
+                    else:
+                        # jal: $ra e o PC de destino
+                        pc = tabela[cod](a, b, c, pc, matriz_programa)
+                        valores[quantidade_valores] = vetor_reg[a]
+                        destinos[quantidade_destinos] = pc
+                        quantidade_valores += 1
+                        quantidade_destinos += 1
+                    passos += 1
+                executadas += passos
+                lote_rastreio = None
+                gravador.enviar((valores, enderecos, destinos), pc_inicial, passos, quantidade_valores, quantidade_enderecos, quantidade_destinos)
+            elif contadores is not None:
+                while pc < fim and executadas < parada:
+                    cod, a, b, c = programa[pc]
+                    execucoes[pc] += 1
+                    acesso = acessos[pc]
+                    if acesso:
+                        if acesso == ACESSO_SYSCALL:
+                            syscalls[vetor_reg[1]] += 1
+                        else:
+                            # Endereço calculado antes: uma carga pode sobrescrever o próprio registrador base
+                            endereco = b + vetor_reg[c]
+                            if 0 <= endereco < celulas:
+                                (leituras if acesso == ACESSO_LEITURA else escritas)[endereco] += 1
+                    pc = tabela[cod](a, b, c, pc, matriz_programa)
+                    executadas += 1
+            elif modelo is not None:
+                while pc < fim and executadas < parada:
+                    cod, a, b, c = programa[pc]
+                    fonte1, fonte2, destino, latencia, penalidade = etapas[pc]
+                    ciclo += 1
+                    if disponivel[fonte1] > ciclo or disponivel[fonte2] > ciclo:
+                        # Parada: a instrução fica no ID até o último operando ficar disponível
+                        espera = max(disponivel[fonte1], disponivel[fonte2]) - ciclo
+                        ciclo += espera
+                        paradas += espera
+                        paradas_por_pc[pc] = paradas_por_pc.get(pc, 0) + espera
+                        if anterior >= 0 and cargas[anterior] and etapas[anterior][2] in (fonte1, fonte2):
+                            paradas_carga += espera
+                    disponivel[destino] = ciclo + latencia
+                    anterior = pc
+                    pc = tabela[cod](a, b, c, pc, matriz_programa)
+                    if penalidade and pc != anterior + 1:
+                        # Desvio tomado: as instruções buscadas depois dele são descartadas
+                        ciclo += penalidade
+                        descartes += penalidade
+                    executadas += 1
+            elif caches is not None:
+                anotar = fluxo.append
+                while pc < fim and executadas < parada:
+                    cod, a, b, c = programa[pc]
+                    acesso = acessos[pc]
+                    if acesso == ACESSO_LEITURA or acesso == ACESSO_ESCRITA:
+                        # Endereço calculado antes: uma carga pode sobrescrever o próprio registrador base
+                        endereco = b + vetor_reg[c]
+                        if 0 <= endereco < celulas:
+                            anotar(endereco * passo_fluxo + acesso - ACESSO_LEITURA)
+                    pc = tabela[cod](a, b, c, pc, matriz_programa)
+                    executadas += 1
+                alimentar_caches(caches, fluxo)
+            elif modo == "referencia":
+                while pc < fim and executadas < parada:
+                    pc = decode_execute(matriz_programa[pc], pc, data_table, matriz_programa)
+                    executadas += 1
+            elif modo == "decodificado":
+                while pc < fim and executadas < parada:
+                    pc = decode_execute_decodificado(programa[pc], pc, matriz_programa)
+                    executadas += 1
+            elif modo == "blocos":
+                while pc < fim and executadas < parada:
+                    bloco = blocos[pc]
+                    # Bloco que passaria do limite é executado instrução por instrução pela tabela
+                    if bloco is not None and executadas + bloco[1] <= parada:
+                        funcao, tamanho = bloco
+                        if anotar:
+                            pc = funcao(vetor_reg, memoria, registrar_erro, regs_escritos, enderecos_escritos)
+                        else:
+                            pc = funcao(vetor_reg, memoria, registrar_erro)
+                        executadas += tamanho
+                    else:
+                        cod, a, b, c = programa[pc]
+                        pc = tabela[cod](a, b, c, pc, matriz_programa)
+                        executadas += 1
+            elif modo == "imagem":
+                while pc < fim and executadas < parada:
+                    # Busca -> decodificação -> execução, como no processador
+                    nome, a, b, c = decodificar_palavra(imagem[pc], extras, pc)
+                    pc = tabela[cod_por_nome[nome]](a, b, c, pc, matriz_programa)
+                    executadas += 1
+            else:
+                # Laço mais quente do simulador, só variáveis locais
+                while pc < fim and executadas < parada:
+                    cod, a, b, c = programa[pc]
+                    pc = tabela[cod](a, b, c, pc, matriz_programa)
+                    executadas += 1
+    finally:
+        PC = pc
+        if lote_rastreio is not None:
+            # Exceção no meio de um lote rastreado: os passos que já terminaram não se perdem
+            gravador.enviar(lote_rastreio, pc_inicial, passos, quantidade_valores, quantidade_enderecos, quantidade_destinos)
+        if modelo is not None:
+            modelo.ciclo, modelo.paradas, modelo.paradas_carga, modelo.anterior = ciclo, paradas, paradas_carga, anterior
+            modelo.descartes = descartes
+            modelo.instrucoes += executadas
+        if caches is not None and fluxo:
+            # Exceção no meio de um lote: os acessos que já aconteceram também contam
+            alimentar_caches(caches, fluxo)
+        # A saída que ainda estiver no buffer vai para o stdout antes de voltar (mesmo com exceção)
+        descarregar_saida()
+    return executadas
+
+
+# --- LINHA DE COMANDO ---
+
+def estado_json(arquivo, executadas):
+    """Monta o dicionário com o estado final de uma execução (para o --json)."""
+    return {
+        "arquivo": arquivo,
+        "instrucoes_executadas": executadas,
+        "PC": PC,
+        "registradores": {nome: vetor_reg[idx] for nome, idx in reg_dic.items()},
+        # Só as células diferentes de zero, a memória pode ser grande
+        "memoria": {"layout": layout_memoria, "enderecamento": modo_enderecamento, "tamanho": len(memoria), "celulas": {str(i): v for i, v in celulas_nao_zero()}},
+        "erros": list(erros),
+    }
+
+def simular_arquivo(arquivo, modo, rastro=False, salvar=False, gravar_rastreio=False, exportar_perfil=None):
+    """
+    Carrega e roda um arquivo .s (ou .mbin) do início ao fim. Retorna a quantidade de instruções executadas ou None.
+
+    - salvar: grava a imagem .mbin do programa ao lado do arquivo, antes de executar.
+    - gravar_rastreio: grava o rastreio de execução (.mtr) ao lado do arquivo, ver rastreio.py.
+    - exportar_perfil: "json" ou "csv", grava o perfil da execução ao lado do arquivo, ver perfil.py.
+    """
+    global perfil_execucao
+    resetar_estado()
+    # Lê, separa e pré-decodifica (ou pega pronto do cache de programas)
+    matriz_programa, data_table, programa_decodificado = carregar_programa(arquivo)
+    if matriz_programa is None:
+        return None
+    if salvar and not arquivo.endswith(imagem_binaria.EXTENSAO):
+        caminho = os.path.splitext(arquivo)[0] + imagem_binaria.EXTENSAO
+        salvar_imagem(caminho, matriz_programa, data_table, list(erros))
+        log(f"Imagem salva em '{caminho}'")
+
+    if exportar_perfil:
+        perfil_execucao = novo_perfil(programa_decodificado)
+        try:
+            executadas = _simular_com_rastreio(arquivo, matriz_programa, programa_decodificado, data_table, modo, rastro, gravar_rastreio)
+        finally:
+            contadores, perfil_execucao = perfil_execucao, None
+        caminho = os.path.splitext(arquivo)[0] + perfil.EXTENSOES[exportar_perfil]
+        with open(caminho, "w", encoding="utf-8", newline="") as f:
+            exportar = contadores.exportar_json if exportar_perfil == "json" else contadores.exportar_csv
+            exportar(f, matriz_programa, programa_decodificado, NOMES_INSTRUCOES)
+        log(f"Perfil salvo em '{caminho}'")
+        return executadas
+    return _simular_com_rastreio(arquivo, matriz_programa, programa_decodificado, data_table, modo, rastro, gravar_rastreio)
+
+def _simular_com_rastreio(arquivo, matriz_programa, programa_decodificado, data_table, modo, rastro, gravar_rastreio):
+    """Parte do simular_arquivo que abre e fecha o gravador do rastreio em volta da execução."""
+    global gravador_rastreio
+    if not gravar_rastreio:
+        return _simular(matriz_programa, programa_decodificado, data_table, modo, rastro)
+    caminho = os.path.splitext(arquivo)[0] + rastreio.EXTENSAO
+    gravador_rastreio = novo_rastreio(caminho, programa_decodificado)
+    try:
+        return _simular(matriz_programa, programa_decodificado, data_table, modo, rastro)
+    finally:
+        gravador, gravador_rastreio = gravador_rastreio, None
+        gravador.fechar()
+        log(f"Rastreio com {gravador.passos} passos salvo em '{caminho}'")
+
+def _simular(matriz_programa, programa_decodificado, data_table, modo, rastro):
+    """Execução do simular_arquivo: direto pelo motor, ou no modo rastro imprimindo o estado a cada instrução."""
+    if not rastro:
+        return executar(matriz_programa, programa_decodificado, data_table, modo)
+
+    # Modo rastro: o antigo loop de depuração, imprime o estado depois de cada instrução
+    print("--- INÍCIO DA SIMULAÇÃO ---")
     print(f"Estado inicial dos registradores: {vetor_reg}")
     print(f"Tabela de dados encontrada: {data_table}\n")
-     
-    # Loop de execução 
-    while PC < len(matriz_programa): 
-        instrucao_atual = matriz_programa[PC] 
-        print(f"PC={PC}: Executando -> {' '.join(instrucao_atual)}") 
-         
-        PC = decode_execute(instrucao_atual, PC, data_table, matriz_programa) 
-         
-        # Imprime o estado após a instrução (para depuração) 
+    executadas = 0
+    while PC < len(matriz_programa):
+        instrucao_atual = matriz_programa[PC]
+        print(f"PC={PC}: Executando -> {' '.join(instrucao_atual)}")
+        # Um passo pelo executar(): a saída é descarregada junto da instrução que a gerou
+        # e, com o --gravar-rastreio, o passo também vai para o arquivo
+        executadas += executar(matriz_programa, programa_decodificado, data_table, "tabela", limite_instrucoes=1)
+        # Imprime o estado após a instrução (para depuração)
         print(f"  Registradores: $v0={vetor_reg[reg_dic['$v0']]} $a0={vetor_reg[reg_dic['$a0']]}\
-                $t0={vetor_reg[reg_dic['$t0']]} $t1={vetor_reg[reg_dic['$t1']]}") 
-        print("-" * 20) 
-
-    print("\n--- FIM DA SIMULAÇÃO ---") 
+                $t0={vetor_reg[reg_dic['$t0']]} $t1={vetor_reg[reg_dic['$t1']]}")
+        print("-" * 20)
+    print("\n--- FIM DA SIMULAÇÃO ---")
     print(f"Estado final dos registradores: {vetor_reg}")
-    print(f"Estado final da memória (primeiros 32 bytes): {memoria[:32]}")
+    print(f"Estado final da memória (primeiras 32 células da .data): {list(memoria[base_dados:base_dados + 32])}")
+    return executadas
+
+def tamanho_memoria(texto):
+    """Converte '4096', '64K' ou '1M' em quantidade de células (usado pelo argparse)."""
+    import argparse
+    multiplicadores = {"K": 1024, "M": 1024 * 1024}
+    texto = texto.strip().upper()
+    try:
+        if texto[-1:] in multiplicadores:
+            tamanho = int(texto[:-1]) * multiplicadores[texto[-1]]
+        else:
+            tamanho = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamanho de memória inválido: '{texto}'")
+    if tamanho < 1:
+        raise argparse.ArgumentTypeError("a memória precisa ter pelo menos 1 célula")
+    return tamanho
+
+def configuracao_cache(texto):
+    """Converte 'CAP:LINHA[:VIAS[:POLITICA]]' em uma cache_dados.Cache (usado pelo argparse)."""
+    import argparse
+    try:
+        return cache_dados.ler_configuracao(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando. Retorna o código de saída do processo."""
+    global silencioso, pasta_cache_disco, modelo_pipeline, caches_dados
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulador MiniMIPS sem interface gráfica.")
+    parser.add_argument("arquivos", nargs="*", default=[file_path], help="Um ou mais arquivos .s ou imagens .mbin (padrão: TESTES_ASSEMBLY/teste-1.s)")
+    parser.add_argument("-q", "--silencioso", action="store_true", help="Imprime apenas a saída das syscalls do programa simulado (erros e os resumos do --pipeline / --cache-dados vão para o stderr)")
+    parser.add_argument("--motor", choices=MOTORES, default="blocos", help="Motor de execução (padrão: blocos)")
+    parser.add_argument("--rastro", action="store_true", help="Imprime o estado dos registradores depois de cada instrução")
+    parser.add_argument("--cache-disco", metavar="PASTA", default=pasta_cache_disco, help="Pasta do cache de programas em disco (padrão: variável MINIMIPS_CACHE)")
+    parser.add_argument("--memoria", type=tamanho_memoria, default=TAMANHO_MEMORIA_PADRAO, metavar="CELULAS",
+                        help=f"Quantidade de células da memória, aceita sufixo K/M (padrão: {TAMANHO_MEMORIA_PADRAO})")
+    parser.add_argument("--layout", choices=tuple(LAYOUTS_MEMORIA), default="compacto",
+                        help="Layout de memória: compacto (.data em 0), mars ou spim (endereços de 32 bits, memória paginada)")
+    parser.add_argument("--enderecamento", choices=MODOS_ENDERECAMENTO, default="palavra",
+                        help="palavra: um valor inteiro por endereço (padrão); byte: endereços de byte, como no MIPS real")
+    parser.add_argument("--ordem", choices=("little", "big"), default="little", help="Ordem dos bytes das palavras no modo byte (padrão: little)")
+    parser.add_argument("--salvar-imagem", action="store_true", help="Salva a imagem binária (.mbin) de cada .s ao lado dele, antes de executar")
+    parser.add_argument("--gravar-rastreio", action="store_true",
+                        help="Grava o rastreio de execução (.mtr) de cada arquivo ao lado dele (CSV com o rastreio.py)")
+    parser.add_argument("--perfil", choices=tuple(perfil.EXTENSOES),
+                        help="Grava o perfil da execução de cada arquivo (execuções por PC e por instrução, syscalls, acessos à memória) ao lado dele")
+    parser.add_argument("--pipeline", choices=("adiantamento", "sem-adiantamento"),
+                        help="Conta os ciclos de um pipeline de 5 estágios, com ou sem adiantamento (CPI, paradas e bolhas de cada arquivo)")
+    parser.add_argument("--cache-dados", action="append", type=configuracao_cache, metavar="CAP:LINHA[:VIAS[:POLITICA]]",
+                        help="Simula uma cache de dados com os lw/sw de cada arquivo, ex: 4K:32 ou 8K:64:4:lru "
+                             f"(políticas: {', '.join(cache_dados.POLITICAS)}). Pode ser repetido: todas veem o mesmo fluxo de acessos")
+    parser.add_argument("--penalidade-falha", type=int, default=cache_dados.PENALIDADE_FALHA, metavar="CICLOS",
+                        help=f"Ciclos a mais de uma falha na cache, para o AMAT (padrão: {cache_dados.PENALIDADE_FALHA})")
+    parser.add_argument("--json", metavar="ARQUIVO", help="Salva registradores e memória finais em JSON ('-' para o stdout)")
+    args = parser.parse_args(argv)
+    if bool(args.perfil) + args.gravar_rastreio + bool(args.pipeline) + bool(args.cache_dados) > 1:
+        parser.error("--perfil, --gravar-rastreio, --pipeline e --cache-dados não podem ser usados juntos")
+
+    silencioso = args.silencioso
+    pasta_cache_disco = args.cache_disco
+    configurar_memoria(args.layout, args.memoria, args.enderecamento, args.ordem)
+    resultados = []
+    codigo_saida = 0
+
+    for arquivo in args.arquivos:
+        log(f"=== {arquivo} ===")
+        if args.pipeline:
+            modelo_pipeline = novo_pipeline(args.pipeline == "adiantamento")
+        if args.cache_dados:
+            # Caches vazias para cada arquivo, com as mesmas configurações
+            caches_dados = [cache_dados.Cache(c.capacidade, c.tamanho_linha, c.associatividade, c.politica,
+                                              penalidade_falha=args.penalidade_falha) for c in args.cache_dados]
+        try:
+            executadas = simular_arquivo(arquivo, args.motor, args.rastro, args.salvar_imagem, args.gravar_rastreio, args.perfil)
+        finally:
+            modelo, modelo_pipeline = modelo_pipeline, None
+            caches, caches_dados = caches_dados, None
+        if executadas is None or erros:
+            codigo_saida = 1
+        resultados.append(estado_json(arquivo, executadas))
+        if modelo is not None and executadas is not None:
+            log_resultado(modelo.resumo())
+            resultados[-1]["pipeline"] = modelo.relatorio()
+        if caches is not None and executadas is not None:
+            for cache in caches:
+                log_resultado(cache.resumo())
+            resultados[-1]["caches_dados"] = [cache.relatorio() for cache in caches]
+
+    if args.json:
+        texto = json.dumps(resultados if len(resultados) > 1 else resultados[0], ensure_ascii=False, indent=2)
+        if args.json == "-":
+            print(texto)
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(texto)
+
+    return codigo_saida
+
+
+# EXECUÇÃO DO PROGRAMA:
+# Só roda quando o arquivo é executado diretamente (python back_end.py arquivo.s ...)
+# Assim o módulo pode ser importado (ex: benchmark_motores.py) sem simular nada
+
+if __name__ == "__main__":
+    sys.exit(main())
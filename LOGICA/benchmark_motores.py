@@ -0,0 +1,51 @@
+"""Comparação de instruções por segundo entre os motores do back_end"""
+
+# Uso: python benchmark_motores.py [arquivo.s] [repeticoes]
+# Roda o mesmo programa várias vezes em cada motor (referencia, decodificado, tabela, blocos, imagem)
+# Cada repetição começa do instantâneo tirado logo depois do carregamento (back_end.restaurar_estado),
+# então o $sp, o layout e o endereçamento da memória são os que o back_end configurou
+# A saída do programa simulado é descartada para medir só o custo da simulação
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+import back_end
+
+
+def medir(matriz_programa, programa_decodificado, data_table, inicial, modo, repeticoes):
+    """Roda o programa 'repeticoes' vezes no motor 'modo'. Retorna (instruções, segundos)."""
+    total = 0
+    inicio = time.perf_counter()
+    # Descarta os prints das syscalls para não medir o terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticoes):
+            # Volta para o estado logo depois do carregamento
+            back_end.restaurar_estado(inicial)
+            total += back_end.executar(matriz_programa, programa_decodificado, data_table, modo)
+    return total, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    pasta_testes = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "TESTES_ASSEMBLY")
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else os.path.join(pasta_testes, "teste-1.s")
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    if not matriz_programa:
+        sys.exit(1)
+    inicial = back_end.capturar_estado()
+
+    print(f"Arquivo: {arquivo} ({len(matriz_programa)} instruções, {repeticoes} repetições)")
+    resultados = {}
+    for modo in back_end.MOTORES:
+        instrucoes, segundos = medir(matriz_programa, programa_decodificado, data_table, inicial, modo, repeticoes)
+        resultados[modo] = instrucoes / segundos
+        print(f"{modo:<13}: {instrucoes:>9} instruções em {segundos:7.3f}s -> {resultados[modo]:>12,.0f} instr/s")
+
+    base = resultados["referencia"]
+    for modo in back_end.MOTORES[1:]:
+        print(f"Ganho do motor '{modo}' sobre a referência: {resultados[modo] / base:.2f}x")
@@ -0,0 +1,185 @@
+"""Simulador de cache de dados MiniMIPS: acertos, falhas, despejos e AMAT dos lw/sw de uma execução"""
+
+# Ligado pelo back_end (caches_dados / --cache-dados), o motor grava o endereço de cada carga e armazenamento
+# em um fluxo de acessos (array('q') de um lote de instruções). No fim de cada lote o MESMO fluxo passa por
+# todas as caches configuradas, então várias configurações são comparadas em uma única execução
+# O fluxo também pode vir de outro lugar: Cache.processar aceita qualquer iterável de acessos
+#
+# Cada acesso do fluxo é um inteiro: (endereço em bytes << 1) | 1 se for escrita
+# No endereçamento por palavra o back_end multiplica o endereço por 4, então o tamanho da linha é sempre em bytes
+#
+# Modelo: cache de um nível, write-back com write-allocate (a escrita que falha traz a linha para a cache,
+# e uma linha suja só vai para a memória quando é despejada). Cada conjunto é uma lista de linhas na ordem
+# de substituição: a primeira é a próxima a sair (LRU: a menos usada, FIFO: a mais antiga)
+#
+# Configuração na linha de comando: CAPACIDADE:LINHA[:VIAS[:POLITICA]], ex: 4K:32 (mapeamento direto), 8K:64:4:lru
+
+import random
+
+POLITICAS = ("lru", "fifo", "aleatoria")
+# Ciclos de um acerto e ciclos a mais de uma falha (ida à memória), para o AMAT
+TEMPO_ACERTO = 1
+PENALIDADE_FALHA = 100
+
+
+class Cache:
+    """
+    Uma configuração de cache e as suas contagens.
+
+    - capacidade e tamanho_linha em bytes, potências de 2; associatividade = vias por conjunto (1 = mapeamento direto).
+    - politica: "lru", "fifo" ou "aleatoria" (a aleatória usa um random.Random com a 'semente', para repetir o resultado).
+    """
+
+    def __init__(self, capacidade, tamanho_linha=32, associatividade=1, politica="lru",
+                 tempo_acerto=TEMPO_ACERTO, penalidade_falha=PENALIDADE_FALHA, semente=0):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de substituição desconhecida: '{politica}' (use {', '.join(POLITICAS)})")
+        if not _potencia_de_2(tamanho_linha) or associatividade < 1:
+            raise ValueError("O tamanho da linha precisa ser potência de 2 e a cache precisa de pelo menos 1 via")
+        quantidade_conjuntos = capacidade // (tamanho_linha * associatividade)
+        if quantidade_conjuntos * tamanho_linha * associatividade != capacidade or not _potencia_de_2(quantidade_conjuntos):
+            raise ValueError(f"Capacidade {capacidade} não dá um número de conjuntos potência de 2 "
+                             f"com linhas de {tamanho_linha} bytes e {associatividade} vias")
+        self.capacidade = capacidade
+        self.tamanho_linha = tamanho_linha
+        self.associatividade = associatividade
+        self.politica = politica
+        self.tempo_acerto = tempo_acerto
+        self.penalidade_falha = penalidade_falha
+        self._bits_linha = tamanho_linha.bit_length() - 1
+        self._mascara_conjunto = quantidade_conjuntos - 1
+        self._aleatorio = random.Random(semente)
+        self.limpar()
+
+    def limpar(self):
+        """Cache vazia e contagens zeradas."""
+        self.conjuntos = [[] for _ in range(self._mascara_conjunto + 1)]
+        self.sujas = set()  # Linhas modificadas que ainda não voltaram para a memória
+        self.leituras = self.escritas = 0
+        self.falhas_leitura = self.falhas_escrita = 0
+        self.despejos = 0
+        self.escritas_de_volta = 0
+
+    def nome(self):
+        vias = "mapeamento direto" if self.associatividade == 1 else f"{self.associatividade} vias"
+        return f"{_tamanho(self.capacidade)}, linha de {self.tamanho_linha} B, {vias}, {self.politica}"
+
+    def processar(self, fluxo):
+        """Passa os acessos do fluxo ((endereço em bytes << 1) | escrita) pela cache."""
+        # Tudo em variáveis locais: este laço roda uma vez por acesso à memória de cada configuração
+        conjuntos, sujas = self.conjuntos, self.sujas
+        deslocamento, mascara, vias = self._bits_linha + 1, self._mascara_conjunto, self.associatividade
+        lru, aleatoria = self.politica == "lru", self.politica == "aleatoria"
+        sortear = self._aleatorio.randrange
+        escritas = falhas_leitura = falhas_escrita = despejos = escritas_de_volta = 0
+        acessos = 0
+        for acesso in fluxo:
+            acessos += 1
+            linha = acesso >> deslocamento
+            conjunto = conjuntos[linha & mascara]
+            if linha in conjunto:
+                # Acerto: no LRU a linha vai para o fim (a mais recente)
+                if lru and conjunto[-1] != linha:
+                    conjunto.remove(linha)
+                    conjunto.append(linha)
+            else:
+                if acesso & 1:
+                    falhas_escrita += 1
+                else:
+                    falhas_leitura += 1
+                if len(conjunto) >= vias:
+                    vitima = conjunto.pop(sortear(vias) if aleatoria else 0)
+                    despejos += 1
+                    if vitima in sujas:
+                        sujas.remove(vitima)
+                        escritas_de_volta += 1
+                conjunto.append(linha)
+            if acesso & 1:
+                escritas += 1
+                sujas.add(linha)
+        self.leituras += acessos - escritas
+        self.escritas += escritas
+        self.falhas_leitura += falhas_leitura
+        self.falhas_escrita += falhas_escrita
+        self.despejos += despejos
+        self.escritas_de_volta += escritas_de_volta
+
+    def acessos(self):
+        return self.leituras + self.escritas
+
+    def falhas(self):
+        return self.falhas_leitura + self.falhas_escrita
+
+    def taxa_falhas(self):
+        return self.falhas() / self.acessos() if self.acessos() else 0.0
+
+    def amat(self):
+        """Tempo médio de acesso à memória, em ciclos: tempo do acerto + taxa de falhas * penalidade da falha."""
+        return self.tempo_acerto + self.taxa_falhas() * self.penalidade_falha
+
+    def relatorio(self):
+        """Dicionário com a configuração e as contagens (o que vai para o --json)."""
+        return {
+            "configuracao": {"capacidade": self.capacidade, "tamanho_linha": self.tamanho_linha,
+                             "associatividade": self.associatividade, "politica": self.politica},
+            "acessos": self.acessos(),
+            "leituras": self.leituras,
+            "escritas": self.escritas,
+            "acertos": self.acessos() - self.falhas(),
+            "falhas": self.falhas(),
+            "falhas_leitura": self.falhas_leitura,
+            "falhas_escrita": self.falhas_escrita,
+            "taxa_acertos": round(1 - self.taxa_falhas(), 4) if self.acessos() else 0.0,
+            "taxa_falhas": round(self.taxa_falhas(), 4),
+            "despejos": self.despejos,
+            "escritas_de_volta": self.escritas_de_volta,
+            "amat": round(self.amat(), 4),
+        }
+
+    def resumo(self):
+        """Uma linha com o resultado, para o terminal."""
+        acertos = 100 * (1 - self.taxa_falhas()) if self.acessos() else 0.0
+        return (f"Cache ({self.nome()}): {self.acessos()} acessos, {acertos:.2f}% de acertos, {self.falhas()} falhas, "
+                f"{self.despejos} despejos, AMAT {self.amat():.2f} ciclos")
+
+
+def avaliar(fluxo, caches):
+    """Passa o mesmo fluxo de acessos por todas as caches (o fluxo precisa poder ser lido mais de uma vez)."""
+    for cache in caches:
+        cache.processar(fluxo)
+    return caches
+
+
+def ler_configuracao(texto, penalidade_falha=PENALIDADE_FALHA):
+    """
+    Cache a partir de 'CAPACIDADE:LINHA[:VIAS[:POLITICA]]' (capacidade aceita sufixo K/M), ex: '8K:64:4:lru'.
+
+    Erros de formato viram ValueError com a mensagem para o usuário.
+    """
+    partes = texto.strip().lower().split(":")
+    if not 2 <= len(partes) <= 4:
+        raise ValueError(f"configuração de cache inválida: '{texto}' (use CAPACIDADE:LINHA[:VIAS[:POLITICA]])")
+    multiplicadores = {"k": 1024, "m": 1024 * 1024}
+    capacidade = partes[0]
+    try:
+        if capacidade[-1:] in multiplicadores:
+            capacidade = int(capacidade[:-1]) * multiplicadores[capacidade[-1]]
+        else:
+            capacidade = int(capacidade)
+        tamanho_linha = int(partes[1])
+        associatividade = int(partes[2]) if len(partes) > 2 else 1
+    except ValueError:
+        raise ValueError(f"configuração de cache inválida: '{texto}' (capacidade, linha e vias são números)")
+    politica = partes[3] if len(partes) > 3 else "lru"
+    return Cache(capacidade, tamanho_linha, associatividade, politica, penalidade_falha=penalidade_falha)
+
+
+def _potencia_de_2(n):
+    return n > 0 and n & (n - 1) == 0
+
+
+def _tamanho(n):
+    for sufixo, fator in (("MB", 1024 * 1024), ("KB", 1024)):
+        if n >= fator and n % fator == 0:
+            return f"{n // fator} {sufixo}"
+    return f"{n} B"
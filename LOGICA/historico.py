@@ -0,0 +1,117 @@
+"""Histórico de execução MiniMIPS: pontos de retorno periódicos para voltar passos (Step Back)"""
+
+# O motor não guarda o que cada instrução desfez, então voltar no tempo é feito assim:
+#   - a cada 'intervalo' instruções executadas o estado inteiro vira um ponto de retorno (back_end.capturar_estado)
+#   - para voltar ao passo N, o estado do último ponto antes de N é restaurado e as instruções até N são
+#     executadas de novo, sem mostrar a saída. O simulador é determinístico (as syscalls só escrevem),
+#     então a reexecução chega exatamente ao mesmo estado
+# Os pontos compartilham as páginas de memória que não mudaram entre um e outro (ver back_end.Instantaneo)
+# Para o histórico não crescer sem limite em programas de milhões de passos, ele guarda no máximo 'max_pontos'
+# pontos: quando enche, fica só com um a cada dois e o intervalo dobra. Voltar continua custando no máximo
+# um intervalo de reexecução, que cresce devagar com o tamanho da execução
+
+import bisect
+
+import back_end
+
+INTERVALO_PADRAO = 50_000
+MAX_PONTOS_PADRAO = 64
+
+
+class HistoricoExecucao:
+    """
+    Pontos de retorno de uma execução do back_end, do carregamento do programa até o passo atual.
+
+    - iniciar(...): começa o histórico com o estado atual (logo depois de carregar o programa)
+    - executar(...): mesmo que back_end.executar, parando nos pontos de retorno para capturá-los
+    - voltar(passos): volta 'passos' instruções. Retorna em qual passo a máquina ficou
+    """
+
+    def __init__(self, intervalo=INTERVALO_PADRAO, max_pontos=MAX_PONTOS_PADRAO):
+        if intervalo < 1 or max_pontos < 2:
+            raise ValueError("O histórico precisa de intervalo >= 1 e pelo menos 2 pontos")
+        self.intervalo_base = intervalo
+        self.max_pontos = max_pontos
+        self.programa = None
+        self.limpar()
+
+    def limpar(self):
+        """Esquece o programa e todos os pontos."""
+        self.programa = None
+        self.intervalo = self.intervalo_base
+        self.passo = 0     # Instruções executadas desde o carregamento
+        self.passos = []   # Passo de cada ponto, em ordem (para a busca binária)
+        self.pontos = []   # Instantâneo de cada ponto
+
+    def iniciar(self, matriz_programa, programa_decodificado, data_table, modo=None, inicial=None):
+        """
+        Começa um histórico novo para o programa, com o estado atual da máquina como passo 0.
+
+        - inicial: instantâneo do estado atual, se já existir um (evita capturar de novo).
+        """
+        self.limpar()
+        self.programa = (matriz_programa, programa_decodificado, data_table, modo)
+        self.passos.append(0)
+        self.pontos.append(inicial if inicial is not None else back_end.capturar_estado())
+
+    def definir_intervalo(self, intervalo):
+        """Muda o intervalo entre pontos (vale a partir do próximo ponto capturado)."""
+        self.intervalo_base = self.intervalo = max(1, intervalo)
+
+    def executar(self, limite_instrucoes=None, prazo=None):
+        """Roda o programa pelo back_end.executar e captura um ponto a cada 'intervalo' instruções."""
+        if self.programa is None:
+            raise ValueError("Nenhum programa no histórico (chame iniciar primeiro)")
+        matriz_programa, programa_decodificado, data_table, modo = self.programa
+        executadas = 0
+        while True:
+            # Cada chamada para no próximo ponto de retorno (ou antes, pelo limite ou pelo prazo)
+            ate_ponto = self.passos[-1] + self.intervalo - self.passo
+            if limite_instrucoes is not None:
+                ate_ponto = min(ate_ponto, limite_instrucoes - executadas)
+            n = back_end.executar(matriz_programa, programa_decodificado, data_table, modo, ate_ponto, prazo)
+            executadas += n
+            self.passo += n
+            if self.passo >= self.passos[-1] + self.intervalo:
+                self._capturar()
+            # Continua só se parou no ponto de retorno: fim do programa, prazo ou o limite pedido encerram
+            if back_end.interrupcao != "limite_instrucoes" or (limite_instrucoes is not None and executadas >= limite_instrucoes):
+                return executadas
+
+    def _capturar(self):
+        self.pontos.append(back_end.capturar_estado(self.pontos[-1]))
+        self.passos.append(self.passo)
+        if len(self.pontos) > self.max_pontos:
+            # Cheio: fica um ponto a cada dois (o passo 0 sempre fica) e o intervalo dobra
+            self.pontos = self.pontos[::2]
+            self.passos = self.passos[::2]
+            self.intervalo *= 2
+
+    def voltar(self, passos=1):
+        """Volta a máquina 'passos' instruções (no máximo até o carregamento). Retorna o passo em que ela ficou."""
+        if self.programa is None:
+            raise ValueError("Nenhum programa no histórico (chame iniciar primeiro)")
+        alvo = max(0, self.passo - passos)
+        # Último ponto antes do alvo; os pontos depois dele seriam refeitos iguais, então são descartados
+        i = bisect.bisect_right(self.passos, alvo) - 1
+        del self.passos[i + 1:], self.pontos[i + 1:]
+        back_end.restaurar_estado(self.pontos[i])
+        self.passo = self.passos[i]
+
+        # Reexecução até o alvo sem mostrar nada: a saída dessas instruções já foi mostrada da primeira vez
+        matriz_programa, programa_decodificado, data_table, modo = self.programa
+        # O rastreio, o perfil, o pipeline e as caches também ficam desligados: essas instruções já foram contadas
+        instrumentos = (back_end.gravador_rastreio, back_end.perfil_execucao, back_end.modelo_pipeline, back_end.caches_dados)
+        destino = back_end.destino_saida
+        back_end.destino_saida = _descartar
+        back_end.gravador_rastreio = back_end.perfil_execucao = back_end.modelo_pipeline = back_end.caches_dados = None
+        try:
+            self.passo += back_end.executar(matriz_programa, programa_decodificado, data_table, modo, alvo - self.passo)
+        finally:
+            back_end.destino_saida = destino
+            back_end.gravador_rastreio, back_end.perfil_execucao, back_end.modelo_pipeline, back_end.caches_dados = instrumentos
+        return self.passo
+
+
+def _descartar(mensagem):
+    pass
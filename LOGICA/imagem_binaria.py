@@ -0,0 +1,243 @@
+"""Imagem binária de programa MiniMIPS (.mbin): código já montado + .data inicial + tabela de símbolos"""
+
+# Programas grandes (gerados por script) não precisam passar pelo read_arq e pelo montador a cada abertura
+# O arquivo guarda o resultado do carregamento e é aberto com mmap: nada é lido antes de ser usado
+#
+# Formato (tudo little-endian):
+#   cabeçalho (32 bytes) : CABECALHO, ver abaixo
+#   texto                : n_palavras palavras de 32 bits (a imagem do montador), a partir do byte 32
+#   dados                : a .data inicial, a partir do próximo múltiplo de 8
+#                          modo palavra: células int64; modo byte: os bytes como estão na memória
+#   metadados            : JSON UTF-8 com a tabela de símbolos, os rótulos da .text, os registros das palavras 0x3F (extras),
+#                          o layout, o texto das linhas com erro e os avisos do carregamento
+# O texto das instruções não é guardado: o programa aberto é um montador.ProgramaMontado sobre as palavras,
+# que refaz a instrução de cada PC (painel e motor "referencia") só quando ela é pedida
+#
+# O arquivo inteiro é conferido na abertura: cabeçalho (modo, ordem e tamanhos), metadados (nomes de instrução
+# conhecidos e números onde o motor espera números) e os registradores de cada extra e de cada palavra, que
+# precisam existir no vetor_reg. Os registros acabam no código Python gerado pelo motor de blocos e indexam
+# o vetor_reg nos outros motores, então um arquivo adulterado é recusado com ErroImagem em vez de ser executado
+#
+# Qualquer mudança no formato precisa aumentar a VERSAO (arquivos de versões diferentes são recusados)
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+import montador
+
+MAGICO = b"MMIP"
+VERSAO = 3 # 2: rótulos da .text (desvios e saltos); 3: sem o texto das instruções
+EXTENSAO = ".mbin"
+
+# mágico, versão, modo (0 = palavra, 1 = byte), ordem (0 = little, 1 = big), base da .data,
+# quantidade de palavras do texto, tamanho da .data em bytes, tamanho dos metadados em bytes
+CABECALHO = struct.Struct("<4sHBBQIQI")
+
+MODOS = ("palavra", "byte")
+ORDENS = ("little", "big")
+
+
+class ErroImagem(Exception):
+    """Arquivo que não é uma imagem MiniMIPS válida (ou é de outra versão)."""
+
+
+class ImagemPrograma:
+    """
+    Imagem aberta com mmap (somente leitura). Nada é copiado na abertura:
+
+    - palavras: memoryview ('I') do segmento de texto
+    - dados: memoryview do segmento de dados ('q' no modo palavra, bytes no modo byte)
+    - simbolos, rotulos, extras, fonte_erros, avisos, layout: vindos dos metadados
+
+    close() (ou um bloco with) fecha o arquivo mapeado; os memoryviews deixam de valer.
+    """
+
+    def __init__(self, caminho):
+        with open(caminho, "rb") as f:
+            try:
+                self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ErroImagem(f"'{caminho}' está vazio") from None
+        self.palavras = self.dados = None
+        # Qualquer falha na leitura fecha o arquivo mapeado e vira ErroImagem
+        try:
+            with memoryview(self._mapa) as buffer:
+                self._ler(caminho, buffer)
+        except ErroImagem:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            raise ErroImagem(f"'{caminho}' está corrompido ({e})") from None
+
+    def _ler(self, caminho, buffer):
+        if len(buffer) < CABECALHO.size:
+            raise ErroImagem(f"'{caminho}' é curto demais para ser uma imagem")
+        magico, versao, modo, ordem, self.base_dados, n_palavras, tamanho_dados, tamanho_meta = CABECALHO.unpack_from(buffer)
+        if magico != MAGICO:
+            raise ErroImagem(f"'{caminho}' não é uma imagem MiniMIPS")
+        if versao != VERSAO:
+            raise ErroImagem(f"'{caminho}' é uma imagem da versão {versao} (esperada a versão {VERSAO})")
+        if modo >= len(MODOS) or ordem >= len(ORDENS):
+            raise ErroImagem(f"'{caminho}' tem um cabeçalho inválido (modo {modo}, ordem {ordem})")
+        self.enderecamento = MODOS[modo]
+        self.ordem = ORDENS[ordem]
+        if self.enderecamento == "palavra" and tamanho_dados % 8:
+            raise ErroImagem(f"'{caminho}' tem uma .data de {tamanho_dados} bytes (no modo palavra são células de 8 bytes)")
+
+        inicio_dados = _alinhar(CABECALHO.size + 4 * n_palavras)
+        inicio_meta = inicio_dados + tamanho_dados
+        if inicio_meta + tamanho_meta > len(buffer):
+            raise ErroImagem(f"'{caminho}' está truncado")
+
+        # Direto nos atributos (sem variáveis locais), para o close() soltar tudo o que aponta para o arquivo
+        if sys.byteorder != "little":
+            # Máquina big-endian: as palavras e as células precisam ser invertidas (única situação com cópia)
+            self.palavras = _inverter(buffer[CABECALHO.size:CABECALHO.size + 4 * n_palavras], 'I')
+            self.dados = buffer[inicio_dados:inicio_meta]
+            if self.enderecamento == "palavra":
+                self.dados = _inverter(self.dados, 'q')
+        else:
+            self.palavras = buffer[CABECALHO.size:CABECALHO.size + 4 * n_palavras].cast('I')
+            self.dados = buffer[inicio_dados:inicio_meta]
+            if self.enderecamento == "palavra":
+                self.dados = self.dados.cast('q')
+
+        try:
+            meta = json.loads(bytes(buffer[inicio_meta:inicio_meta + tamanho_meta]).decode("utf-8"))
+            self.layout = str(meta["layout"])
+            self.simbolos = _tabela(meta["simbolos"])
+            self.rotulos = _tabela(meta["rotulos"])
+            self.extras = [_registro(registro) for registro in meta["extras"]]
+            self.fonte_erros = {int(PC): str(linha).split() for PC, linha in meta["fonte_erros"].items()}
+            self.avisos = [str(aviso) for aviso in meta["avisos"]]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ErroImagem(f"'{caminho}' tem metadados inválidos ({e})") from None
+
+        # Os registradores das palavras também indexam o vetor_reg (cada palavra diferente é conferida uma vez)
+        try:
+            for palavra in set(self.palavras):
+                _conferir_registradores(montador.decodificar_palavra(palavra, self.extras))
+        except ValueError as e:
+            raise ErroImagem(f"'{caminho}' tem uma instrução inválida ({e})") from None
+        except IndexError:
+            raise ErroImagem(f"'{caminho}' tem uma palavra 0x3F apontando para um extra que não existe") from None
+
+    def matriz_programa(self):
+        """
+        Programa montado (montador.ProgramaMontado) com uma cópia das palavras: funciona como a matriz_programa
+        que o read_arq devolveria e continua valendo depois do close().
+        """
+        programa = montador.ProgramaMontado(self.simbolos, rotulos=self.rotulos)
+        programa.palavras.frombytes(self.palavras.cast('B'))
+        programa.extras = self.extras
+        programa.fonte_erros = dict(self.fonte_erros)
+        return programa
+
+    def close(self):
+        """Fecha o arquivo mapeado. BufferError se alguém ainda usa um pedaço dele (ex: páginas da .data mapeadas)."""
+        if self._mapa.closed:
+            return
+        for nome in ("palavras", "dados"):
+            visao = getattr(self, nome)
+            if isinstance(visao, memoryview):
+                visao.release()
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.close()
+
+
+# Nomes aceitos nos registros dos extras
+NOMES_REGISTRO = frozenset(montador.CAMPOS_REGISTRADOR)
+QUANTIDADE_REGISTRADORES = len(montador.REGISTRADORES)
+
+def _inteiro(valor):
+    if type(valor) is not int:
+        raise ValueError(f"{valor!r} não é um número inteiro")
+    return valor
+
+def _tabela(tabela):
+    """Símbolos ou rótulos: nome -> número."""
+    return {str(nome): _inteiro(valor) for nome, valor in tabela.items()}
+
+def _registro(registro):
+    """Registro (nome, a, b, c) de um extra: nome conhecido e números (o 'a' do erro é a mensagem)."""
+    nome, a, b, c = registro
+    if nome not in NOMES_REGISTRO:
+        raise ValueError(f"instrução desconhecida {nome!r}")
+    return _conferir_registradores((nome, str(a) if nome == montador.ERRO else _inteiro(a), _inteiro(b), _inteiro(c)))
+
+def _conferir_registradores(registro):
+    """Os campos de registrador do registro são índices do vetor_reg (o motor usa o número direto)."""
+    for posicao in montador.CAMPOS_REGISTRADOR[registro[0]]:
+        if not 0 <= registro[1 + posicao] < QUANTIDADE_REGISTRADORES:
+            raise ValueError(f"registrador {registro[1 + posicao]} inexistente em {registro[0]!r}")
+    return registro
+
+def _alinhar(posicao, alinhamento=8):
+    return (posicao + alinhamento - 1) & ~(alinhamento - 1)
+
+def _inverter(buffer, tipo):
+    valores = array(tipo, bytes(buffer))
+    valores.byteswap()
+    return memoryview(valores)
+
+def _little_endian(valores):
+    """Bytes little-endian de um array (as imagens são sempre little-endian)."""
+    if sys.byteorder != "little":
+        valores = array(valores.typecode, valores)
+        valores.byteswap()
+    return valores.tobytes()
+
+
+def _linhas_com_erro(palavras, extras, matriz_programa):
+    """(PC, instrução) das linhas que não foram montadas (o registro delas é um erro nos extras)."""
+    fonte_erros = getattr(matriz_programa, "fonte_erros", None)
+    if fonte_erros is not None:
+        return sorted(fonte_erros.items())
+    return [(PC, matriz_programa[PC]) for PC, palavra in enumerate(palavras)
+            if palavra >> 26 == montador.OPCODE_EXTRA and extras[palavra & 0x3FFFFFF][0] == montador.ERRO]
+
+
+def salvar(caminho, palavras, extras, simbolos, matriz_programa, dados, base_dados,
+           layout="compacto", enderecamento="palavra", ordem="little", avisos=(), rotulos=None):
+    """
+    Grava a imagem.
+
+    - palavras/extras: resultado do montador.montar
+    - matriz_programa: só o texto das linhas com erro é guardado (o resto é refeito das palavras)
+    - rotulos: rótulos da .text (rótulo -> PC); o padrão é o 'rotulos' da própria matriz_programa
+    - dados: a .data inicial (array('q') no modo palavra, bytes/bytearray no modo byte), começando em base_dados
+    """
+    if enderecamento == "palavra":
+        dados = _little_endian(array('q', dados))
+    else:
+        dados = bytes(dados)
+    texto = _little_endian(array('I', palavras))
+    if rotulos is None:
+        rotulos = getattr(matriz_programa, "rotulos", {})
+    meta = json.dumps({
+        "layout": layout,
+        "simbolos": simbolos,
+        "rotulos": rotulos,
+        "extras": [list(registro) for registro in extras],
+        "fonte_erros": {str(PC): " ".join(instrucao) for PC, instrucao in _linhas_com_erro(palavras, extras, matriz_programa)},
+        "avisos": list(avisos),
+    }, ensure_ascii=False).encode("utf-8")
+
+    cabecalho = CABECALHO.pack(MAGICO, VERSAO, MODOS.index(enderecamento), ORDENS.index(ordem),
+                               base_dados, len(palavras), len(dados), len(meta))
+    preenchimento = bytes(_alinhar(len(cabecalho) + len(texto)) - len(cabecalho) - len(texto))
+    with open(caminho, "wb") as f:
+        f.write(cabecalho)
+        f.write(texto)
+        f.write(preenchimento)
+        f.write(dados)
+        f.write(meta)
@@ -0,0 +1,243 @@
+"""Correção em lote: simula vários arquivos .s em paralelo e gera um relatório JSONL ou CSV"""
+
+# Uso: python lote.py entregas/ outro.s --saida relatorio.jsonl --limite 5000000 --tempo 10
+#
+# Cada arquivo vira um job de um ProcessPoolExecutor (um processo por núcleo, por padrão)
+# Cada job roda o motor do back_end (carregar_programa + executar) com:
+#   - um limite de instruções  -> programas que não terminam param sozinhos
+#   - um prazo em segundos     -> conferido dentro do próprio processo a cada lote de instruções
+# O processo pai também confere o prazo (com uma folga): um trabalhador travado fora do executar() é encerrado
+# junto com o pool, que é refeito. Um trabalhador que morre (falta de memória, por exemplo) quebra o pool inteiro;
+# os jobs que estavam rodando voltam para a fila e rodam um de cada vez, para só o arquivo culpado sair como "falha"
+# Os resultados são escritos no relatório assim que cada job termina, na ordem em que terminam
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+import back_end
+import imagem_binaria
+
+CAMPOS_CSV = ["arquivo", "status", "instrucoes", "segundos", "saida", "registradores", "hash_memoria", "erros"]
+
+# Segundos a mais que o processo pai espera além do --tempo antes de encerrar um trabalhador
+FOLGA_PRAZO = 2.0
+
+
+def simular_job(arquivo, limite_instrucoes, tempo_limite, motor, memoria=("compacto", back_end.TAMANHO_MEMORIA_PADRAO, "palavra", "little")):
+    """
+    Roda um arquivo .s dentro do processo trabalhador. Retorna um dicionário com o resultado.
+
+    status: "ok", "limite_instrucoes", "tempo_esgotado", "erro_leitura" ou "falha" (exceção no simulador)
+    memoria: argumentos do back_end.configurar_memoria (layout, tamanho, endereçamento, ordem dos bytes)
+    """
+    inicio = time.monotonic()
+    saida = io.StringIO()
+    resultado = {"arquivo": arquivo, "status": "ok", "instrucoes": 0}
+
+    # No modo silencioso o stdout do back_end é só a saída das syscalls
+    # Os erros já ficam guardados em back_end.erros, o stderr é descartado
+    back_end.silencioso = True
+    try:
+        with contextlib.redirect_stdout(saida), contextlib.redirect_stderr(io.StringIO()):
+            # Reaproveita a memória do job anterior do mesmo processo (configurar_memoria também reinicia o estado)
+            back_end.configurar_memoria(*memoria)
+            # Arquivos repetidos no lote (mesmo conteúdo) saem do cache de programas do processo
+            matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+            if matriz_programa is None:
+                resultado["status"] = "erro_leitura"
+            else:
+                resultado["instrucoes"] = back_end.executar(
+                    matriz_programa, programa_decodificado, data_table, motor,
+                    limite_instrucoes=limite_instrucoes,
+                    prazo=inicio + tempo_limite if tempo_limite else None,
+                )
+                resultado["status"] = back_end.interrupcao or "ok"
+    except Exception as e:
+        # Um programa com problema não pode derrubar o lote inteiro
+        resultado["status"] = "falha"
+        back_end.erros.append(f"{type(e).__name__}: {e}")
+
+    resultado["segundos"] = round(time.monotonic() - inicio, 6)
+    resultado["saida"] = saida.getvalue()
+    resultado["registradores"] = {nome: back_end.vetor_reg[idx] for nome, idx in back_end.reg_dic.items()}
+    resultado["hash_memoria"] = back_end.hash_memoria()
+    resultado["erros"] = list(back_end.erros)
+    return resultado
+
+
+def listar_arquivos(caminhos):
+    """Expande as pastas em arquivos .s e imagens .mbin (ordenados), arquivos soltos entram como estão."""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos += sorted(os.path.join(caminho, nome) for nome in os.listdir(caminho) if nome.endswith((".s", imagem_binaria.EXTENSAO)))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+
+class Relatorio:
+    """Escreve cada resultado no arquivo assim que ele chega (JSONL: um objeto por linha; CSV: uma linha por job)."""
+
+    def __init__(self, arquivo, formato):
+        self.arquivo = arquivo
+        self.formato = formato
+        self.escritor_csv = None
+        if formato == "csv":
+            self.escritor_csv = csv.DictWriter(arquivo, fieldnames=CAMPOS_CSV)
+            self.escritor_csv.writeheader()
+
+    def escrever(self, resultado):
+        if self.formato == "csv":
+            linha = dict(resultado)
+            linha["registradores"] = json.dumps(resultado["registradores"])
+            linha["erros"] = json.dumps(resultado["erros"], ensure_ascii=False)
+            self.escritor_csv.writerow(linha)
+        else:
+            self.arquivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        # Flush a cada job: o relatório pode ser acompanhado enquanto o lote roda
+        self.arquivo.flush()
+
+
+def resultado_sem_job(arquivo, status, erro, segundos=0):
+    """Resultado de um job que não chegou a devolver nada (trabalhador morto ou encerrado pelo prazo)."""
+    return {
+        "arquivo": arquivo, "status": status, "instrucoes": 0, "segundos": round(segundos, 6),
+        "saida": "", "registradores": {}, "hash_memoria": "", "erros": [erro],
+    }
+
+
+def encerrar_pool(pool):
+    """Mata os trabalhadores do pool (o ProcessPoolExecutor não cancela um job que já começou)."""
+    # O Python 3.14 tem terminate_workers(); antes disso os processos só estão em _processes
+    for processo in list((pool._processes or {}).values()):
+        processo.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def rodar_lote(arquivos, relatorio, processos=None, limite_instrucoes=None, tempo_limite=None, motor="blocos",
+               memoria=("compacto", back_end.TAMANHO_MEMORIA_PADRAO, "palavra", "little")):
+    """
+    Distribui os arquivos entre os processos e escreve cada resultado no relatório. Retorna os contadores de status.
+
+    No máximo 'processos' jobs ficam no pool ao mesmo tempo, então cada job começa quando é enviado
+    e o prazo dele (tempo_limite + FOLGA_PRAZO) é contado a partir daí.
+    """
+    processos = processos or os.cpu_count() or 1
+    contagem = {}
+    fila = collections.deque((arquivo, False) for arquivo in arquivos) # (arquivo, roda sozinho)
+    rodando = {} # futuro -> (arquivo, roda sozinho, início)
+    pool = None
+
+    def registrar(resultado):
+        relatorio.escrever(resultado)
+        contagem[resultado["status"]] = contagem.get(resultado["status"], 0) + 1
+
+    def devolver_para_fila(sozinhos):
+        # Quem terminou antes do pool cair entra no relatório; os jobs interrompidos voltam para o começo da fila,
+        # na ordem em que estavam
+        for futuro in list(rodando):
+            if futuro.done() and futuro.exception() is None:
+                rodando.pop(futuro)
+                registrar(futuro.result())
+        fila.extendleft(reversed([(arquivo, sozinho or sozinhos) for arquivo, sozinho, _ in rodando.values()]))
+        rodando.clear()
+
+    try:
+        while fila or rodando:
+            if pool is None:
+                pool = concurrent.futures.ProcessPoolExecutor(max_workers=processos)
+            # Um job que estava no pool quando um trabalhador morreu roda sozinho
+            while fila and len(rodando) < processos and not (fila[0][1] and rodando):
+                arquivo, sozinho = fila.popleft()
+                futuro = pool.submit(simular_job, arquivo, limite_instrucoes, tempo_limite, motor, memoria)
+                rodando[futuro] = (arquivo, sozinho, time.monotonic())
+                if sozinho:
+                    break
+
+            espera = None
+            if tempo_limite:
+                primeiro = min(inicio for _, _, inicio in rodando.values())
+                espera = max(0.0, primeiro + tempo_limite + FOLGA_PRAZO - time.monotonic())
+            prontos, _ = concurrent.futures.wait(rodando, timeout=espera, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            quebrou = False
+            for futuro in prontos:
+                arquivo, sozinho, inicio = rodando.pop(futuro)
+                try:
+                    registrar(futuro.result())
+                except concurrent.futures.process.BrokenProcessPool as e:
+                    quebrou = True
+                    if sozinho:
+                        # Rodando sozinho não tem dúvida: foi este arquivo que derrubou o trabalhador
+                        registrar(resultado_sem_job(arquivo, "falha", f"{type(e).__name__}: {e}", time.monotonic() - inicio))
+                    else:
+                        fila.appendleft((arquivo, True))
+                except Exception as e:
+                    registrar(resultado_sem_job(arquivo, "falha", f"{type(e).__name__}: {e}", time.monotonic() - inicio))
+            if quebrou:
+                devolver_para_fila(sozinhos=True)
+                pool.shutdown(wait=True)
+                pool = None
+                continue
+
+            # Jobs que passaram do prazo sem voltar: o trabalhador está travado fora do executar()
+            agora = time.monotonic()
+            vencidos = [futuro for futuro, (_, _, inicio) in rodando.items()
+                        if tempo_limite and agora >= inicio + tempo_limite + FOLGA_PRAZO]
+            if vencidos:
+                for futuro in vencidos:
+                    arquivo, _, inicio = rodando.pop(futuro)
+                    registrar(resultado_sem_job(arquivo, "tempo_esgotado",
+                                                f"Trabalhador encerrado pelo lote depois de {agora - inicio:.1f}s", agora - inicio))
+                devolver_para_fila(sozinhos=False)
+                encerrar_pool(pool)
+                pool = None
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    return contagem
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula vários arquivos .s em paralelo e gera um relatório.")
+    parser.add_argument("caminhos", nargs="+", help="Arquivos .s / .mbin ou pastas com esses arquivos")
+    parser.add_argument("--saida", default="-", help="Arquivo do relatório ('-' para o stdout, padrão)")
+    parser.add_argument("--formato", choices=("jsonl", "csv"), help="Formato do relatório (padrão: pela extensão, senão jsonl)")
+    parser.add_argument("--processos", type=int, default=None, help="Quantidade de processos (padrão: um por núcleo)")
+    parser.add_argument("--limite", type=int, default=10_000_000, help="Máximo de instruções por arquivo (padrão: 10000000)")
+    parser.add_argument("--tempo", type=float, default=30.0, help="Tempo máximo em segundos por arquivo (padrão: 30)")
+    parser.add_argument("--motor", choices=back_end.MOTORES, default="blocos", help="Motor de execução (padrão: blocos)")
+    parser.add_argument("--memoria", type=back_end.tamanho_memoria, default=back_end.TAMANHO_MEMORIA_PADRAO, metavar="CELULAS",
+                        help=f"Quantidade de células da memória, aceita sufixo K/M (padrão: {back_end.TAMANHO_MEMORIA_PADRAO})")
+    parser.add_argument("--layout", choices=tuple(back_end.LAYOUTS_MEMORIA), default="compacto", help="Layout de memória (padrão: compacto)")
+    parser.add_argument("--enderecamento", choices=back_end.MODOS_ENDERECAMENTO, default="palavra", help="Endereçamento por palavra (padrão) ou por byte")
+    parser.add_argument("--ordem", choices=("little", "big"), default="little", help="Ordem dos bytes no modo byte (padrão: little)")
+    args = parser.parse_args(argv)
+
+    memoria = (args.layout, args.memoria, args.enderecamento, args.ordem)
+    formato = args.formato or ("csv" if args.saida.endswith(".csv") else "jsonl")
+    arquivos = listar_arquivos(args.caminhos)
+    inicio = time.monotonic()
+
+    if args.saida == "-":
+        contagem = rodar_lote(arquivos, Relatorio(sys.stdout, formato), args.processos, args.limite, args.tempo, args.motor, memoria)
+    else:
+        with open(args.saida, "w", encoding="utf-8", newline="") as f:
+            contagem = rodar_lote(arquivos, Relatorio(f, formato), args.processos, args.limite, args.tempo, args.motor, memoria)
+
+    resumo = ", ".join(f"{status}: {n}" for status, n in sorted(contagem.items()))
+    print(f"{len(arquivos)} arquivos em {time.monotonic() - inicio:.2f}s ({resumo})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,481 @@
+"""Montador MiniMIPS: transforma a matriz_programa em uma imagem de código de máquina de 32 bits"""
+
+# O montador trabalha em duas passagens:
+#   1ª passagem: confere cada linha (um registro (nome, a, b, c) por instrução) e já codifica a palavra de 32 bits
+#                Um 'la' cujo rótulo ainda não apareceu (.data depois da .text) fica pendente
+#   2ª passagem: com a tabela de símbolos completa, só as instruções pendentes são codificadas
+#
+# O ProgramaMontado recebe as instruções uma a uma (o read_arq vai lendo o arquivo em streaming pelo ler_fonte),
+# então o programa nunca existe inteiro como texto ou como lista de listas de strings na memória
+#
+# O resultado é um array('I') com UMA palavra por linha da .text (o PC continua sendo o índice da linha)
+# A imagem é a única fonte da verdade: o painel binário da interface formata as palavras da imagem
+# e os motores de execução decodificam as palavras (pelas tabelas TABELA_OPCODE / TABELA_FUNCT)
+#
+# Formatos (os registradores são codificados pelo índice no vetor_reg, o mesmo número que o painel já mostrava):
+#   Tipo R : opcode(6)=0 | rs(5) | rt(5) | rd(5) | shamt(5) | funct(6)
+#   Tipo I : opcode(6)   | rs(5) | rt(5) | imediato(16, com sinal)
+#   Tipo J : opcode(6)   | alvo(26)
+#
+# Desvios e saltos usam os rótulos da .text, resolvidos na montagem para o índice da instrução (o PC):
+#   - beq/bne: o imediato é o deslocamento até o alvo, contado a partir da instrução seguinte (alvo - (PC + 1))
+#   - j/jal  : o campo alvo(26) é o próprio PC do alvo (as instruções são contadas uma a uma, não em bytes)
+#   Um número no lugar do rótulo é o PC do alvo. Na decodificação o alvo volta a ser absoluto, então o motor
+#   só faz 'PC = alvo' e nunca procura um rótulo durante a execução
+#
+# O que não cabe em uma palavra de verdade usa o opcode OPCODE_EXTRA (0x3F, reservado no MIPS32):
+#   - pseudo-instruções ('la' e 'sw' com valor imediato)
+#   - imediatos que não cabem em 16 bits (ou shamt maior que 31)
+#   - linhas com erro (o registro leva a mensagem, mostrada quando o PC chegar na linha)
+# Nesses casos os 26 bits de baixo são o índice do registro na lista 'extras' que acompanha a imagem
+
+import re
+from array import array
+
+# Mesmos índices do reg_dic do simulador
+REGISTRADORES = {
+    "$zero": 0,
+    "$v0": 1,
+    "$a0": 2,
+    "$t0": 3,
+    "$t1": 4,
+    "$t2": 5,
+    "$t3": 6,
+    "$sp": 7,
+    "$HI": 8,
+    "$LO": 9,
+    "$ra": 10,
+}
+
+NOMES_REGISTRADORES = list(REGISTRADORES) # índice -> nome
+
+# Nomes especiais de registro (não são instruções do inst_dic)
+SW_IMEDIATO = "sw_imediato" # sw 100, 4($sp)
+ERRO = "erro"               # (ERRO, mensagem, 0, 0)
+
+# Tipo R: funct de cada instrução (opcode 0)
+FUNCT = {"sll": 0x00, "jr": 0x08, "syscall": 0x0C, "mult": 0x18, "add": 0x20, "sub": 0x22, "and": 0x24, "or": 0x25, "slt": 0x2A}
+# Tipo I e tipo J: opcode de cada instrução
+OPCODE = {
+    "j": 0x02, "jal": 0x03, "beq": 0x04, "bne": 0x05,
+    "addi": 0x08, "slti": 0x0A, "lui": 0x0F,
+    "lb": 0x20, "lh": 0x21, "lw": 0x23, "lbu": 0x24, "lhu": 0x25,
+    "sb": 0x28, "sh": 0x29, "sw": 0x2B,
+}
+OPCODE_EXTRA = 0x3F
+
+CARGAS = ("lw", "lh", "lhu", "lb", "lbu")
+ARMAZENAMENTOS = ("sw", "sh", "sb")
+# Desvios condicionais (alvo no 3º operando) e saltos (alvo no 1º operando)
+DESVIOS = ("beq", "bne")
+SALTOS = ("j", "jal")
+
+# Posições dos registradores no registro (nome, a, b, c) de cada instrução: 0 = a, 1 = b, 2 = c
+CAMPOS_REGISTRADOR = {
+    **dict.fromkeys(("add", "sub", "and", "or", "slt"), (0, 1, 2)),
+    **dict.fromkeys(("mult", "sll", "addi", "slti", *DESVIOS), (0, 1)),
+    **dict.fromkeys((*CARGAS, *ARMAZENAMENTOS), (0, 2)),
+    **dict.fromkeys(("lui", "la", "jal", "jr"), (0,)),
+    SW_IMEDIATO: (2,),
+    **dict.fromkeys(("j", "syscall", ERRO), ()),
+}
+
+
+# --- 1ª PASSAGEM: LINHA -> REGISTRO ---
+
+def registro_da_instrucao(instrucao, PC, simbolos, instrucoes=None, rotulos=None):
+    """
+    Confere uma instrução (lista de strings) e devolve o registro (nome, a, b, c).
+
+    - Registradores viram índices, imediatos passam pelo int() e o 'la' sai com o endereço do símbolo.
+    - Desvios e saltos saem com o PC do alvo, procurado em 'rotulos' (rótulos da .text -> PC).
+    - Linhas inválidas viram (ERRO, mensagem, 0, 0).
+    - 'instrucoes': nomes aceitos (o inst_dic de quem chama); None aceita todas as que o montador conhece.
+    """
+    opcode = instrucao[0]
+    conhecidas = instrucoes if instrucoes is not None else (*FUNCT, *OPCODE, "la")
+    if opcode not in conhecidas:
+        return (ERRO, f"Erro na linha {PC+1}: Instrução '{opcode}' desconhecida.", 0, 0)
+
+    reg = REGISTRADORES
+    try:
+        if opcode in ["add", "sub", "and", "or", "slt"]:
+            return (opcode, reg[instrucao[1]], reg[instrucao[2]], reg[instrucao[3]])
+
+        elif opcode == "mult":
+            return (opcode, reg[instrucao[1]], reg[instrucao[2]], 0)
+
+        elif opcode in ["sll", "addi", "slti"]:
+            return (opcode, reg[instrucao[1]], reg[instrucao[2]], int(instrucao[3]))
+
+        elif opcode == "lui":
+            return (opcode, reg[instrucao[1]], int(instrucao[2]), 0)
+
+        elif opcode in CARGAS or opcode in ARMAZENAMENTOS:
+            reg_temp_name = instrucao[1]
+            offset = int(instrucao[2])
+            idx_src = reg[instrucao[3]]
+
+            if reg_temp_name in reg:
+                return (opcode, reg[reg_temp_name], offset, idx_src)
+
+            if opcode in CARGAS:
+                return (ERRO, f"ERRO DE SINTAXE: '{opcode}' requer um registrador de destino, mas recebeu '{reg_temp_name}' na linha {PC+1}", 0, 0)
+
+            try:
+                # Só o 'sw' aceita um número no lugar do registrador
+                if opcode == "sw":
+                    return (SW_IMEDIATO, int(reg_temp_name), offset, idx_src)
+            except ValueError:
+                pass
+            return (ERRO, f"ERRO DE SINTAXE: Operando '{reg_temp_name}' para '{opcode}' não é um registrador válido nem um número inteiro na linha {PC+1}", 0, 0)
+
+        elif opcode == "la":
+            label_name = instrucao[2]
+            if label_name not in simbolos:
+                return (ERRO, f"ERRO: Etiqueta de dados '{label_name}' não encontrada na linha {PC + 1}.", 0, 0)
+            return (opcode, reg[instrucao[1]], simbolos[label_name], 0)
+
+        elif opcode == "syscall":
+            return (opcode, 0, 0, 0)
+
+        elif opcode in DESVIOS or opcode in SALTOS:
+            rotulo = instrucao[3] if opcode in DESVIOS else instrucao[1]
+            alvo = alvo_do_rotulo(rotulo, rotulos or {})
+            if alvo is None:
+                return (ERRO, f"ERRO: Rótulo '{rotulo}' não encontrado na .text na linha {PC + 1}.", 0, 0)
+            if opcode in DESVIOS:
+                return (opcode, reg[instrucao[1]], reg[instrucao[2]], alvo)
+            if opcode == "jal":
+                # O destino ($ra) fica no 'a', como o registrador escrito de todas as outras instruções
+                return (opcode, reg["$ra"], alvo, 0)
+            return (opcode, alvo, 0, 0)
+
+        elif opcode == "jr":
+            return (opcode, reg[instrucao[1]], 0, 0)
+
+    except (KeyError, IndexError, ValueError) as e:
+        # Registrador inexistente, operando faltando ou imediato que não é número
+        return (ERRO, f"ERRO DE SINTAXE: Instrução '{' '.join(instrucao)}' mal formada na linha {PC+1} ({e!r})", 0, 0)
+
+    return (ERRO, f"Erro na linha {PC+1}: Instrução '{opcode}' não pode ser montada.", 0, 0)
+
+
+def alvo_do_rotulo(rotulo, rotulos):
+    """PC do alvo de um desvio: o do rótulo da .text ou o número escrito no lugar dele. None se não existir."""
+    if rotulo in rotulos:
+        return rotulos[rotulo]
+    try:
+        alvo = int(rotulo)
+    except ValueError:
+        return None
+    return alvo if alvo >= 0 else None
+
+
+# --- 2ª PASSAGEM: REGISTRO -> PALAVRA ---
+
+def _cabe(valor, bits, sinal=True):
+    if sinal:
+        return -(1 << (bits - 1)) <= valor < (1 << (bits - 1))
+    return 0 <= valor < (1 << bits)
+
+def _tipo_r(funct, rs=0, rt=0, rd=0, shamt=0):
+    return (rs << 21) | (rt << 16) | (rd << 11) | (shamt << 6) | funct
+
+def _tipo_i(opcode, rs, rt, imediato):
+    return (opcode << 26) | (rs << 21) | (rt << 16) | (imediato & 0xFFFF)
+
+def _tipo_j(opcode, alvo):
+    return (opcode << 26) | alvo
+
+def codificar(registro, extras, PC=0):
+    """Codifica um registro (da instrução no PC) em uma palavra de 32 bits. O que não cabe vai para 'extras' (opcode 0x3F)."""
+    nome, a, b, c = registro
+    if nome in ["add", "sub", "and", "or", "slt"]:
+        return _tipo_r(FUNCT[nome], rs=b, rt=c, rd=a)
+    if nome == "mult":
+        return _tipo_r(FUNCT[nome], rs=a, rt=b)
+    if nome == "syscall":
+        return _tipo_r(FUNCT[nome])
+    if nome == "jr":
+        return _tipo_r(FUNCT[nome], rs=a)
+    if nome in DESVIOS and _cabe(c - (PC + 1), 16):
+        return _tipo_i(OPCODE[nome], rs=a, rt=b, imediato=c - (PC + 1))
+    if nome == "j" and _cabe(a, 26, sinal=False):
+        return _tipo_j(OPCODE[nome], a)
+    if nome == "jal" and _cabe(b, 26, sinal=False):
+        return _tipo_j(OPCODE[nome], b)
+    if nome == "sll" and _cabe(c, 5, sinal=False):
+        return _tipo_r(FUNCT[nome], rt=b, rd=a, shamt=c)
+    if nome in ["addi", "slti"] and _cabe(c, 16):
+        return _tipo_i(OPCODE[nome], rs=b, rt=a, imediato=c)
+    if nome == "lui" and _cabe(b, 16, sinal=False):
+        return _tipo_i(OPCODE[nome], rs=0, rt=a, imediato=b)
+    if (nome in CARGAS or nome in ARMAZENAMENTOS) and _cabe(b, 16):
+        return _tipo_i(OPCODE[nome], rs=c, rt=a, imediato=b)
+    # Pseudo-instrução, imediato grande ou erro
+    extras.append(registro)
+    return (OPCODE_EXTRA << 26) | (len(extras) - 1)
+
+class ProgramaMontado:
+    """
+    Programa montado, instrução por instrução: a imagem (array('I')) e os registros das palavras 0x3F.
+
+    Também funciona como a antiga matriz_programa: len(programa) e programa[PC] (a instrução em lista de strings,
+    refeita a partir da palavra). Assim nada guarda o texto do programa inteiro: cada PC só é desmontado
+    na primeira vez que é pedido (o motor de referência pede o mesmo PC a cada passo de um laço).
+    """
+
+    def __init__(self, simbolos, instrucoes=None, rotulos=None):
+        self.simbolos = simbolos     # Mesmo dicionário que a data_table, preenchido enquanto o arquivo é lido
+        self.instrucoes = instrucoes # Nomes aceitos (ver registro_da_instrucao)
+        self.rotulos = rotulos if rotulos is not None else {} # Rótulos da .text -> PC da instrução seguinte
+        self.palavras = array('I')
+        self.extras = []
+        self.pendentes = []          # (PC, instrução) dos 'la' e dos desvios com rótulo ainda desconhecido
+        self.fonte_erros = {}        # PC -> instrução original das linhas com erro (não dá para refazer da palavra)
+        self._rotulos = None         # (quantidade de símbolos, endereço -> rótulo) para refazer o 'la'
+        self._rotulos_texto = None   # (quantidade de rótulos, PC -> rótulo) para refazer os desvios
+        self._desmontadas = {}       # PC -> instrução já refeita da palavra (esvaziado quando o programa muda)
+
+    def adicionar_rotulo(self, rotulo):
+        """Rótulo da .text: marca o PC da próxima instrução. ValueError se o rótulo já existir."""
+        if rotulo in self.rotulos:
+            raise ValueError(f"rótulo '{rotulo}' repetido na .text")
+        self.rotulos[rotulo] = len(self.palavras)
+        self._desmontadas.clear()
+
+    def adicionar(self, instrucao):
+        """1ª passagem: confere e codifica uma instrução (lista de strings)."""
+        PC = len(self.palavras)
+        self._desmontadas.clear()
+        if self._pendente(instrucao):
+            self.pendentes.append((PC, instrucao))
+            self.palavras.append(0) # Trocada na finalizar()
+            return
+        self._codificar(PC, instrucao)
+
+    def _pendente(self, instrucao):
+        """'la' de um rótulo da .data ainda não lido, ou desvio para um rótulo da .text mais à frente."""
+        nome = instrucao[0]
+        if nome == "la":
+            return len(instrucao) > 2 and instrucao[2] not in self.simbolos
+        if nome in DESVIOS:
+            return len(instrucao) > 3 and instrucao[3] not in self.rotulos
+        if nome in SALTOS:
+            return len(instrucao) > 1 and instrucao[1] not in self.rotulos
+        return False
+
+    def _codificar(self, PC, instrucao):
+        registro = registro_da_instrucao(instrucao, PC, self.simbolos, self.instrucoes, self.rotulos)
+        if registro[0] == ERRO:
+            self.fonte_erros[PC] = instrucao
+        palavra = codificar(registro, self.extras, PC)
+        if PC == len(self.palavras):
+            self.palavras.append(palavra)
+        else:
+            self.palavras[PC] = palavra
+
+    def finalizar(self):
+        """2ª passagem: resolve os 'la' e os desvios pendentes com as tabelas de símbolos e de rótulos completas."""
+        for PC, instrucao in self.pendentes:
+            self._codificar(PC, instrucao)
+        self.pendentes.clear()
+        # Os símbolos da .data podem ter chegado depois das instruções: os 'la' já desmontados mudam de rótulo
+        self._desmontadas.clear()
+
+    def __len__(self):
+        return len(self.palavras)
+
+    def __getitem__(self, PC):
+        instrucao = self._desmontadas.get(PC)
+        if instrucao is not None:
+            return instrucao
+        if PC in self.fonte_erros:
+            return self.fonte_erros[PC]
+        if self._rotulos is None or self._rotulos[0] != len(self.simbolos):
+            # O primeiro rótulo de cada endereço (reversed: os primeiros sobrescrevem os últimos)
+            self._rotulos = (len(self.simbolos), {endereco: rotulo for rotulo, endereco in reversed(self.simbolos.items())})
+        if self._rotulos_texto is None or self._rotulos_texto[0] != len(self.rotulos):
+            self._rotulos_texto = (len(self.rotulos), {alvo: rotulo for rotulo, alvo in reversed(self.rotulos.items())})
+        instrucao = desmontar(decodificar_palavra(self.palavras[PC], self.extras, PC), self._rotulos[1], self._rotulos_texto[1])
+        self._desmontadas[PC] = instrucao
+        return instrucao
+
+    def __iter__(self):
+        return (self[PC] for PC in range(len(self.palavras)))
+
+
+def montar(matriz_programa, simbolos, instrucoes=None, rotulos=None):
+    """
+    Monta um programa inteiro (lista de instruções). Retorna (imagem, extras):
+    - imagem: array('I') com uma palavra por instrução
+    - extras: registros das palavras com opcode 0x3F
+    - rotulos: rótulos da .text (rótulo -> PC) usados pelos desvios
+    """
+    programa = ProgramaMontado(dict(simbolos), instrucoes, dict(rotulos or {}))
+    for instrucao in matriz_programa:
+        programa.adicionar(instrucao)
+    programa.finalizar()
+    return programa.palavras, programa.extras
+
+
+# --- DECODIFICAÇÃO (PALAVRA -> REGISTRO) ---
+# Tabelas pré-calculadas: opcode (6 bits) e funct (6 bits) indexam direto uma lista de 64 posições
+# Cada posição guarda (nome, extrator) ou None para palavras que não existem no MiniMIPS
+# O extrator recebe também o PC da palavra: o alvo do beq/bne é relativo a ele
+
+def _campos_r3(nome, p, PC):
+    return (nome, (p >> 11) & 31, (p >> 21) & 31, (p >> 16) & 31)
+
+def _campos_mult(nome, p, PC):
+    return (nome, (p >> 21) & 31, (p >> 16) & 31, 0)
+
+def _campos_sll(nome, p, PC):
+    return (nome, (p >> 11) & 31, (p >> 16) & 31, (p >> 6) & 31)
+
+def _campos_syscall(nome, p, PC):
+    return (nome, 0, 0, 0)
+
+def _campos_jr(nome, p, PC):
+    return (nome, (p >> 21) & 31, 0, 0)
+
+def _imediato(p):
+    imediato = p & 0xFFFF
+    return imediato - 0x10000 if imediato & 0x8000 else imediato
+
+def _campos_aritmetica_i(nome, p, PC):
+    return (nome, (p >> 16) & 31, (p >> 21) & 31, _imediato(p))
+
+def _campos_lui(nome, p, PC):
+    return (nome, (p >> 16) & 31, p & 0xFFFF, 0)
+
+def _campos_memoria(nome, p, PC):
+    return (nome, (p >> 16) & 31, _imediato(p), (p >> 21) & 31)
+
+def _campos_desvio(nome, p, PC):
+    return (nome, (p >> 21) & 31, (p >> 16) & 31, PC + 1 + _imediato(p))
+
+def _campos_j(nome, p, PC):
+    return (nome, p & 0x3FFFFFF, 0, 0)
+
+def _campos_jal(nome, p, PC):
+    return (nome, REGISTRADORES["$ra"], p & 0x3FFFFFF, 0)
+
+TABELA_FUNCT = [None] * 64
+TABELA_OPCODE = [None] * 64
+for _nome, _funct in FUNCT.items():
+    TABELA_FUNCT[_funct] = (_nome, {"mult": _campos_mult, "sll": _campos_sll, "syscall": _campos_syscall, "jr": _campos_jr}.get(_nome, _campos_r3))
+for _nome, _opcode in OPCODE.items():
+    TABELA_OPCODE[_opcode] = (_nome, {
+        "addi": _campos_aritmetica_i, "slti": _campos_aritmetica_i, "lui": _campos_lui,
+        "beq": _campos_desvio, "bne": _campos_desvio, "j": _campos_j, "jal": _campos_jal,
+    }.get(_nome, _campos_memoria))
+del _nome, _funct, _opcode
+
+def decodificar_palavra(palavra, extras=(), PC=0):
+    """Decodifica a palavra do PC no registro (nome, a, b, c)."""
+    opcode = palavra >> 26
+    if opcode == OPCODE_EXTRA:
+        return extras[palavra & 0x3FFFFFF]
+    entrada = TABELA_FUNCT[palavra & 0x3F] if opcode == 0 else TABELA_OPCODE[opcode]
+    if entrada is None:
+        return (ERRO, f"Palavra de instrução inválida: 0x{palavra:08x}", 0, 0)
+    nome, extrator = entrada
+    return extrator(nome, palavra, PC)
+
+def decodificar_imagem(imagem, extras=()):
+    """Decodifica a imagem inteira (uma vez, no carregamento)."""
+    return [decodificar_palavra(palavra, extras, PC) for PC, palavra in enumerate(imagem)]
+
+
+# --- EXIBIÇÃO ---
+
+def formatar_palavra(palavra, extras=()):
+    """Texto da palavra para o painel binário, com os campos separados."""
+    opcode = palavra >> 26
+    if opcode == OPCODE_EXTRA:
+        nome = extras[palavra & 0x3FFFFFF][0]
+        if nome == ERRO:
+            return "Erro na tradução (linha inválida)"
+        if nome in ("la", SW_IMEDIATO):
+            return "Pseudo-instrução (não possui formato binário direto)"
+        return "Pseudo-instrução (imediato não cabe no campo)"
+    if opcode in (OPCODE["j"], OPCODE["jal"]):
+        return f"{opcode:06b} {palavra & 0x3FFFFFF:026b} (Tipo J)"
+    if opcode == 0:
+        if (palavra & 0x3F) == FUNCT["syscall"]:
+            return f"{0:06b} {(palavra >> 6) & 0xFFFFF:020b} {palavra & 0x3F:06b} (Syscall)"
+        return (f"{0:06b} {(palavra >> 21) & 31:05b} {(palavra >> 16) & 31:05b} {(palavra >> 11) & 31:05b} "
+                f"{(palavra >> 6) & 31:05b} {palavra & 0x3F:06b} (Tipo R)")
+    return f"{opcode:06b} {(palavra >> 21) & 31:05b} {(palavra >> 16) & 31:05b} {palavra & 0xFFFF:016b} (Tipo I)"
+
+
+def desmontar(registro, rotulos={}, rotulos_texto={}):
+    """
+    Registro (nome, a, b, c) -> instrução em lista de strings, no formato que o read_arq produziria.
+
+    - rotulos: endereço -> rótulo, para o 'la' voltar a ter o nome do rótulo.
+    - rotulos_texto: PC -> rótulo da .text, para os desvios e saltos (sem rótulo o alvo sai como número).
+    """
+    nome, a, b, c = registro
+    r = NOMES_REGISTRADORES
+    if nome in ["add", "sub", "and", "or", "slt"]:
+        return [nome, r[a], r[b], r[c]]
+    if nome == "mult":
+        return [nome, r[a], r[b]]
+    if nome in ["sll", "addi", "slti"]:
+        return [nome, r[a], r[b], str(c)]
+    if nome == "lui":
+        return [nome, r[a], str(b)]
+    if nome in CARGAS or nome in ARMAZENAMENTOS:
+        return [nome, r[a], str(b), r[c]]
+    if nome == SW_IMEDIATO:
+        return ["sw", str(a), str(b), r[c]]
+    if nome == "la":
+        return [nome, r[a], rotulos.get(b, str(b))]
+    if nome in DESVIOS:
+        return [nome, r[a], r[b], rotulos_texto.get(c, str(c))]
+    if nome == "j":
+        return [nome, rotulos_texto.get(a, str(a))]
+    if nome == "jal":
+        return [nome, rotulos_texto.get(b, str(b))]
+    if nome == "jr":
+        return [nome, r[a]]
+    return [nome] # syscall
+
+
+# --- LEITURA DO ARQUIVO .s (STREAMING) ---
+# Uma linha por vez, sem readlines() nem replace() encadeados: uma única expressão regular separa os tokens
+#   - strings entre aspas ficam inteiras (vírgulas e '#' dentro delas são texto)
+#   - '#' fora de aspas começa um comentário (o resto da linha vira um token só, descartado)
+#   - ':' é um token próprio; vírgulas, parênteses e espaços só separam
+# Ex: 'lw $t0, 4($sp) # carrega'  -> ['lw', '$t0', '4', '$sp']
+#     'msg: .asciiz "Oi, #1"'     -> ['msg', ':', '.asciiz', '"Oi, #1"']
+
+RE_TOKEN = re.compile(r'"[^"]*"?|#.*|:|[^\s,()":#]+')
+
+def ler_fonte(linhas):
+    """
+    Gera (seção, tokens, linha) para cada linha com conteúdo dentro de uma seção (.data ou .text).
+
+    'linhas' pode ser o próprio arquivo aberto: nada além da linha atual fica na memória.
+    """
+    secao = None
+    for linha in linhas:
+        tokens = RE_TOKEN.findall(linha)
+        if tokens and tokens[-1][0] == "#":
+            tokens.pop()
+        if not tokens:
+            continue
+        if len(tokens) == 1 and tokens[0] in (".data", ".text"):
+            secao = tokens[0][1:]
+            continue
+        if secao is not None:
+            yield secao, tokens, linha
+
+def dado_da_linha(tokens):
+    """Tokens de uma linha da .data -> (rótulo, diretiva, valores). ValueError se a linha não for 'rótulo: .diretiva ...'."""
+    if len(tokens) < 3 or tokens[1] != ":":
+        raise ValueError("esperado 'rótulo: .diretiva valor'")
+    return tokens[0], tokens[2], tokens[3:]
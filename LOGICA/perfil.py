@@ -0,0 +1,93 @@
+"""Perfil de execução MiniMIPS: onde o programa simulado passa o tempo (pontos quentes)"""
+
+# Ligado pelo back_end (perfil_execucao / --perfil), o motor conta a cada passo:
+#   - execuções por PC                 -> array('q') do tamanho do programa, indexado pelo PC
+#   - leituras e escritas por endereço -> array('q') do tamanho da memória (Counter na memória paginada de 2**32)
+#   - syscalls por código ($v0)        -> Counter (os códigos não são uma faixa contínua)
+# As contagens por instrução (add, lw, ...) não custam nada durante a execução: saem das contagens por PC
+# e do código de cada registro pré-decodificado na hora do relatório
+#
+# Uso sem interface: python back_end.py programa.s --perfil json   (ou csv), grava programa.perfil.json ao lado do .s
+
+import csv
+import heapq
+import json
+from array import array
+from collections import Counter
+
+EXTENSOES = {"json": ".perfil.json", "csv": ".perfil.csv"}
+
+
+class Perfil:
+    """
+    Contadores de uma execução, alocados de uma vez para o programa e a memória.
+
+    - tamanho_memoria: células (ou bytes) da memória contínua; None na memória paginada (contagens em Counter).
+    """
+
+    def __init__(self, tamanho_programa, tamanho_memoria=None):
+        self.execucoes = array('q', bytes(8 * tamanho_programa))
+        if tamanho_memoria is None:
+            self.leituras, self.escritas = Counter(), Counter()
+        else:
+            self.leituras = array('q', bytes(8 * tamanho_memoria))
+            self.escritas = array('q', bytes(8 * tamanho_memoria))
+        self.syscalls = Counter()
+
+    def total(self):
+        """Instruções executadas com o perfil ligado."""
+        return sum(self.execucoes)
+
+    def pontos_quentes(self, quantidade=20):
+        """Os 'quantidade' PCs mais executados, como [(pc, execuções)], do mais executado para o menos."""
+        execucoes = self.execucoes
+        quentes = heapq.nlargest(quantidade, range(len(execucoes)), key=execucoes.__getitem__)
+        return [(pc, execucoes[pc]) for pc in quentes if execucoes[pc]]
+
+    def por_instrucao(self, programa_decodificado, nomes):
+        """Execuções por instrução (nome -> contagem), a partir das contagens por PC. nomes: código -> nome."""
+        contagem = Counter()
+        for (cod, _, _, _), n in zip(programa_decodificado, self.execucoes):
+            if n:
+                contagem[nomes[cod]] += n
+        return dict(contagem.most_common())
+
+    def relatorio(self, matriz_programa, programa_decodificado, nomes):
+        """Dicionário com todas as contagens diferentes de zero (o que vai para o JSON)."""
+        return {
+            "instrucoes": self.total(),
+            "por_pc": [
+                {"pc": pc, "instrucao": " ".join(matriz_programa[pc]), "execucoes": n}
+                for pc, n in enumerate(self.execucoes) if n
+            ],
+            "por_instrucao": self.por_instrucao(programa_decodificado, nomes),
+            "syscalls": {str(codigo): n for codigo, n in sorted(self.syscalls.items())},
+            "leituras": {str(endereco): n for endereco, n in _nao_zero(self.leituras)},
+            "escritas": {str(endereco): n for endereco, n in _nao_zero(self.escritas)},
+        }
+
+    def exportar_json(self, saida, matriz_programa, programa_decodificado, nomes):
+        json.dump(self.relatorio(matriz_programa, programa_decodificado, nomes), saida, ensure_ascii=False, indent=2)
+
+    def exportar_csv(self, saida, matriz_programa, programa_decodificado, nomes):
+        """CSV em uma tabela só: secao (pc, instrucao, syscall, leitura, escrita), chave, instrucao, contagem."""
+        escritor = csv.writer(saida)
+        escritor.writerow(("secao", "chave", "instrucao", "contagem"))
+        for pc, n in enumerate(self.execucoes):
+            if n:
+                escritor.writerow(("pc", pc, " ".join(matriz_programa[pc]), n))
+        for nome, n in self.por_instrucao(programa_decodificado, nomes).items():
+            escritor.writerow(("instrucao", nome, "", n))
+        for codigo, n in sorted(self.syscalls.items()):
+            escritor.writerow(("syscall", codigo, "", n))
+        for endereco, n in _nao_zero(self.leituras):
+            escritor.writerow(("leitura", endereco, "", n))
+        for endereco, n in _nao_zero(self.escritas):
+            escritor.writerow(("escrita", endereco, "", n))
+
+
+def _nao_zero(contagens):
+    """(endereço, contagem) das contagens diferentes de zero, em ordem de endereço."""
+    if isinstance(contagens, Counter):
+        return sorted((endereco, n) for endereco, n in contagens.items() if n)
+    return ((endereco, n) for endereco, n in enumerate(contagens) if n)
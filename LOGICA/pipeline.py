@@ -0,0 +1,85 @@
+"""Modelo de tempo do pipeline MiniMIPS de 5 estágios (IF, ID, EX, MEM, WB): ciclos, CPI e paradas"""
+
+# Ligado pelo back_end (modelo_pipeline / --pipeline), o modelo roda junto do motor funcional: o motor executa
+# as instruções de verdade e o modelo só conta em que ciclo cada uma passaria pelo pipeline
+#
+# Pipeline clássico, uma instrução por ciclo, em ordem. Cada instrução lê os registradores no ID
+# Para cada registrador o modelo guarda o primeiro ciclo em que uma instrução pode estar no ID e já ter o valor
+# ('disponivel'), a partir das latências abaixo. Se algum operando ainda não está disponível, a instrução
+# espera no ID (parada) e uma bolha segue para o EX em cada ciclo de espera
+#   - com adiantamento (forwarding): resultado da ULA vai do EX/MEM para o EX da próxima, sem parada
+#                                    carga só tem o valor no fim do MEM: a instrução seguinte que o usa para 1 ciclo
+#   - sem adiantamento            : o valor só chega pelo banco de registradores, escrito na 1ª metade do WB
+#                                   e lido na 2ª metade do ID: até 2 ciclos de parada
+# Desvios e saltos (previsão de "não tomado"): as instruções buscadas depois de um desvio tomado são descartadas
+#   - beq/bne/jr: o destino só é conhecido no fim do EX, PENALIDADE_DESVIO ciclos descartados quando o PC muda
+#   - j/jal     : o destino está na própria palavra e é conhecido no ID, PENALIDADE_SALTO ciclo descartado
+# Os sinais de controle do inst_dic (RegWrite, MemRead) dizem quem escreve registrador e quem é carga
+# O custo por instrução é uma consulta de tabela e duas comparações; o caminho das paradas é o raro
+
+LATENCIA_ULA_ADIANTAMENTO = 1
+LATENCIA_CARGA_ADIANTAMENTO = 2
+LATENCIA_SEM_ADIANTAMENTO = 3
+# Ciclos do IF da primeira instrução e do EX, MEM e WB da última: o pipeline enchendo e esvaziando
+CICLOS_ENCHIMENTO = 4
+PENALIDADE_DESVIO = 2
+PENALIDADE_SALTO = 1
+
+
+def latencias(adiantamento):
+    """(latência de uma instrução da ULA, latência de uma carga), em ciclos entre o ID dela e o ID de quem usa o valor."""
+    if adiantamento:
+        return LATENCIA_ULA_ADIANTAMENTO, LATENCIA_CARGA_ADIANTAMENTO
+    return LATENCIA_SEM_ADIANTAMENTO, LATENCIA_SEM_ADIANTAMENTO
+
+
+class ModeloPipeline:
+    """
+    Estado e contagens do pipeline ao longo de uma execução (pode ser continuada em vários executar()).
+
+    - adiantamento: True para o pipeline com forwarding.
+    - registradores: tamanho do banco de registradores do motor (o índice 'registradores' é o destino descartado).
+    """
+
+    def __init__(self, adiantamento=True, registradores=10):
+        self.adiantamento = adiantamento
+        self.instrucoes = 0
+        self.ciclo = 0              # Ciclo do ID da última instrução
+        self.paradas = 0            # Ciclos de parada por dependência de dados
+        self.paradas_carga = 0      # Parte das paradas em que o valor vinha de uma carga logo antes (load-use)
+        self.descartes = 0          # Ciclos perdidos com instruções buscadas depois de um desvio tomado
+        self.paradas_por_pc = {}    # PC -> ciclos parados antes dele (só os que pararam)
+        self.anterior = -1          # PC da última instrução que passou pelo modelo
+        self.disponivel = [0] * (registradores + 1)
+
+    def ciclos(self):
+        return self.ciclo + CICLOS_ENCHIMENTO if self.instrucoes else 0
+
+    def cpi(self):
+        return self.ciclos() / self.instrucoes if self.instrucoes else 0.0
+
+    def bolhas(self):
+        """Bolhas que entraram no EX: uma por ciclo de parada e uma por instrução descartada."""
+        return self.paradas + self.descartes
+
+    def relatorio(self, quantidade=10):
+        """Dicionário com as contagens (o que vai para o --json), com os 'quantidade' PCs que mais pararam."""
+        piores = sorted(self.paradas_por_pc.items(), key=lambda item: item[1], reverse=True)[:quantidade]
+        return {
+            "adiantamento": self.adiantamento,
+            "instrucoes": self.instrucoes,
+            "ciclos": self.ciclos(),
+            "cpi": round(self.cpi(), 4),
+            "paradas": self.paradas,
+            "paradas_carga_uso": self.paradas_carga,
+            "descartes_desvio": self.descartes,
+            "bolhas": self.bolhas(),
+            "paradas_por_pc": {str(pc): n for pc, n in piores},
+        }
+
+    def resumo(self):
+        """Uma linha com o resultado, para o terminal."""
+        modo = "com adiantamento" if self.adiantamento else "sem adiantamento"
+        return (f"Pipeline ({modo}): {self.instrucoes} instruções em {self.ciclos()} ciclos, CPI {self.cpi():.3f}, "
+                f"{self.paradas} paradas ({self.paradas_carga} de carga-uso), {self.descartes} descartes por desvio, "
+                f"{self.bolhas()} bolhas")
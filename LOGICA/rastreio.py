@@ -0,0 +1,243 @@
+"""Rastreio de execução MiniMIPS (.mtr): o PC de cada instrução executada e o que ela escreveu"""
+
+# Ligado pelo back_end (gravador_rastreio / --gravar-rastreio), o motor anota a cada passo:
+#   o PC, o registrador escrito e o seu valor, o endereço de memória escrito e o seu valor
+# O que cada instrução escreve (nada, um registrador, a memória ou $HI/$LO) e se ela pode mudar o PC não muda
+# de um passo para outro, então vai uma vez só no cabeçalho, como uma tabela por PC. Cada passo guarda apenas o que varia:
+#   - o valor escrito (8 bytes), se a instrução escreve alguma coisa
+#   - o endereço (8 bytes), se ela escreve na memória
+#   - o PC seguinte (4 bytes), se ela é um desvio/salto ou um syscall (o 10 vai para o fim do programa)
+# Nas outras o PC seguinte é sempre PC + 1, e o leitor refaz a sequência de PCs a partir do PC inicial do lote
+# Um addi ocupa 8 bytes, um beq 4 e uma instrução que não escreve nada 0 (no formato antigo todo passo ocupava 32)
+# O motor preenche três arrays pré-alocados por lote (valores, endereços e PCs de destino) por atribuição direta, e
+# cada lote cheio é entregue a uma thread que só escreve no arquivo e devolve os arrays para serem reaproveitados
+# A fila entre o motor e a thread tem tamanho máximo: se o disco não acompanhar, o motor espera,
+# então o rastreio nunca fica inteiro na memória (no máximo MAX_LOTES_PENDENTES lotes)
+#
+# Formato (tudo little-endian):
+#   cabeçalho : CABECALHO (mágico, versão, instruções do programa)
+#   tabela    : o tipo de cada PC (ESCREVE_*, mais DESVIO, 1 byte cada) e o registrador escrito por cada PC (1 byte com sinal cada)
+#   lotes     : LOTE (PC inicial, passos, valores, endereços, destinos), seguido dos valores e dos endereços
+#               (64 bits com sinal) e dos PCs de destino (32 bits)
+# O ler() devolve os passos com os mesmos campos de sempre (CAMPOS), juntando o lote com a tabela
+#
+# Uso: python rastreio.py programa.mtr [--csv saida.csv]   (sem --csv, o CSV vai para o stdout)
+
+import csv
+import queue
+import struct
+import sys
+import threading
+from array import array
+
+import montador
+
+MAGICO = b"MMTR"
+VERSAO = 2
+EXTENSAO = ".mtr"
+
+CAMPOS = ("pc", "registrador", "valor_registrador", "endereco", "valor_memoria")
+CABECALHO = struct.Struct("<4sHI")
+LOTE = struct.Struct("<IIIII")
+
+# O que a instrução de um PC escreve, somado a DESVIO se ela pode mudar o PC (o jal é DESVIO + ESCREVE_REGISTRADOR)
+ESCREVE_NADA, ESCREVE_REGISTRADOR, ESCREVE_MEMORIA, ESCREVE_HI_LO = range(4)
+DESVIO = 4
+
+# Campo 'registrador' quando a instrução não escreve em registrador nenhum, e campo 'endereco' quando não escreve na memória
+SEM_REGISTRADOR = -1
+SEM_ENDERECO = -1
+# mult escreve $HI e $LO de uma vez: o valor_registrador é ($HI << 32) | $LO, reduzido a 64 bits
+REGISTRADOR_HI_LO = -2
+
+# Passos por lote entregue à thread (no máximo ~1.3 MB de arrays por lote) e lotes que podem esperar na fila
+PASSOS_POR_LOTE = 1 << 16
+MAX_LOTES_PENDENTES = 8
+
+# Os arrays usam a ordem de bytes da máquina: em uma máquina big-endian eles são invertidos na escrita e na leitura
+INVERTER_BYTES = sys.byteorder != "little"
+
+
+class ErroRastreio(Exception):
+    """Arquivo que não é um rastreio MiniMIPS válido (ou é de outra versão)."""
+
+
+def _bytes_little(valores, quantidade):
+    """Os 'quantidade' primeiros itens do array em little-endian (sem cópia na máquina little-endian)."""
+    if not INVERTER_BYTES:
+        return memoryview(valores)[:quantidade]
+    copia = valores[:quantidade]
+    copia.byteswap()
+    return copia
+
+
+def _ler_array(f, tipo, quantidade, caminho):
+    valores = array(tipo)
+    dados = f.read(valores.itemsize * quantidade)
+    if len(dados) != valores.itemsize * quantidade:
+        raise ErroRastreio(f"'{caminho}' está truncado")
+    valores.frombytes(dados)
+    if INVERTER_BYTES:
+        valores.byteswap()
+    return valores
+
+
+class GravadorRastreio:
+    """
+    Escreve os lotes de um programa em um arquivo .mtr por uma thread em segundo plano.
+
+    - tipos / registradores: o que a instrução de cada PC escreve (ESCREVE_* + DESVIO) e em qual registrador
+      (REGISTRADOR_HI_LO no mult, qualquer valor nos tipos que não escrevem em registrador)
+    - novo_lote(): (valores, enderecos, destinos), arrays com espaço para PASSOS_POR_LOTE passos para o motor preencher
+    - enviar(lote, pc_inicial, passos, valores, enderecos, destinos): entrega o que foi preenchido de cada array
+      para a thread (espera se já houver MAX_LOTES_PENDENTES na fila). Depois de enviado o lote não pode mais ser usado
+    - fechar(): espera a thread escrever tudo e fecha o arquivo (também pelo 'with')
+    """
+
+    def __init__(self, caminho, tipos, registradores, max_lotes=MAX_LOTES_PENDENTES):
+        self.caminho = caminho
+        self.tipos = bytes(tipos)
+        self.passos = 0
+        self._erro = None
+        self._livres = queue.SimpleQueue()
+        self._arquivo = open(caminho, "wb")
+        self._arquivo.write(CABECALHO.pack(MAGICO, VERSAO, len(self.tipos)))
+        self._arquivo.write(self.tipos)
+        self._arquivo.write(array('b', registradores).tobytes())
+        self._fila = queue.Queue(maxsize=max_lotes)
+        self._thread = threading.Thread(target=self._escrever, name="gravador-rastreio", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def novo_lote(self):
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            return (array('q', bytes(8 * PASSOS_POR_LOTE)), array('q', bytes(8 * PASSOS_POR_LOTE)),
+                    array('I', bytes(4 * PASSOS_POR_LOTE)))
+
+    def enviar(self, lote, pc_inicial, passos, valores, enderecos, destinos):
+        if passos:
+            self.passos += passos
+            self._fila.put((lote, (pc_inicial, passos, valores, enderecos, destinos)))
+        else:
+            self._livres.put(lote)
+
+    def _escrever(self):
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            lote, contagens = item
+            if self._erro is None:
+                try:
+                    # write() direto dos arrays: sem cópia, e o GIL fica livre durante a escrita
+                    self._arquivo.write(LOTE.pack(*contagens))
+                    for parte, quantidade in zip(lote, contagens[2:]):
+                        self._arquivo.write(_bytes_little(parte, quantidade))
+                except OSError as e:
+                    self._erro = e # Disco cheio / erro de escrita: continua esvaziando a fila para o motor não travar
+            self._livres.put(lote)
+
+    def fechar(self):
+        """Espera os lotes pendentes serem escritos e fecha o arquivo. Repassa um erro de escrita, se houve."""
+        if self._thread is None:
+            return
+        self._fila.put(None)
+        self._thread.join()
+        self._thread = None
+        self._arquivo.close()
+        if self._erro is not None:
+            raise self._erro
+
+
+def ler(caminho):
+    """Gera os passos do rastreio (tuplas na ordem de CAMPOS), lendo o arquivo um lote por vez."""
+    with open(caminho, "rb") as f:
+        cabecalho = f.read(CABECALHO.size)
+        if len(cabecalho) < CABECALHO.size:
+            raise ErroRastreio(f"'{caminho}' é curto demais para ser um rastreio")
+        magico, versao, instrucoes = CABECALHO.unpack(cabecalho)
+        if magico != MAGICO:
+            raise ErroRastreio(f"'{caminho}' não é um rastreio MiniMIPS")
+        if versao != VERSAO:
+            raise ErroRastreio(f"'{caminho}' é um rastreio da versão {versao} (esperada a versão {VERSAO})")
+        tipos = _ler_array(f, 'B', instrucoes, caminho)
+        registradores = _ler_array(f, 'b', instrucoes, caminho)
+        while True:
+            cabecalho = f.read(LOTE.size)
+            if not cabecalho:
+                return
+            if len(cabecalho) < LOTE.size:
+                raise ErroRastreio(f"'{caminho}' está truncado")
+            pc, passos, quantidade_valores, quantidade_enderecos, quantidade_destinos = LOTE.unpack(cabecalho)
+            valores = iter(_ler_array(f, 'q', quantidade_valores, caminho))
+            enderecos = iter(_ler_array(f, 'q', quantidade_enderecos, caminho))
+            destinos = iter(_ler_array(f, 'I', quantidade_destinos, caminho))
+            try:
+                for _ in range(passos):
+                    tipo = tipos[pc]
+                    escrita = tipo & ~DESVIO
+                    if escrita == ESCREVE_REGISTRADOR or escrita == ESCREVE_HI_LO:
+                        yield pc, registradores[pc], next(valores), SEM_ENDERECO, 0
+                    elif escrita == ESCREVE_MEMORIA:
+                        yield pc, SEM_REGISTRADOR, 0, next(enderecos), next(valores)
+                    else:
+                        yield pc, SEM_REGISTRADOR, 0, SEM_ENDERECO, 0
+                    pc = next(destinos) if tipo & DESVIO else pc + 1
+            except (IndexError, StopIteration):
+                raise ErroRastreio(f"'{caminho}' tem um lote que não bate com a tabela do programa") from None
+
+
+def exportar_csv(caminho, saida):
+    """
+    Converte o rastreio em CSV (passo, pc, registrador, valor_registrador, endereco, valor_memoria).
+
+    - Campos que não se aplicam ao passo ficam vazios; o mult vira duas linhas do mesmo passo ($HI e $LO).
+    - saida: arquivo texto já aberto. Retorna a quantidade de passos.
+    """
+    escritor = csv.writer(saida)
+    escritor.writerow(("passo",) + CAMPOS)
+    nomes = montador.NOMES_REGISTRADORES
+    passos = 0
+    for passos, (pc, registrador, valor, endereco, valor_memoria) in enumerate(ler(caminho), 1):
+        memoria = ("", "") if endereco == SEM_ENDERECO else (endereco, valor_memoria)
+        if registrador == REGISTRADOR_HI_LO:
+            escritor.writerow((passos, pc, "$HI", valor >> 32, "", ""))
+            escritor.writerow((passos, pc, "$LO", valor & 0xFFFFFFFF, "", ""))
+        elif registrador == SEM_REGISTRADOR:
+            escritor.writerow((passos, pc, "", "") + memoria)
+        else:
+            escritor.writerow((passos, pc, nomes[registrador], valor) + memoria)
+    return passos
+
+
+def main(argv=None):
+    # argparse só aqui: o back_end importa este módulo e não deve pagar por ele
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converte um rastreio de execução (.mtr) em CSV.")
+    parser.add_argument("rastreio", help="Arquivo .mtr gravado com o --gravar-rastreio do back_end.py")
+    parser.add_argument("--csv", default="-", help="Arquivo CSV de saída ('-' para o stdout, padrão)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.csv == "-":
+            passos = exportar_csv(args.rastreio, sys.stdout)
+        else:
+            with open(args.csv, "w", encoding="utf-8", newline="") as f:
+                passos = exportar_csv(args.rastreio, f)
+    except (OSError, ErroRastreio) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    print(f"{passos} passos exportados", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,34 @@
 """Simulador de compilador MIPS 32"""
 """by: @João Francisco Barcala Paulo, @Lorenzo Brugnolo Rosa"""
 
-import tkinter as tk
-# Foram adicionadas as importações 'filedialog' e 'scrolledtext' que eram necessárias para a GUI
-from tkinter import filedialog, scrolledtext
+import os
+import sys
+import time
+from array import array
+from collections import deque
+
+# O motor do simulador (back_end, montador, imagem_binaria e historico) fica na pasta LOGICA
+# A interface não tem uma cópia própria das instruções: registradores, memória, PC, carregamento e execução
+# são todos do back_end, a classe abaixo só desenha o estado dele e chama as suas funções
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "LOGICA"))
+import back_end
+import historico
+import imagem_binaria
+import montador
+
+# O tkinter só é importado quando a janela vai ser aberta (ver carregar_tk e main)
+# Rodar arquivos sem interface (python minimips.py arquivo.s) ou importar este módulo não carrega o Tk
+tk = filedialog = scrolledtext = None
+
+def carregar_tk():
+    """Importa o tkinter e os módulos 'filedialog' e 'scrolledtext' usados pela GUI."""
+    global tk, filedialog, scrolledtext
+    import tkinter as tk
+    from tkinter import filedialog, scrolledtext
 
 
 # --- CLASSE PRINCIPAL DA APLICAÇÃO ---
-# O código foi encapsulado em uma classe para gerenciar o estado da GUI 
+# O código foi encapsulado em uma classe para gerenciar o estado da GUI
 # e conectar a lógica do simulador aos widgets (botões, caixas de texto).
 class MipsSimulatorGUI:
     def __init__(self, master):
@@ -19,84 +40,75 @@ class MipsSimulatorGUI:
         # Define um tamanho inicial para a janela
         self.master.geometry("1600x900")
 
-        #               (VÁRIAVEIS PARA A SIMULAR OS REGISTRADORES E INSTRUÇÕES) 
-
-        # O vetor memória simula a pilha, podendo ser carregado em até 256 valores 
-        self.memoria = [0] * 256
-
-        # Vetor de registradores 
-        # Fizemos uma simplificação, diminuindo a quantidade de registradores para apenas 10 
-        # Aqui será salvo cada valor para os registradores, com excessão de sp 
-        self.vetor_reg = [0] * 10 # $zero, $v0, $a0, $t0-$t3, $sp, $HI, $LO 
-
-        # Um dicionário para ler os registradores que o .s nos enviar 
-        # Cada instrução retorna um número que a posição do registrador no vetor de registradores 
-        # Basicamente simulando um endereço para a memória onde fica armazenado seu valor 
-        self.reg_dic = { 
-            "$zero": 0, 
-            "$v0": 1, 
-            "$a0": 2, 
-            "$t0": 3, 
-            "$t1": 4, 
-            "$t2": 5, 
-            "$t3": 6, 
-            "$sp": 7, 
-            "$HI": 8, # Usado em mult quando ultrapassar os 32bits para armazenar seus 16 bist mais sign 
-            "$LO": 9  # Usado em mult quando ultrapassar os 32bits para armazenar seus 16 bits menos sign 
-        } 
-        
-        # O vetor de índice 7 representa o $sp 
-        # Neste vetor ele irá salvar uma "posição" na memória, para simular a pilha 
-        # Nada mais é que um índice que indica uma posição no vetor memória 
-        # Começa apontando para o último índice e precisa ser "subtraido" para abrir espaço na pilha 
-        self.vetor_reg[self.reg_dic["$sp"]] = len(self.memoria) - 1 # "Len(memoria)" retorna o tamanho do vetor memória em python 
-
-        # LEMBRAR: Não esquecer de pesquisar como funcionam os regs $HI e $LO 
-
-        # DICIONÁRIO DE CONTROLE ---- (prestar atenção para não esquecer) 
-
-        # Control: [RegDst, ALUSrc, MemToReg, RegWrite, MemRead, MemWrite] 
-        # ALUSrc: 0=Reg, 1=Imediato 
-        # MemToReg: 0=ALUResult, 1=MemData 
-        # RegWrite: 1=Escreve no registrador 
-        # MemRead/Write: 1=Lê/Escreve na memória 
-
-        self.inst_dic = { 
-            #               [ALUSrc, MemToReg, RegWrite, MemRead, MemWrite] 
-            "add":   [0, 0, 1, 0, 0], 
-            "addi":  [1, 0, 1, 0, 0], 
-            "sub":   [0, 0, 1, 0, 0], 
-            "mult":  [0, 0, 1, 0, 0], 
-            "and":   [0, 0, 1, 0, 0], 
-            "or":    [0, 0, 1, 0, 0], 
-            "sll":   [1, 0, 1, 0, 0],  
-            "lw":    [1, 1, 1, 1, 0],  
-            "sw":    [1, 0, 0, 0, 1], 
-            "lui":   [1, 0, 1, 0, 0], 
-            "slt":   [0, 0, 1, 0, 0], 
-            "slti":  [1, 0, 1, 0, 0],
-            "la":    [0, 0, 1, 0, 0],
-            "syscall": [0, 0, 0, 0, 0]
-        } 
-
-        self.opcode_dic = {
-            "add": "000000", "sub": "000000", "mult": "000000", "and": "000000",
-            "or": "000000", "sll": "000000", "slt": "000000", "syscall": "000000",
-            "addi": "001000", "lw": "100011", "sw": "101011", "lui": "001111",
-            "slti": "001010"
-        }
-        self.funct_dic = {
-            "add": "100000", "sub": "100010", "mult": "011000", "and": "100100",
-            "or": "100101", "sll": "000000", "slt": "101010", "syscall": "001100"
-        }
-
-        # --- VARIÁVEIS DE ESTADO DO SIMULADOR --- 
+        #               (CONFIGURAÇÃO DA MEMÓRIA DO BACK_END)
+
+        # Tamanho (Spinbox "Memória (células)"), layout e endereçamento da memória do back_end
+        # Aplicados no Resetar / ao carregar um arquivo (ver _preparar_memoria)
+        self.tamanho_memoria = tk.IntVar(value=back_end.TAMANHO_MEMORIA_PADRAO)
+        self.layout_memoria = tk.StringVar(value=back_end.layout_memoria)
+        self.enderecamento = tk.StringVar(value=back_end.modo_enderecamento)
+        self.nomes_reg = {idx: nome for nome, idx in back_end.reg_dic.items()}
+
+        # Motor do back_end usado na execução (ver back_end.MOTORES)
+        #   "blocos" : trechos em linha reta traduzidos para funções Python (padrão), o resto pela tabela de despacho
+        # No modo passo a passo cada clique executa uma única instrução
+        self.motor = "blocos"
+
+        # --- VARIÁVEIS DE ESTADO DO SIMULADOR ---
+        # O PC, os registradores e a memória são os do back_end (back_end.PC, back_end.vetor_reg, back_end.memoria)
         self.file_path = "" # Path do arquivo a ser lido
-        self.PC = 0 # Program Counter 
-        self.EPC = 0 # EPC  
-        self.CAUSE = 0 # CAUSE
         self.programa = []
+        # Mesmo programa, mas já pré-decodificado em tuplas (cod, a, b, c)
+        self.programa_decodificado = []
+        # Imagem de código de máquina (array('I'), uma palavra por linha) e os registros das palavras 0x3F
+        self.programa_montado = (array('I'), [])
+        # .data inicial do programa carregado (antes de qualquer execução), gravada no "Salvar Imagem"
+        self.imagem_dados = None
+        # Erros reportados no carregamento, gravados como avisos no "Salvar Imagem"
+        self.erros_carga = []
         self.data_table = {}
+        # Instantâneo (imutável) da máquina logo depois do carregamento: o Resetar só o restaura,
+        # sem abrir o arquivo nem passar pelo montador de novo
+        self.estado_inicial = None
+        # --- LINHAS ALTERADAS ---
+        # O motor anota os registradores e endereços que escreveu (back_end.regs_escritos / enderecos_escritos)
+        # e, a cada atualização, só essas linhas são trocadas. Os conjuntos são esvaziados depois de cada desenho
+        # tudo_sujo = True força redesenhar os painéis inteiros (carregar, resetar, voltar passo)
+        back_end.regs_escritos = set()
+        back_end.enderecos_escritos = set()
+        self.enderecos_exibidos = []
+        self.mem_exibida = []
+        self.tudo_sujo = True
+        # Estado do painel de binário: qual programa está desenhado, em que PC está o '>>' e as linhas já traduzidas
+        self.bin_programa_exibido = None
+        self.bin_pc_marcado = -1
+        self.linhas_bin = []
+        # --- EXECUÇÃO CONTÍNUA EM FATIAS ---
+        self.executando = False # True enquanto houver fatias agendadas
+        self._id_fatia = None # id do master.after da próxima fatia (para cancelar no Parar)
+        self.instrucoes_executadas = 0
+        # Intervalo entre atualizações da tela na execução contínua (ms)
+        self.intervalo_atualizacao = tk.IntVar(value=100)
+        # --- VOLTAR PASSO ---
+        # Toda execução passa pelo histórico, que guarda um ponto de retorno a cada 'intervalo_pontos' instruções
+        # (aplicado ao carregar o arquivo). Voltar = restaurar o último ponto e reexecutar até o passo anterior
+        self.historico = historico.HistoricoExecucao()
+        self.intervalo_pontos = tk.IntVar(value=historico.INTERVALO_PADRAO)
+        # --- PERFIL (PONTOS QUENTES) ---
+        # Desligado por padrão: o back_end só conta execuções quando back_end.perfil_execucao existe
+        # As contagens recomeçam ao carregar e ao resetar; o Voltar Passo não desconta o que já foi contado
+        self.perfil_ligado = tk.BooleanVar(value=False)
+        # id do master.after do próximo redesenho do painel (o painel não é refeito a cada passo, ver atualizar_displays)
+        self._id_perfil = None
+        # --- BUFFER DA ÁREA DE SAÍDAS ---
+        # As mensagens se acumulam aqui e são escritas no widget uma vez por quadro
+        # O deque tem tamanho máximo: num programa que imprime sem parar só as últimas linhas são guardadas
+        self.max_linhas_saida = tk.IntVar(value=2000)
+        self.buffer_saida = deque(maxlen=self.max_linhas_saida.get())
+        self.limpar_saida = False
+        self._id_descarga = None
+        # Saída das syscalls, avisos e erros do back_end vêm direto para a área de saídas
+        back_end.destino_saida = self.log_saida
         # Variável para o Checkbutton
         self.step_by_step = tk.BooleanVar(value=True)
 
@@ -105,379 +117,475 @@ class MipsSimulatorGUI:
         # Inicia a interface com os displays atualizados
         self.atualizar_displays()
 
-    # --- FUNÇÕES DO BACKEND (SIMULADOR) ---
-    # As funções do simulador foram transformadas em métodos da classe
-    # para que possam acessar e modificar o estado do simulador (ex: self.memoria, self.PC)
-
-    def read_arq(self, file_path): 
-        """ 
-        Lê um arquivo .s com seções .data e .text. 
-
-        - Popula a memória da classe 'self.memoria' com os dados da seção .data. 
-        - Cria uma tabela de símbolos para os rótulos de dados. 
-        - Retorna a matriz de instruções da seção .text e a tabela de dados. 
-        """ 
-        # A variável global foi trocada por self.memoria
-        data_table = {} 
-        matriz_programa = [] 
-        
-        data_pointer = 0 
-        topico_atual = None
-
-        try: 
-            with open(file_path, 'r', encoding='utf-8') as f: 
-                linhas = f.readlines() 
-        except FileNotFoundError: 
-            self.log_saida(f"Erro: Arquivo '{file_path}' não encontrado.")
-            # Fazer um código Cause (Não conseguiu ler o arquivo)
-            return None, None 
-
-        for linha in linhas: 
-            linha_limpa = linha.split('#', 1)[0].strip() 
-
-            if not linha_limpa: 
-                continue 
-
-            if linha_limpa == '.data': 
-                topico_atual = 'data' 
-                continue 
-            elif linha_limpa == '.text': 
-                topico_atual = 'text' 
-                continue 
-
-            if topico_atual == 'data': 
-                try: 
-                    label, resto = linha_limpa.split(':', 1) 
-                    label = label.strip() 
-                    directive_value = resto.strip().split(maxsplit=1)
-                    directive = directive_value[0] 
-                    
-                    data_table[label] = data_pointer
-
-                    if directive == '.asciiz': 
-                        str_val = directive_value[1].strip('"') 
-                        for char in str_val: 
-                            self.memoria[data_pointer] = ord(char) 
-                            data_pointer += 1 
-                        self.memoria[data_pointer] = 0 
-                        data_pointer += 1 
-                    
-                    elif directive == '.word': 
-                        values = directive_value[1].split(',') 
-                        for val in values: 
-                            self.memoria[data_pointer] = int(val.strip()) 
-                            data_pointer += 1  
-
-                except Exception as e: 
-                    self.log_saida(f"Erro ao processar linha de dados '{linha_limpa}': {e}")
-                    # Adicionar um CAUSE aq para erros ao ler uma linha 
-
-            elif topico_atual == 'text': 
-                slices = linha_limpa.replace(',', ' ').replace('(', ' ').replace(')', ' ').split()
-                matriz_programa.append(slices) 
-
-        return matriz_programa, data_table
-
-    def _to_binary(self, n, bits):
-        """Converte um número inteiro para sua representação em string binária."""
-        if n >= 0:
-            return format(n, 'b').zfill(bits)
-        else:
-            return format((1 << bits) + n, 'b')
+    # --- EXECUÇÃO ---
+    # Tudo passa pelo histórico, que chama o back_end.executar (anda a partir do back_end.PC e devolve
+    # quantas instruções rodou) e guarda os pontos de retorno do Voltar Passo pelo caminho
 
-    def traduzir_instrucao_para_binario(self, instrucao):
-        """Traduz uma instrução MIPS para o formato binário."""
-        if not instrucao: return ""
-        opcode_str = instrucao[0]
-        try:
-            if opcode_str in ["add", "sub", "and", "or", "slt"]:
-                opcode = self.opcode_dic[opcode_str]
-                rd = self._to_binary(self.reg_dic[instrucao[1]], 5)
-                rs = self._to_binary(self.reg_dic[instrucao[2]], 5)
-                rt = self._to_binary(self.reg_dic[instrucao[3]], 5)
-                return f"{opcode} {rs} {rt} {rd} 00000 {self.funct_dic[opcode_str]} (Tipo R)"
-            elif opcode_str == "mult":
-                opcode = self.opcode_dic[opcode_str]
-                rs = self._to_binary(self.reg_dic[instrucao[1]], 5)
-                rt = self._to_binary(self.reg_dic[instrucao[2]], 5)
-                return f"{opcode} {rs} {rt} 00000 00000 {self.funct_dic[opcode_str]} (Tipo R)"
-            elif opcode_str == "sll":
-                opcode = self.opcode_dic[opcode_str]
-                rd = self._to_binary(self.reg_dic[instrucao[1]], 5)
-                rt = self._to_binary(self.reg_dic[instrucao[2]], 5)
-                shamt = self._to_binary(int(instrucao[3]), 5)
-                return f"{opcode} 00000 {rt} {rd} {shamt} {self.funct_dic[opcode_str]} (Tipo R)"
-            elif opcode_str in ["addi", "slti"]:
-                opcode = self.opcode_dic[opcode_str]
-                rt = self._to_binary(self.reg_dic[instrucao[1]], 5)
-                rs = self._to_binary(self.reg_dic[instrucao[2]], 5)
-                imediato = self._to_binary(int(instrucao[3]), 16)
-                return f"{opcode} {rs} {rt} {imediato} (Tipo I)"
-            elif opcode_str in ["lw", "sw"]:
-                opcode = self.opcode_dic[opcode_str]
-                rt = self._to_binary(self.reg_dic[instrucao[1]], 5)
-                imediato = self._to_binary(int(instrucao[2]), 16)
-                rs = self._to_binary(self.reg_dic[instrucao[3]], 5)
-                return f"{opcode} {rs} {rt} {imediato} (Tipo I)"
-            elif opcode_str == "lui":
-                opcode = self.opcode_dic[opcode_str]
-                rt = self._to_binary(self.reg_dic[instrucao[1]], 5)
-                imediato = self._to_binary(int(instrucao[2]), 16)
-                return f"{opcode} 00000 {rt} {imediato} (Tipo I)"
-            elif opcode_str == "syscall":
-                return f"{self.opcode_dic[opcode_str]} {'0'*20} {self.funct_dic[opcode_str]} (Syscall)"
-            # A instrução 'la' é uma pseudo-instrução e não tem uma tradução binária direta
-            elif opcode_str == "la":
-                return "Pseudo-instrução (não possui formato binário direto)"
-            else:
-                return "Tradução não implementada."
-        except (KeyError, IndexError, ValueError) as e:
-            return f"Erro na tradução: {e}" 
-
-    def decode_execute(self, instrucao): 
-        """Decodifica e executa uma instrução. Atualiza o self.PC.""" 
-        # As referências a variáveis globais foram trocadas por 'self'
-        opcode = instrucao[0] 
-        if opcode not in self.inst_dic: 
-            self.log_saida(f"Erro na linha {self.PC+1}: Instrução '{opcode}' desconhecida.") 
-            self.PC += 1
-            return 
-            # Colocar um CAUSE aqui para Instrução não encontrada
-
-        # --- Instruções Type-R ---
-        if opcode in ["add", "sub", "and", "or", "slt"]:
-            reg_dst_name, reg_src_name, reg_temp_name = instrucao[1], instrucao[2], instrucao[3]
-            idx_dst = self.reg_dic[reg_dst_name]
-            val_src = self.vetor_reg[self.reg_dic[reg_src_name]]
-            val_temp = self.vetor_reg[self.reg_dic[reg_temp_name]]
-            resultado = 0
-            if opcode == "add": resultado = val_src + val_temp
-            elif opcode == "sub": resultado = val_src - val_temp
-            elif opcode == "and": resultado = val_src & val_temp
-            elif opcode == "or": resultado = val_src | val_temp
-            elif opcode == "slt": resultado = 1 if val_src < val_temp else 0
-            if idx_dst != 0: self.vetor_reg[idx_dst] = resultado
-            else: self.log_saida("AVISO: Tentativa de escrita no registrador $zero ignorada.")
-
-        # MULT
-        elif opcode == "mult":
-            reg_src_name, reg_temp_name = instrucao[1], instrucao[2]
-            val_src = self.vetor_reg[self.reg_dic[reg_src_name]]
-            val_temp = self.vetor_reg[self.reg_dic[reg_temp_name]]
-            resultado_64bits = val_src * val_temp
-            self.vetor_reg[self.reg_dic["$LO"]] = resultado_64bits & 0xFFFFFFFF
-            self.vetor_reg[self.reg_dic["$HI"]] = resultado_64bits >> 32
-
-        # Shift
-        elif opcode == "sll":
-            reg_dst_name, reg_temp_name, shamt = instrucao[1], instrucao[2], int(instrucao[3])
-            idx_dst = self.reg_dic[reg_dst_name]
-            val_temp = self.vetor_reg[self.reg_dic[reg_temp_name]]
-            resultado = val_temp << shamt
-            if idx_dst != 0: self.vetor_reg[idx_dst] = resultado
-
-        # --- Instruções Type-I ---
-        elif opcode in ["addi", "slti", "lui"]:
-            reg_temp_name = instrucao[1]
-            idx_temp = self.reg_dic[reg_temp_name]
-            resultado = 0
-            if opcode == "lui":
-                imediate = int(instrucao[2])
-                resultado = imediate << 16
-            else:
-                reg_src_name, imediate = instrucao[2], int(instrucao[3])
-                val_src = self.vetor_reg[self.reg_dic[reg_src_name]]
-                if opcode == "addi": resultado = val_src + imediate
-                elif opcode == "slti": resultado = 1 if val_src < imediate else 0
-            if idx_temp != 0: self.vetor_reg[idx_temp] = resultado
-
-        # --- Instruções Type-I para memoria ---
-        elif opcode in ["lw", "sw"]:
-            reg_temp_name, offset, reg_src_name = instrucao[1], int(instrucao[2]), instrucao[3]
-            mem_adress = offset + self.vetor_reg[self.reg_dic[reg_src_name]]
-            if not (0 <= mem_adress < len(self.memoria)):
-                self.log_saida(f"ERRO: Acesso a endereço de memória inválido ({mem_adress}) na linha {self.PC + 1}")
-            else:
-                if opcode == "lw":
-                    if reg_temp_name not in self.reg_dic:
-                        self.log_saida(f"ERRO DE SINTAXE: 'lw' requer um registrador de destino, mas recebeu '{reg_temp_name}' na linha {self.PC+1}")
-                    else:
-                        self.vetor_reg[self.reg_dic[reg_temp_name]] = self.memoria[mem_adress]
-                elif opcode == "sw":
-                     val_temp = self.vetor_reg[self.reg_dic[reg_temp_name]]
-                     self.memoria[mem_adress] = val_temp
-       
-        # --- LOAD ADRESS ---
-        elif opcode == "la":
-            reg_temp_name, label_name = instrucao[1], instrucao[2]
-            if label_name in self.data_table:
-                adress = self.data_table[label_name]
-                idx_temp = self.reg_dic[reg_temp_name]
-                if idx_temp != 0: self.vetor_reg[idx_temp] = adress
-            else:
-                self.log_saida(f"ERRO: Etiqueta de dados '{label_name}' não encontrada na linha {self.PC + 1}.")
-        
-        # --- Syscall ---
-        elif opcode == "syscall":
-            call_code = self.vetor_reg[self.reg_dic["$v0"]]
-            if call_code == 1:
-                self.log_saida(f"{self.vetor_reg[self.reg_dic['$a0']]}")
-            elif call_code == 4:
-                starting = self.vetor_reg[self.reg_dic["$a0"]]
-                string = ""
-                while 0 <= starting < len(self.memoria) and self.memoria[starting] != 0:
-                    string += chr(self.memoria[starting])
-                    starting += 1
-                self.log_saida(f"{string}")
-            elif call_code == 10:
-                self.log_saida("--- Syscall: Fim da Execução ---")
-                self.PC = len(self.programa) # Pula o PC para o final para parar o loop
-                return # Retorna para não incrementar o PC novamente
-            else:
-                self.log_saida(f"ERRO: Syscall com código desconhecido ({call_code}) na linha {self.PC + 1}.")
-
-        self.vetor_reg[0] = 0
-        self.PC += 1
+    def _executar(self, **orcamento):
+        """Roda o programa carregado no motor escolhido (limite_instrucoes / prazo do back_end.executar)."""
+        self.instrucoes_executadas += self.historico.executar(**orcamento)
+
+    def executar_passo(self):
+        """Executa a instrução do PC atual."""
+        self._executar(limite_instrucoes=1)
 
     # --- FUNÇÕES DE CONTROLE DA GUI ---
 
     #Função para carregar o arquivo .s para a execução do programa
     def _load_program(self, path):
-        """Método interno para carregar e preparar o programa do arquivo."""
-        # Reseta o estado antes de carregar um novo arquivo
-        self.resetar_simulador()
-        
+        """Método interno para carregar e preparar o programa do arquivo (.s ou imagem .mbin)."""
+        # Descarta o programa anterior e aplica a memória escolhida antes de carregar o novo arquivo
+        self._descarregar_programa()
+
         self.file_path = path
-        programa, data_table = self.read_arq(path)
-        
-        if programa is not None:
-            self.programa = programa
-            self.data_table = data_table
-            return True
-        return False
+        # Leitura, montagem, cache de programas e .mbin: tudo no back_end, que já escreve a .data na memória
+        programa, data_table, programa_decodificado = back_end.carregar_programa(path)
+        if programa is None:
+            return False
+
+        self.programa, self.data_table, self.programa_decodificado = programa, data_table, programa_decodificado
+        self.programa_montado = back_end.montar_programa(programa, data_table)
+        self.imagem_dados = back_end.trecho_dados()
+        self.erros_carga = list(back_end.erros)
+        # Uma imagem .mbin reconfigura a memória com o layout / endereçamento com que foi gerada
+        self.layout_memoria.set(back_end.layout_memoria)
+        self.enderecamento.set(back_end.modo_enderecamento)
+        self.tudo_sujo = True # A memória recebeu a seção .data
+        # Traduz os blocos já no carregamento (ou reaproveita do cache se o arquivo não mudou)
+        if self.motor == "blocos":
+            back_end.traduzir_blocos(programa_decodificado, anotar=True)
+        self.estado_inicial = back_end.capturar_estado()
+        self._iniciar_historico()
+        self._renovar_perfil()
+        return True
+
+    def _iniciar_historico(self):
+        """Começa o histórico do Voltar Passo com o estado inicial como passo 0."""
+        try:
+            self.historico.definir_intervalo(int(self.intervalo_pontos.get()))
+        except (ValueError, tk.TclError):
+            self.historico.definir_intervalo(historico.INTERVALO_PADRAO)
+        self.historico.iniciar(self.programa, self.programa_decodificado, self.data_table, self.motor, self.estado_inicial)
+
+    def _renovar_perfil(self):
+        """Contadores zerados para o programa carregado (ou nenhum, com o perfil desligado / sem programa)."""
+        if self.perfil_ligado.get() and self.programa:
+            back_end.perfil_execucao = back_end.novo_perfil(self.programa_decodificado)
+        else:
+            back_end.perfil_execucao = None
+
+    def alternar_perfil(self):
+        """Liga ou desliga o perfil pelo Checkbutton. Ligar no meio da execução conta a partir dali."""
+        self._renovar_perfil()
+        self._redesenhar_perfil()
+
+    def salvar_imagem(self):
+        """Grava o programa carregado (código montado, .data inicial e símbolos) em uma imagem .mbin."""
+        if not self.programa:
+            self.log_saida("Nenhum programa carregado para salvar.")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Salvar imagem binária",
+            defaultextension=imagem_binaria.EXTENSAO,
+            initialfile=os.path.splitext(os.path.basename(self.file_path))[0] + imagem_binaria.EXTENSAO,
+            filetypes=(("Imagem MiniMIPS", "*" + imagem_binaria.EXTENSAO), ("Todos os arquivos", "*.*"))
+        )
+        if path:
+            try:
+                back_end.salvar_imagem(path, self.programa, self.data_table, self.erros_carga, self.imagem_dados)
+            except OSError as e:
+                self.log_saida(f"Erro ao salvar a imagem: {e}")
+                return
+            self.log_saida(f"Imagem salva em '{path}'.")
 
     #Função para o usuario selecionar o arquivo que ele deseja executar
     def selecionar_arquivo(self):
         """Abre uma caixa de diálogo para o usuário selecionar um arquivo .s e o carrega."""
         path = filedialog.askopenfilename(
-            title="Selecione um arquivo .s",
-            filetypes=(("Arquivos MIPS", "*.s"), ("Todos os arquivos", "*.*"))
+            title="Selecione um arquivo .s ou uma imagem .mbin",
+            filetypes=(("Arquivos MIPS", "*.s"), ("Imagem MiniMIPS", "*" + imagem_binaria.EXTENSAO), ("Todos os arquivos", "*.*"))
         )
         if path:
             if self._load_program(path):
                 self.log_saida(f"Arquivo '{self.file_path.split('/')[-1]}' carregado com {len(self.programa)} instruções.", clear=True)
-                self.atualizar_displays()
+                self.atualizar_displays(perfil_agora=True)
 
     #Inicia a execução do programa
     def executar_programa(self):
         """Inicia a execução do programa carregado."""
+        if self.executando:
+            return # Já existe uma execução contínua em andamento
+
         if not self.programa:
             self.log_saida("Nenhum programa carregado. Selecione um arquivo primeiro.")
             return
 
-        if self.PC >= len(self.programa):
+        if back_end.PC >= len(self.programa):
             self.log_saida("O programa já terminou. Pressione 'Resetar' para executar novamente.")
             return
 
         # Modo Passo a Passo
         if self.step_by_step.get():
-            instrucao_atual = self.programa[self.PC]
-            self.log_saida(f"PC={self.PC}: Executando -> {' '.join(instrucao_atual)}")
-            self.decode_execute(instrucao_atual)
+            instrucao_atual = self.programa[back_end.PC]
+            self.log_saida(f"PC={back_end.PC}: Executando -> {' '.join(instrucao_atual)}")
+            self.executar_passo()
+            self._atualizar_contador()
+            self.atualizar_displays()
         # Modo Contínuo
         else:
+            # O programa roda em fatias agendadas com master.after, a janela continua respondendo
+            # (botão Parar, rolagem, redimensionar) mesmo em programas longos ou que não terminam
             self.log_saida("--- INÍCIO DA EXECUÇÃO CONTÍNUA ---")
-            while self.PC < len(self.programa):
-                instrucao_atual = self.programa[self.PC]
-                # Para a execução se encontrar um syscall 10 no meio do caminho
-                if instrucao_atual[0] == 'syscall' and self.vetor_reg[self.reg_dic['$v0']] == 10:
-                    self.decode_execute(instrucao_atual)
-                    break 
-                self.decode_execute(instrucao_atual)
-            
+            self.executando = True
+            self._executar_fatia()
+
+    def _executar_fatia(self):
+        """Roda o programa durante uma fatia de tempo, atualiza a tela e agenda a próxima fatia."""
+        self._id_fatia = None
+        if not self.executando:
+            return
+
+        # A fatia dura o intervalo de atualização escolhido na tela (em ms)
+        # O prazo é conferido pelo próprio back_end.executar entre lotes de instruções
+        try:
+            intervalo = max(10, int(self.intervalo_atualizacao.get()))
+        except (ValueError, tk.TclError):
+            intervalo = 100
+        self._executar(prazo=time.monotonic() + intervalo / 1000)
+
+        terminou = back_end.PC >= len(self.programa)
+        self._atualizar_contador()
+        self.atualizar_displays(perfil_agora=terminou)
+
+        if terminou:
+            self.executando = False
             # Mensagem de fim apenas se o programa não foi terminado por um syscall 10
-            if self.PC >= len(self.programa) and not (instrucao_atual[0] == 'syscall' and self.vetor_reg[self.reg_dic['$v0']] == 10):
-                 self.log_saida("--- FIM DA EXECUÇÃO ---")
-        
+            if not back_end.encerrado_por_syscall:
+                self.log_saida("--- FIM DA EXECUÇÃO ---")
+        else:
+            # after(1): devolve o controle para o Tk processar os eventos antes da próxima fatia
+            self._id_fatia = self.master.after(1, self._executar_fatia)
+
+    def voltar_passo(self):
+        """Desfaz a última instrução executada (Step Back)."""
+        self.parar_execucao()
+        if not self.programa:
+            self.log_saida("Nenhum programa carregado. Selecione um arquivo primeiro.")
+            return
+        if self.historico.passo == 0:
+            self.log_saida("O programa já está no início.")
+            return
+        # O que a instrução desfeita escreveu na área de saídas continua lá, só o estado da máquina volta
+        self.instrucoes_executadas = self.historico.voltar(1)
+        self.tudo_sujo = True # O estado veio de um ponto de retorno, não só das escritas anotadas
+        self.log_saida(f"<< Voltou para PC={back_end.PC} (instrução {self.instrucoes_executadas})")
+        self._atualizar_contador()
         self.atualizar_displays()
 
-    #Reseta todas as variaveis para as iniciais do programa
-    def resetar_simulador(self):
-        """Reseta o estado do simulador para os valores iniciais."""
-        self.memoria = [0] * 256
-        self.vetor_reg = [0] * 10
-        self.vetor_reg[self.reg_dic["$sp"]] = len(self.memoria) - 1
-        self.PC = 0
+    def parar_execucao(self):
+        """Interrompe a execução contínua (botão Parar). O programa pode continuar depois pelo Executar."""
+        if not self.executando:
+            return
+        self.executando = False
+        if self._id_fatia is not None:
+            self.master.after_cancel(self._id_fatia)
+            self._id_fatia = None
+        self.log_saida(f"--- EXECUÇÃO INTERROMPIDA NO PC={back_end.PC} ---")
+        self._atualizar_contador()
+        self.atualizar_displays(perfil_agora=True)
+
+    def _atualizar_contador(self):
+        if hasattr(self, 'label_contador'):
+            self.label_contador.config(text=f"Instruções executadas: {self.instrucoes_executadas}")
+
+    def _tamanho_escolhido(self):
+        try:
+            return max(1, int(self.tamanho_memoria.get()))
+        except (ValueError, tk.TclError):
+            return back_end.TAMANHO_MEMORIA_PADRAO
+
+    def _preparar_memoria(self):
+        """Aplica na memória do back_end o tamanho, o layout e o endereçamento escolhidos e zera o estado."""
+        try:
+            # Mesma configuração: só muda o tamanho no próprio array (ou só zera), ver back_end.configurar_memoria
+            back_end.configurar_memoria(self.layout_memoria.get(), self._tamanho_escolhido(), self.enderecamento.get(), back_end.ordem_bytes)
+        except ValueError as e:
+            self.log_saida(f"Erro: {e}")
+            back_end.resetar_estado()
+
+    def _memoria_mudou(self):
+        """True se o layout, o endereçamento ou o tamanho escolhidos na tela não são os da memória atual."""
+        layout = self.layout_memoria.get()
+        if (layout, self.enderecamento.get()) != (back_end.layout_memoria, back_end.modo_enderecamento):
+            return True
+        # Os layouts paginados sempre têm 2**32 endereços, o tamanho só vale para o compacto
+        return back_end.LAYOUTS_MEMORIA[layout] is None and self._tamanho_escolhido() != len(back_end.memoria)
+
+    def _descarregar_programa(self):
+        """Esquece o programa carregado e deixa a memória escolhida zerada."""
+        self.parar_execucao()
+        self.instrucoes_executadas = 0
+        self._atualizar_contador()
+        # Registradores, memória e PC do back_end voltam ao estado inicial
+        self._preparar_memoria()
+        self.tudo_sujo = True
         #Esvazia as instruções do programa.
         self.programa = []
+        self.programa_decodificado = []
+        self.historico.limpar()
+        self.estado_inicial = None
+        back_end.perfil_execucao = None
+        self.programa_montado = (array('I'), [])
+        self.imagem_dados = None
+        self.erros_carga = []
         #Tabela de dados e caminho do arquivo limpos
         self.data_table = {}
         self.file_path = ""
-        self.log_saida("Simulador resetado. Carregue um novo arquivo", clear=True)
-    
-        #Chama a função para redesenhar a interface. Como self.programa está vazia,
-        #a área de código fonte e binário ficará limpa.
-        self.atualizar_displays()
+
+    #Reseta todas as variaveis para as iniciais do programa
+    def resetar_simulador(self):
+        """Volta o programa carregado para o estado logo depois do carregamento (sem ler o arquivo de novo)."""
+        self.parar_execucao()
+        if self.programa and not self._memoria_mudou():
+            # Cópia em bloco das páginas do instantâneo: o custo não depende do tamanho do programa
+            back_end.restaurar_estado(self.estado_inicial)
+            self.instrucoes_executadas = 0
+            self._atualizar_contador()
+            self._iniciar_historico()
+            self._renovar_perfil()
+            self.tudo_sujo = True
+            self.log_saida("Simulador resetado. O programa volta ao início", clear=True)
+        elif self.programa:
+            # A memória escolhida mudou: o mesmo arquivo é carregado nela (pelo cache de programas do back_end)
+            if self._load_program(self.file_path):
+                self.log_saida("Simulador resetado com a nova memória. O programa volta ao início", clear=True)
+        else:
+            self._descarregar_programa()
+            self.log_saida("Simulador resetado. Carregue um novo arquivo", clear=True)
+
+        #Chama a função para redesenhar a interface.
+        self.atualizar_displays(perfil_agora=True)
 
     def log_saida(self, mensagem, clear=False):
-        """Adiciona uma mensagem à área de saídas na GUI."""
+        """
+        Adiciona uma mensagem à área de saídas na GUI.
+
+        A mensagem não vai direto para o widget: ela entra no buffer_saida e todas as mensagens
+        pendentes são escritas de uma vez no próximo quadro (ver _descarregar_saida).
+        """
+        if clear:
+            self.buffer_saida.clear()
+            self.limpar_saida = True
+        self.buffer_saida.append(mensagem)
+        # Agenda uma única descarga por quadro, não importa quantas mensagens cheguem até lá
+        if self._id_descarga is None and hasattr(self, 'area_saidas'):
+            self._id_descarga = self.master.after(self.INTERVALO_DESCARGA, self._descarregar_saida)
+
+    # Intervalo entre descargas do buffer de saída (ms), mais ou menos um quadro de tela
+    INTERVALO_DESCARGA = 16
+
+    def _descarregar_saida(self):
+        """Escreve no widget as mensagens pendentes e descarta as linhas mais antigas além do limite."""
+        self._id_descarga = None
         # Garante que o widget exista antes de tentar usá-lo
         if not hasattr(self, 'area_saidas'):
             return
+        try:
+            max_linhas = max(1, int(self.max_linhas_saida.get()))
+        except (ValueError, tk.TclError):
+            max_linhas = 2000
+
         # Habilita a edição para inserir texto
         self.area_saidas.config(state=tk.NORMAL)
-        if clear:
+        if self.limpar_saida:
             self.area_saidas.delete('1.0', tk.END)
-        self.area_saidas.insert(tk.END, mensagem + "\n")
+            self.limpar_saida = False
+        if self.buffer_saida:
+            self.area_saidas.insert(tk.END, "\n".join(self.buffer_saida) + "\n")
+            self.buffer_saida.clear()
+        # O limite pode ter mudado no Spinbox: o deque é recriado com o novo tamanho máximo
+        if self.buffer_saida.maxlen != max_linhas:
+            self.buffer_saida = deque(maxlen=max_linhas)
+        # Histórico limitado: mantém só as últimas max_linhas linhas no widget
+        total_linhas = int(self.area_saidas.index('end-1c').split('.')[0]) - 1
+        if total_linhas > max_linhas:
+            self.area_saidas.delete('1.0', f"{total_linhas - max_linhas + 1}.0")
         self.area_saidas.see(tk.END) # Rola para o final
         # Desabilita a edição para o usuário não poder digitar
         self.area_saidas.config(state=tk.DISABLED)
 
 
     #Atualiza em tempo real os registradores, funçoes e saidas da execução
-    def atualizar_displays(self):
-        """Atualiza todas as áreas de texto com o estado atual do simulador."""
+    def atualizar_displays(self, perfil_agora=False):
+        """
+        Atualiza todas as áreas de texto com o estado atual do simulador.
+
+        - perfil_agora: redesenha os pontos quentes já (fim da execução, Parar, Resetar, arquivo novo).
+        """
         # Garante que os widgets existam
         if not hasattr(self, 'area_registradores'):
             return
-        
-        # --- Atualiza Registradores ---
-        self.area_registradores.config(state=tk.NORMAL)
-        self.area_registradores.delete('1.0', tk.END)
-        self.area_registradores.insert(tk.INSERT, "--- REGISTRADORES ---\n")
-        for nome, endereco in self.reg_dic.items():
-            valor = self.vetor_reg[endereco]
-            linha = f"{nome:<5}: {valor:<10} (0x{valor:08X})\n"
-            self.area_registradores.insert(tk.END, linha)
-        self.area_registradores.config(state=tk.DISABLED)
+
+        # --- Atualiza Registradores e Memória ---
+        # Só as linhas dos registradores e células escritas desde a última atualização são trocadas
+        # (e ficam destacadas). Tudo é redesenhado depois de carregar/resetar/voltar e nos motores que não anotam
+        if self.tudo_sujo or self.motor not in back_end.MOTORES_ANOTAM_ESCRITAS:
+            self._redesenhar_registradores()
+            self._redesenhar_memoria()
+        else:
+            self._atualizar_linhas_escritas()
+        self.tudo_sujo = False
+        back_end.regs_escritos.clear()
+        back_end.enderecos_escritos.clear()
 
         # --- Atualiza Código Fonte e Binário ---
+        # O painel só é reescrito inteiro quando o programa muda (carregar/resetar)
+        # A cada passo apenas o marcador '>>' sai da linha do PC antigo e vai para a do PC novo
         self.area_bin.config(state=tk.NORMAL)
-        self.area_bin.delete('1.0', tk.END)
-        self.area_bin.insert(tk.INSERT, "--- CÓDIGO FONTE E BINÁRIO ---\n")
-        for i, instrucao in enumerate(self.programa):
-            prefixo = ">>" if i == self.PC else "  "
-            texto_instrucao = ' '.join(instrucao)
-            binario_str = self.traduzir_instrucao_para_binario(instrucao)
-            linha = f"{prefixo} {i:<3} {texto_instrucao:<25} | {binario_str}\n"
-            self.area_bin.insert(tk.END, linha)
+        if self.bin_programa_exibido is not self.programa:
+            self._redesenhar_bin()
+        else:
+            self._mover_marcador_pc()
         self.area_bin.config(state=tk.DISABLED)
-        
-        # --- Atualiza Memória ---
+
+        # --- Atualiza Pontos Quentes ---
+        # Ordenar as contagens do programa inteiro a cada passo / fatia custaria mais que o próprio passo:
+        # durante a execução o painel é redesenhado no máximo uma vez a cada INTERVALO_PERFIL ms
+        # (sempre com as contagens mais novas), e na hora quando a execução termina ou para
+        if perfil_agora:
+            self._redesenhar_perfil()
+        elif back_end.perfil_execucao is not None and self._id_perfil is None:
+            self._id_perfil = self.master.after(self.INTERVALO_PERFIL, self._redesenhar_perfil)
+
+
+    # Células de memória mostradas no painel (a partir do início da .data) e quantas por linha
+    # No endereçamento por byte cada célula do painel é uma palavra de 4 bytes
+    MEM_VISIVEL = 64
+    CELULAS_POR_LINHA = 4
+
+    def _linha_registrador(self, idx):
+        nome = self.nomes_reg[idx]
+        valor = back_end.vetor_reg[idx]
+        # Hexadecimal da palavra de 32 bits (negativos em complemento de 2, como o montador.formatar_palavra)
+        return f"{nome:<5}: {valor:<10} (0x{valor & 0xFFFFFFFF:08X})"
+
+    def _ler_celulas(self, enderecos):
+        memoria = back_end.memoria
+        if back_end.modo_enderecamento == "byte":
+            return [memoria.ler(endereco, 4) for endereco in enderecos]
+        return [memoria[endereco] for endereco in enderecos]
+
+    def _linha_memoria(self, n):
+        """Linha n do painel de memória, com os valores já guardados em mem_exibida."""
+        inicio = n * self.CELULAS_POR_LINHA
+        valores = " ".join(f"{valor:<5}" for valor in self.mem_exibida[inicio:inicio + self.CELULAS_POR_LINHA])
+        return f"0x{self.enderecos_exibidos[inicio]:04X}: {valores}"
+
+    def _redesenhar_registradores(self):
+        self.area_registradores.config(state=tk.NORMAL)
+        self.area_registradores.delete('1.0', tk.END)
+        self.area_registradores.insert(tk.END, "--- REGISTRADORES ---\n")
+        self.area_registradores.insert(tk.END, "".join(self._linha_registrador(idx) + "\n" for idx in range(len(back_end.vetor_reg))))
+        self.area_registradores.config(state=tk.DISABLED)
+
+    def _redesenhar_memoria(self):
         # Adicionei uma visualização da memória para depuração
+        passo = 4 if back_end.modo_enderecamento == "byte" else 1
+        inicio = back_end.base_dados
+        fim = min(inicio + passo * self.MEM_VISIVEL, len(back_end.memoria) - passo + 1)
+        self.enderecos_exibidos = list(range(inicio, fim, passo))
+        self.mem_exibida = self._ler_celulas(self.enderecos_exibidos)
         self.area_memoria.config(state=tk.NORMAL)
         self.area_memoria.delete('1.0', tk.END)
-        self.area_memoria.insert(tk.INSERT, "--- MEMÓRIA (início) ---\n")
-        for i in range(0, 64, 4): # Exibe os primeiros 64 bytes
-            addr = f"0x{i:04X}"
-            val1 = self.memoria[i]
-            val2 = self.memoria[i+1]
-            val3 = self.memoria[i+2]
-            val4 = self.memoria[i+3]
-            linha = f"{addr}: {val1:<5} {val2:<5} {val3:<5} {val4:<5}\n"
-            self.area_memoria.insert(tk.END, linha)
+        self.area_memoria.insert(tk.END, "--- MEMÓRIA (início) ---\n")
+        linhas = range(0, len(self.enderecos_exibidos), self.CELULAS_POR_LINHA)
+        self.area_memoria.insert(tk.END, "".join(self._linha_memoria(i // self.CELULAS_POR_LINHA) + "\n" for i in linhas))
         self.area_memoria.config(state=tk.DISABLED)
 
+    def _trocar_linha(self, area, linha, texto):
+        """Reescreve uma linha do widget no lugar e marca como alterada."""
+        area.delete(f"{linha}.0", f"{linha}.0 lineend")
+        area.insert(f"{linha}.0", texto, "alterado")
+
+    def _atualizar_linhas_escritas(self):
+        """Troca apenas as linhas dos registradores e das células visíveis que o motor anotou como escritas."""
+        # Registradores: a linha 1 é o cabeçalho, o registrador idx fica na linha idx + 2
+        self.area_registradores.config(state=tk.NORMAL)
+        self.area_registradores.tag_remove("alterado", "1.0", tk.END)
+        for idx in sorted(back_end.regs_escritos):
+            self._trocar_linha(self.area_registradores, idx + 2, self._linha_registrador(idx))
+        self.area_registradores.config(state=tk.DISABLED)
+
+        # Memória: cada linha mostra CELULAS_POR_LINHA células. Endereços fora do painel (ou inválidos) são ignorados
+        # No modo byte um sb/sh cai dentro da palavra de 4 bytes da célula
+        passo = 4 if back_end.modo_enderecamento == "byte" else 1
+        visiveis = len(self.enderecos_exibidos)
+        celulas = ((endereco - back_end.base_dados) // passo for endereco in back_end.enderecos_escritos)
+        linhas = sorted({i // self.CELULAS_POR_LINHA for i in celulas if 0 <= i < visiveis})
+        self.area_memoria.config(state=tk.NORMAL)
+        self.area_memoria.tag_remove("alterado", "1.0", tk.END)
+        for n in linhas:
+            inicio = n * self.CELULAS_POR_LINHA
+            fim = min(inicio + self.CELULAS_POR_LINHA, visiveis)
+            self.mem_exibida[inicio:fim] = self._ler_celulas(self.enderecos_exibidos[inicio:fim])
+            self._trocar_linha(self.area_memoria, n + 2, self._linha_memoria(n))
+        self.area_memoria.config(state=tk.DISABLED)
+
+    def _redesenhar_bin(self):
+        """Formata as palavras da imagem montada (uma única vez por programa) e reescreve o painel."""
+        imagem, extras = self.programa_montado
+        self.linhas_bin = [
+            f"{i:<3} {' '.join(instrucao):<25} | {montador.formatar_palavra(palavra, extras)}\n"
+            for i, (instrucao, palavra) in enumerate(zip(self.programa, imagem))
+        ]
+        self.area_bin.delete('1.0', tk.END)
+        self.area_bin.insert(tk.END, "--- CÓDIGO FONTE E BINÁRIO ---\n")
+        self.area_bin.insert(tk.END, "".join(("   " if i != back_end.PC else ">> ") + linha for i, linha in enumerate(self.linhas_bin)))
+        self.bin_programa_exibido = self.programa
+        self.bin_pc_marcado = back_end.PC
+
+    # Linhas mostradas no painel de pontos quentes
+    PONTOS_QUENTES = 20
+    # Intervalo mínimo entre dois redesenhos do painel de pontos quentes durante a execução (ms)
+    INTERVALO_PERFIL = 500
+
+    def _redesenhar_perfil(self):
+        """Painel de pontos quentes: os PCs mais executados, do mais executado para o menos."""
+        # Um redesenho agendado ficaria repetido
+        if self._id_perfil is not None:
+            self.master.after_cancel(self._id_perfil)
+            self._id_perfil = None
+        self.area_perfil.config(state=tk.NORMAL)
+        self.area_perfil.delete('1.0', tk.END)
+        self.area_perfil.insert(tk.END, "--- PONTOS QUENTES ---\n")
+        contadores = back_end.perfil_execucao
+        if contadores is None:
+            self.area_perfil.insert(tk.END, "Perfil desligado\n")
+        else:
+            total = contadores.total()
+            self.area_perfil.insert(tk.END, f"{'PC':>5}  {'execuções':>12}  {'%':>7}  instrução\n")
+            self.area_perfil.insert(tk.END, "".join(
+                f"{pc:>5}  {n:>12}  {100 * n / total:6.2f}%  {' '.join(self.programa[pc])}\n"
+                for pc, n in contadores.pontos_quentes(self.PONTOS_QUENTES)
+            ))
+        self.area_perfil.config(state=tk.DISABLED)
+
+    def _mover_marcador_pc(self):
+        """Troca só o marcador '>>' de lugar, sem mexer no resto do painel."""
+        PC = back_end.PC
+        if self.bin_pc_marcado == PC:
+            return
+        # A linha 1 do widget é o cabeçalho, a instrução i fica na linha i + 2
+        if 0 <= self.bin_pc_marcado < len(self.linhas_bin):
+            linha = self.bin_pc_marcado + 2
+            self.area_bin.delete(f"{linha}.0", f"{linha}.2")
+            self.area_bin.insert(f"{linha}.0", "  ")
+        if 0 <= PC < len(self.linhas_bin):
+            linha = PC + 2
+            self.area_bin.delete(f"{linha}.0", f"{linha}.2")
+            self.area_bin.insert(f"{linha}.0", ">>")
+            self.area_bin.see(f"{linha}.0") # Mantém a instrução atual visível
+        self.bin_pc_marcado = PC
 
     #Criação da interface do programa
     def _create_widgets(self):
@@ -492,16 +600,47 @@ class MipsSimulatorGUI:
         frame_botoes = tk.Frame(frame_principal)
         frame_botoes.pack(fill="x", pady=(0, 10))
 
-        buttonFile = tk.Button(frame_botoes, text="Selecionar Arquivo (.s)", command=self.selecionar_arquivo)
+        buttonFile = tk.Button(frame_botoes, text="Selecionar Arquivo (.s / .mbin)", command=self.selecionar_arquivo)
+        buttonSalvar = tk.Button(frame_botoes, text="Salvar Imagem (.mbin)", command=self.salvar_imagem)
         buttonStart = tk.Button(frame_botoes, text="Executar/Próximo Passo", command=self.executar_programa)
+        buttonVoltar = tk.Button(frame_botoes, text="Voltar Passo", command=self.voltar_passo)
         buttonReset = tk.Button(frame_botoes, text="Resetar", command=self.resetar_simulador)
+        buttonStop = tk.Button(frame_botoes, text="Parar", command=self.parar_execucao)
         checkButton = tk.Checkbutton(frame_botoes, text="Executar Passo a Passo", variable=self.step_by_step)
+        checkPerfil = tk.Checkbutton(frame_botoes, text="Perfil", variable=self.perfil_ligado, command=self.alternar_perfil)
+        labelIntervalo = tk.Label(frame_botoes, text="Atualizar tela a cada (ms):")
+        spinIntervalo = tk.Spinbox(frame_botoes, from_=10, to=5000, increment=10, width=6, textvariable=self.intervalo_atualizacao)
+        labelPontos = tk.Label(frame_botoes, text="Ponto de retorno a cada:")
+        spinPontos = tk.Spinbox(frame_botoes, from_=1000, to=10_000_000, increment=1000, width=8, textvariable=self.intervalo_pontos)
+        labelMemoria = tk.Label(frame_botoes, text="Memória (células):")
+        spinMemoria = tk.Spinbox(frame_botoes, from_=16, to=16 * 1024 * 1024, increment=256, width=9, textvariable=self.tamanho_memoria)
+        # Layout e endereçamento: as mesmas opções do --layout / --enderecamento da linha de comando
+        menuLayout = tk.OptionMenu(frame_botoes, self.layout_memoria, *back_end.LAYOUTS_MEMORIA)
+        menuEnderecamento = tk.OptionMenu(frame_botoes, self.enderecamento, *back_end.MODOS_ENDERECAMENTO)
+        labelLinhas = tk.Label(frame_botoes, text="Linhas na saída:")
+        spinLinhas = tk.Spinbox(frame_botoes, from_=100, to=100000, increment=100, width=7, textvariable=self.max_linhas_saida)
+        self.label_contador = tk.Label(frame_botoes, text="Instruções executadas: 0")
 
         buttonFile.pack(side=tk.LEFT, padx=(0, 5))
+        buttonSalvar.pack(side=tk.LEFT, padx=(0, 5))
         buttonStart.pack(side=tk.LEFT, padx=5)
+        buttonVoltar.pack(side=tk.LEFT, padx=5)
+        buttonStop.pack(side=tk.LEFT, padx=5)
         buttonReset.pack(side=tk.LEFT, padx=5)
         checkButton.pack(side=tk.LEFT, padx=5)
-        
+        checkPerfil.pack(side=tk.LEFT, padx=5)
+        labelIntervalo.pack(side=tk.LEFT, padx=(15, 2))
+        spinIntervalo.pack(side=tk.LEFT)
+        labelPontos.pack(side=tk.LEFT, padx=(15, 2))
+        spinPontos.pack(side=tk.LEFT)
+        labelMemoria.pack(side=tk.LEFT, padx=(15, 2))
+        spinMemoria.pack(side=tk.LEFT)
+        menuLayout.pack(side=tk.LEFT, padx=(5, 0))
+        menuEnderecamento.pack(side=tk.LEFT)
+        labelLinhas.pack(side=tk.LEFT, padx=(15, 2))
+        spinLinhas.pack(side=tk.LEFT)
+        self.label_contador.pack(side=tk.RIGHT, padx=5)
+
         # --- Frame para os displays de texto ---
         # Este frame usa grid para melhor alinhamento e redimensionamento
         frame_displays = tk.Frame(frame_principal)
@@ -511,10 +650,20 @@ class MipsSimulatorGUI:
         frame_displays.columnconfigure(1, weight=2) # Coluna dos registradores e memória
         frame_displays.columnconfigure(2, weight=3) # Coluna de saída
 
-        # --- Coluna da Esquerda (Código Binário) ---
-        self.area_bin = scrolledtext.ScrolledText(frame_displays, width=60, height=20, font=("Courier New", 10), relief="solid", borderwidth=1)
-        self.area_bin.grid(row=0, column=0, sticky="nsew", padx=(0,5))
-        
+        # --- Coluna da Esquerda (Código Binário e Pontos Quentes) ---
+        frame_esquerda = tk.Frame(frame_displays)
+        frame_esquerda.grid(row=0, column=0, sticky="nsew", padx=(0,5))
+        frame_esquerda.rowconfigure(0, weight=3)
+        frame_esquerda.rowconfigure(1, weight=1)
+        frame_esquerda.columnconfigure(0, weight=1)
+
+        self.area_bin = scrolledtext.ScrolledText(frame_esquerda, width=60, height=20, font=("Courier New", 10), relief="solid", borderwidth=1)
+        self.area_bin.grid(row=0, column=0, sticky="nsew", pady=(0,5))
+
+        self.area_perfil = scrolledtext.ScrolledText(frame_esquerda, width=60, height=8, font=("Courier New", 10), relief="solid", borderwidth=1)
+        self.area_perfil.grid(row=1, column=0, sticky="nsew")
+        self._redesenhar_perfil()
+
         # --- Coluna do Meio (Registradores e Memória) ---
         frame_meio = tk.Frame(frame_displays)
         frame_meio.grid(row=0, column=1, sticky="nsew", padx=5)
@@ -524,20 +673,38 @@ class MipsSimulatorGUI:
 
         self.area_registradores = scrolledtext.ScrolledText(frame_meio, width=35, height=10, font=("Courier New", 10), relief="solid", borderwidth=1)
         self.area_registradores.grid(row=0, column=0, sticky="nsew", pady=(0,5))
-        
+
         # Adicionando visualizador de memória
         self.area_memoria = scrolledtext.ScrolledText(frame_meio, width=35, height=10, font=("Courier New", 10), relief="solid", borderwidth=1)
         self.area_memoria.grid(row=1, column=0, sticky="nsew")
 
+        # Destaque das linhas alteradas no último passo
+        self.area_registradores.tag_configure("alterado", background="#fff2a8")
+        self.area_memoria.tag_configure("alterado", background="#fff2a8")
+
         # --- Coluna da Direita (Saídas) ---
         self.area_saidas = scrolledtext.ScrolledText(frame_displays, width=50, height=20, font=("Courier New", 10), relief="solid", borderwidth=1)
         self.area_saidas.grid(row=0, column=2, sticky="nsew", padx=(5,0))
 
 
 # --- Ponto de Entrada Principal da Aplicação ---
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Abre a interface. Retorna o código de saída do processo.
+
+    Com argumentos (python minimips.py arquivo.s -q ...) roda sem interface pelo back_end.main, sem importar o Tk.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return back_end.main(argv)
     # A execução do programa agora consiste em criar a janela principal
     # e instanciar a classe da nossa aplicação.
+    carregar_tk()
     root_window = tk.Tk()
     app = MipsSimulatorGUI(master=root_window)
-    root_window.mainloop()
\ No newline at end of file
+    root_window.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
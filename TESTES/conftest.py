@@ -0,0 +1,43 @@
+"""Configuração dos testes: LOGICA no sys.path e o back_end limpo antes de cada teste"""
+
+# Rodar da raiz do projeto: python -m pytest -q TESTES
+# O back_end guarda o estado da máquina em variáveis do módulo, então cada teste começa do layout padrão,
+# sem nenhum instrumento ligado (nem as escritas anotadas) e com as mensagens guardadas em uma lista (em vez de irem para o terminal)
+
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "LOGICA"))
+
+import back_end  # noqa: E402
+
+PASTA_ASSEMBLY = os.path.join(RAIZ, "TESTES_ASSEMBLY")
+ARQUIVOS_ASSEMBLY = [os.path.join(PASTA_ASSEMBLY, f"teste-{i}.s") for i in range(1, 5)]
+
+
+@pytest.fixture(autouse=True)
+def saidas():
+    """Lista com as mensagens do back_end (saída das syscalls, logs e erros) do teste atual."""
+    mensagens = []
+    back_end.configurar_memoria()
+    back_end.destino_saida = mensagens.append
+    back_end.pasta_cache_disco = None
+    back_end.cache_programas.clear()
+    back_end.gravador_rastreio = back_end.perfil_execucao = back_end.modelo_pipeline = back_end.caches_dados = None
+    back_end.regs_escritos = back_end.enderecos_escritos = None
+    yield mensagens
+    back_end.destino_saida = None
+    back_end.gravador_rastreio = back_end.perfil_execucao = back_end.modelo_pipeline = back_end.caches_dados = None
+    back_end.regs_escritos = back_end.enderecos_escritos = None
+    back_end.configurar_memoria()
+
+
+def escrever_programa(pasta, texto, nome="programa.s"):
+    """Grava um programa .s na pasta (tmp_path do pytest) e devolve o caminho."""
+    caminho = os.path.join(str(pasta), nome)
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(texto)
+    return caminho
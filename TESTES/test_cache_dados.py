@@ -0,0 +1,129 @@
+"""Caches de dados: acertos, falhas, despejos e escritas de volta de fluxos pequenos, contados à mão"""
+
+import pytest
+
+import back_end
+import cache_dados
+from conftest import escrever_programa
+
+# Duas passadas de lw por um vetor de 16 palavras (64 bytes, 4 linhas de 16 B) e um sw no primeiro elemento
+# O vetor é o início do .data, então começa em uma linha
+DUAS_PASSADAS = (
+    ".data\n"
+    "v: .word 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16\n"
+    ".text\n"
+    "    la $t0, v\n"
+    "    addi $t2, $zero, 2\n"
+    "passada:\n"
+    "    addi $t1, $zero, 16\n"
+    "    add $t3, $t0, $zero\n"
+    "laco:\n"
+    "    lw $a0, 0($t3)\n"
+    "    addi $t3, $t3, {passo}\n"
+    "    addi $t1, $t1, -1\n"
+    "    bne $t1, $zero, laco\n"
+    "    addi $t2, $t2, -1\n"
+    "    bne $t2, $zero, passada\n"
+    "    sw $a0, 0($t0)\n"
+)
+
+# configuração -> (falhas de leitura, falhas de escrita, despejos, escritas de volta)
+ESPERADO = {
+    # Cabe tudo: só a primeira leitura de cada linha falha
+    "1K:16": (4, 0, 0, 0),
+    # 4 conjuntos de 1 via: cada linha do vetor cai em um conjunto
+    "64:16": (4, 0, 0, 0),
+    # 1 conjunto de 2 vias: a passada pelas 4 linhas despeja sempre a que vai ser lida depois (LRU e FIFO iguais aqui).
+    # 2 despejos na 1ª passada, 4 na 2ª, e o sw falha e despeja mais 1 (limpa: a linha suja fica na cache)
+    "32:16:2:lru": (8, 1, 7, 0),
+    "32:16:2:fifo": (8, 1, 7, 0),
+}
+
+
+def rodar(arquivo, configuracoes, modo="tabela", fatia=None):
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    back_end.caches_dados = caches = [cache_dados.ler_configuracao(texto) for texto in configuracoes]
+    while back_end.PC < len(matriz_programa):
+        back_end.executar(matriz_programa, programa_decodificado, data_table, modo, limite_instrucoes=fatia)
+    back_end.caches_dados = None
+    assert back_end.erros == []
+    return caches
+
+
+@pytest.mark.parametrize("layout, enderecamento", [("compacto", "palavra"), ("compacto", "byte"),
+                                                   ("mars", "palavra"), ("spim", "byte")])
+def test_duas_passadas(layout, enderecamento, tmp_path, saidas):
+    back_end.configurar_memoria(layout, 4096, enderecamento)
+    # No endereçamento por byte o vetor anda de 4 em 4: os endereços em bytes (e as contagens) são os mesmos
+    passo = 4 if enderecamento == "byte" else 1
+    arquivo = escrever_programa(tmp_path, DUAS_PASSADAS.format(passo=passo))
+    for configuracao, cache in zip(ESPERADO, rodar(arquivo, ESPERADO)):
+        assert (cache.falhas_leitura, cache.falhas_escrita, cache.despejos, cache.escritas_de_volta) == ESPERADO[configuracao]
+        assert (cache.leituras, cache.escritas) == (32, 1)
+        assert cache.relatorio()["acertos"] == 33 - cache.falhas()
+        assert cache.amat() == pytest.approx(1 + cache.falhas() / 33 * 100)
+
+
+@pytest.mark.parametrize("modo", back_end.MOTORES)
+def test_motores_e_fatias_contam_igual(modo, tmp_path, saidas):
+    # O laço das caches é o mesmo em todos os motores, e o fluxo continua de um executar() para o outro
+    arquivo = escrever_programa(tmp_path, DUAS_PASSADAS.format(passo=1))
+    inteiro = [cache.relatorio() for cache in rodar(arquivo, ESPERADO)]
+    assert [cache.relatorio() for cache in rodar(arquivo, ESPERADO, modo, fatia=5)] == inteiro
+
+
+def leitura(endereco):
+    return endereco << 1
+
+
+def escrita(endereco):
+    return endereco << 1 | 1
+
+
+def test_lru_e_fifo():
+    # 1 conjunto de 2 vias: A, B, A, C, A. No LRU o C despeja o B (o A acabou de ser usado), no FIFO despeja o A
+    fluxo = [leitura(0), leitura(16), leitura(4), leitura(32), leitura(8)]
+    lru, fifo = cache_dados.avaliar(fluxo, [cache_dados.Cache(32, 16, 2, "lru"), cache_dados.Cache(32, 16, 2, "fifo")])
+    assert (lru.falhas(), lru.despejos) == (3, 1)
+    assert (fifo.falhas(), fifo.despejos) == (4, 2)
+
+
+def test_escrita_de_volta():
+    # Write-allocate: a escrita que falha traz a linha; ela só volta para a memória quando é despejada
+    cache = cache_dados.Cache(32, 16, 2)
+    cache.processar([escrita(0), leitura(16), leitura(32), leitura(48)])
+    assert (cache.falhas_escrita, cache.falhas_leitura) == (1, 3)
+    assert (cache.despejos, cache.escritas_de_volta) == (2, 1)
+    assert cache.sujas == set()
+    # A mesma linha escrita de novo e ainda na cache: acerto, nada volta para a memória
+    cache.processar([escrita(36), escrita(40)])
+    assert (cache.escritas, cache.falhas_escrita, cache.escritas_de_volta) == (3, 1, 1)
+
+
+def test_aleatoria_repete_com_a_mesma_semente():
+    fluxo = [leitura(16 * (i * 7 % 13)) for i in range(200)]
+    primeira, segunda = (cache_dados.Cache(64, 16, 4, "aleatoria", semente=3) for _ in range(2))
+    cache_dados.avaliar(fluxo, [primeira, segunda])
+    assert primeira.relatorio() == segunda.relatorio()
+    primeira.limpar()
+    assert primeira.acessos() == 0 and primeira.conjuntos == [[]]
+
+
+@pytest.mark.parametrize("texto", ["8K", "8K:48", "100:16", "8K:64:4:mru", "oito:64"])
+def test_configuracao_invalida(texto):
+    with pytest.raises(ValueError):
+        cache_dados.ler_configuracao(texto)
+
+
+def test_resumo_no_modo_silencioso(tmp_path, monkeypatch, capsys):
+    # Sem a lista do teste: a linha de comando escreve no stdout / stderr
+    monkeypatch.setattr(back_end, "destino_saida", None)
+    monkeypatch.setattr(back_end, "silencioso", False)
+    arquivo = escrever_programa(tmp_path, DUAS_PASSADAS.format(passo=1) + "    addi $v0, $zero, 1\n    syscall\n")
+    assert back_end.main([arquivo, "-q", "--cache-dados", "1K:16", "--cache-dados", "32:16:2"]) == 0
+    saida = capsys.readouterr()
+    assert saida.out == "16\n"
+    linhas = saida.err.splitlines()
+    assert len(linhas) == 2 and all("acertos" in linha and "AMAT" in linha for linha in linhas)
+    assert "4 falhas" in linhas[0] and "9 falhas" in linhas[1]
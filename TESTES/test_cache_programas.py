@@ -0,0 +1,74 @@
+"""Cache de programas: memória e disco devolvem o mesmo programa, e o cache em disco nunca executa código"""
+
+import os
+import pickle
+
+import pytest
+
+import back_end
+import imagem_binaria
+from conftest import ARQUIVOS_ASSEMBLY
+from test_motores import rodar
+
+
+@pytest.mark.parametrize("layout, enderecamento, tamanho", [("compacto", "palavra", 4096), ("mars", "byte", 256)])
+@pytest.mark.parametrize("arquivo", ARQUIVOS_ASSEMBLY, ids=os.path.basename)
+def test_cache_em_disco(arquivo, layout, enderecamento, tamanho, tmp_path, saidas, monkeypatch):
+    back_end.configurar_memoria(layout, tamanho, enderecamento)
+    back_end.pasta_cache_disco = str(tmp_path)
+    esperado = rodar(arquivo, "tabela", saidas)
+    assert [os.path.splitext(nome)[1] for nome in os.listdir(tmp_path)] == [imagem_binaria.EXTENSAO]
+
+    # Daqui em diante o .s não pode ser lido de novo
+    monkeypatch.setattr(back_end, "read_arq", lambda *args, **kwargs: pytest.fail("o .s foi lido de novo"))
+    # Cache em memória
+    assert rodar(arquivo, "tabela", saidas) == esperado
+    # Só o disco (outro processo)
+    back_end.cache_programas.clear()
+    assert rodar(arquivo, "tabela", saidas) == esperado
+    back_end.cache_programas.clear()
+    assert rodar(arquivo, "referencia", saidas) == esperado
+
+
+class Armadilha:
+    """Objeto que cria um arquivo se for despicklado."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def __reduce__(self):
+        return (open, (self.caminho, "w"))
+
+
+def test_cache_em_disco_nao_despickla(tmp_path, saidas):
+    pasta = tmp_path / "cache"
+    back_end.pasta_cache_disco = str(pasta)
+    esperado = rodar(ARQUIVOS_ASSEMBLY[3], "tabela", saidas)
+    (entrada,) = os.listdir(pasta)
+
+    # Quem escreve na pasta troca a entrada por um pickle (com o nome antigo .pkl e com o nome atual)
+    armadilha = tmp_path / "executou"
+    conteudo = pickle.dumps(Armadilha(str(armadilha)))
+    (pasta / entrada).write_bytes(conteudo)
+    (pasta / (os.path.splitext(entrada)[0] + ".pkl")).write_bytes(conteudo)
+    back_end.cache_programas.clear()
+    assert rodar(ARQUIVOS_ASSEMBLY[3], "tabela", saidas) == esperado
+    assert not armadilha.exists()
+
+
+@pytest.mark.parametrize("posicao, valor", [(6, 7), (20, 12), (42, 0xFF)], ids=["modo", "tamanho-dados", "registrador"])
+def test_entrada_estragada_e_uma_falta(posicao, valor, tmp_path, saidas):
+    # 42: byte do rt da 3ª palavra (lw $t1, 0($t1)), que passa a ser o registrador 31
+    back_end.pasta_cache_disco = str(tmp_path)
+    esperado = rodar(ARQUIVOS_ASSEMBLY[3], "tabela", saidas)
+    (entrada,) = os.listdir(tmp_path)
+    caminho = tmp_path / entrada
+    original = caminho.read_bytes()
+    conteudo = bytearray(original)
+    conteudo[posicao] = valor
+    caminho.write_bytes(conteudo)
+
+    back_end.cache_programas.clear()
+    assert rodar(ARQUIVOS_ASSEMBLY[3], "tabela", saidas) == esperado
+    # A entrada foi gravada de novo
+    assert caminho.read_bytes() == original
@@ -0,0 +1,101 @@
+"""Voltar Passo: voltar e executar de novo chega sempre ao mesmo estado da primeira vez"""
+
+import os
+
+import pytest
+
+import back_end
+import historico
+from conftest import ARQUIVOS_ASSEMBLY, escrever_programa
+
+# Laço com sw/lw e chamada de função: o estado muda em registradores e na memória a cada volta
+PROGRAMA = (
+    ".data\n"
+    "v: .word 0, 0, 0, 0\n"
+    ".text\n"
+    "    addi $t1, $zero, 40\n"
+    "    la $t3, v\n"
+    "laco:\n"
+    "    addi $t0, $t0, 1\n"
+    "    jal soma\n"
+    "    sw $t2, 0($t3)\n"
+    "    lw $a0, 0($t3)\n"
+    "    addi $v0, $zero, 1\n"
+    "    syscall\n"
+    "    bne $t0, $t1, laco\n"
+    "    j fim\n"
+    "soma:\n"
+    "    add $t2, $t2, $t0\n"
+    "    jr $ra\n"
+    "fim:\n"
+)
+
+
+def estado():
+    return back_end.PC, list(back_end.vetor_reg), back_end.hash_memoria(), back_end.encerrado_por_syscall
+
+
+def preparar(arquivo, modo, intervalo, max_pontos=historico.MAX_PONTOS_PADRAO):
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    h = historico.HistoricoExecucao(intervalo, max_pontos)
+    h.iniciar(matriz_programa, programa_decodificado, data_table, modo)
+    return h, len(matriz_programa)
+
+
+def estados_passo_a_passo(h, fim):
+    """Estado depois de cada passo (o índice é o passo), executando uma instrução por vez pelo histórico."""
+    estados = [estado()]
+    while back_end.PC < fim:
+        assert h.executar(limite_instrucoes=1) == 1
+        estados.append(estado())
+    return estados
+
+
+@pytest.mark.parametrize("intervalo, max_pontos", [(historico.INTERVALO_PADRAO, historico.MAX_PONTOS_PADRAO), (5, 4)])
+@pytest.mark.parametrize("modo", back_end.MOTORES)
+def test_voltar_refaz_o_mesmo_estado(modo, intervalo, max_pontos, tmp_path, saidas):
+    arquivo = escrever_programa(tmp_path, PROGRAMA)
+    h, fim = preparar(arquivo, modo, intervalo, max_pontos)
+    estados = estados_passo_a_passo(h, fim)
+    impressas = list(saidas)
+    assert len(estados) - 1 == h.passo == 2 + 40 * 9 + 1
+
+    # Voltando de um em um até o início: cada passo é o mesmo estado da ida, e a saída não se repete
+    for passo in range(h.passo - 1, -1, -1):
+        assert h.voltar(1) == passo
+        assert estado() == estados[passo], passo
+    assert saidas == impressas
+    assert h.voltar(1) == 0
+
+    # Saltos maiores, e a execução até o fim depois de voltar chega ao mesmo estado final
+    for alvo in (200, 57, 3, 350):
+        if alvo > h.passo:
+            h.executar(limite_instrucoes=alvo - h.passo)
+        else:
+            h.voltar(h.passo - alvo)
+        assert h.passo == alvo and estado() == estados[alvo]
+    assert h.voltar(123) == 350 - 123 and estado() == estados[350 - 123]
+    h.executar()
+    assert estado() == estados[-1]
+
+
+@pytest.mark.parametrize("arquivo", ARQUIVOS_ASSEMBLY, ids=os.path.basename)
+def test_voltar_nos_testes(arquivo, saidas):
+    h, fim = preparar(arquivo, "blocos", intervalo=4, max_pontos=3)
+    estados = estados_passo_a_passo(h, fim)
+    for passo in (len(estados) // 2, 1, 0):
+        h.voltar(h.passo - passo)
+        assert estado() == estados[passo]
+    h.executar()
+    assert estado() == estados[-1]
+
+
+def test_pontos_limitados(tmp_path, saidas):
+    # Com poucos pontos o intervalo dobra, mas voltar continua exato
+    arquivo = escrever_programa(tmp_path, PROGRAMA)
+    h, fim = preparar(arquivo, "tabela", intervalo=2, max_pontos=4)
+    estados = estados_passo_a_passo(h, fim)
+    assert len(h.pontos) <= 4 and h.intervalo > 2 and h.passos[0] == 0
+    h.voltar(h.passo - 100)
+    assert estado() == estados[100]
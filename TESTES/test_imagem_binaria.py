@@ -0,0 +1,164 @@
+"""Imagem .mbin: salvar e abrir de novo chega ao mesmo programa e à mesma execução"""
+
+import mmap
+import os
+from array import array
+
+import pytest
+
+import back_end
+import imagem_binaria
+import montador
+from conftest import ARQUIVOS_ASSEMBLY, escrever_programa
+from test_motores import rodar
+
+CONFIGURACOES = [
+    ("compacto", "palavra", 4096),
+    ("compacto", "byte", 4096),
+    ("mars", "palavra", 256),
+    ("spim", "byte", 256),
+]
+
+
+def salvar(arquivo, pasta):
+    """Carrega o .s e grava a imagem dele na pasta. Devolve (caminho da imagem, instruções do .s)."""
+    back_end.resetar_estado()
+    matriz_programa, data_table, _ = back_end.carregar_programa(arquivo)
+    caminho = os.path.join(str(pasta), os.path.splitext(os.path.basename(arquivo))[0] + imagem_binaria.EXTENSAO)
+    back_end.salvar_imagem(caminho, matriz_programa, data_table, list(back_end.erros))
+    return caminho, list(matriz_programa)
+
+
+@pytest.mark.parametrize("layout, enderecamento, tamanho", CONFIGURACOES)
+@pytest.mark.parametrize("arquivo", ARQUIVOS_ASSEMBLY, ids=os.path.basename)
+def test_ida_e_volta(arquivo, layout, enderecamento, tamanho, tmp_path, saidas):
+    back_end.configurar_memoria(layout, tamanho, enderecamento)
+    esperado = rodar(arquivo, "tabela", saidas)
+    caminho, instrucoes = salvar(arquivo, tmp_path)
+
+    back_end.resetar_estado()
+    matriz_programa, _, _ = back_end.carregar_programa(caminho)
+    assert isinstance(matriz_programa, montador.ProgramaMontado)
+    assert list(matriz_programa) == instrucoes
+    for modo in back_end.MOTORES:
+        assert rodar(caminho, modo, saidas) == esperado, modo
+
+
+def test_imagem_sem_texto_das_instrucoes(tmp_path):
+    caminho, _ = salvar(ARQUIVOS_ASSEMBLY[2], tmp_path) # teste-3: tem linhas com erro
+    with imagem_binaria.ImagemPrograma(caminho) as imagem:
+        assert not hasattr(imagem, "fonte")
+        assert imagem.fonte_erros
+        assert all(montador.decodificar_palavra(imagem.palavras[PC], imagem.extras)[0] == montador.ERRO
+                   for PC in imagem.fonte_erros)
+
+
+def test_close_fecha_o_arquivo(tmp_path):
+    caminho, _ = salvar(ARQUIVOS_ASSEMBLY[3], tmp_path)
+    with imagem_binaria.ImagemPrograma(caminho) as imagem:
+        programa = imagem.matriz_programa()
+    assert imagem._mapa.closed
+    # O programa devolvido tem a própria cópia das palavras
+    assert len(programa) == 26 and programa[13] == ["jal", "imprime_inteiro"]
+
+
+def test_memoria_paginada_fecha_a_imagem(tmp_path, saidas):
+    # .data com mais de uma página inteira: as páginas apontam para o arquivo até serem escritas ou descartadas
+    valores = ", ".join(str(i) for i in range(1, 10001))
+    fonte = tmp_path / "grande.s"
+    fonte.write_text(f".data\nv: .word {valores}\n.text\n la $t0, v\n lw $a0, 9999($t0)\n addi $v0, $zero, 1\n syscall\n")
+    back_end.configurar_memoria("mars")
+    caminho, _ = salvar(str(fonte), tmp_path)
+    back_end.resetar_estado()
+    back_end.carregar_programa(caminho)
+    assert back_end.memoria.mapeadas
+    imagem = back_end.memoria.imagens[0]
+    assert not imagem._mapa.closed
+    back_end.resetar_estado()
+    assert imagem._mapa.closed and not back_end.memoria.imagens
+
+
+def test_metadados_adulterados_sao_recusados(tmp_path, saidas):
+    # Um extra com texto no lugar de um número iria parar no código gerado pelo motor de blocos
+    caminho = str(tmp_path / "adulterada.mbin")
+    palavra_extra = montador.OPCODE_EXTRA << 26
+    imagem_binaria.salvar(caminho, [palavra_extra], [("add", "__import__('os')", 0, 0)], {}, [["add"]], [], 0)
+    with pytest.raises(imagem_binaria.ErroImagem):
+        imagem_binaria.ImagemPrograma(caminho)
+    assert back_end.carregar_programa(caminho) == (None, None, None)
+    assert "metadados inválidos" in back_end.erros[-1]
+
+
+def regravar(origem, destino, layout="compacto", extras=None, palavras=None):
+    """Grava de novo a imagem 'origem' em 'destino', com os campos trocados (como faria quem adultera o arquivo)."""
+    with imagem_binaria.ImagemPrograma(origem) as imagem:
+        programa = imagem.matriz_programa()
+        imagem_binaria.salvar(destino, palavras if palavras is not None else programa.palavras,
+                              extras if extras is not None else programa.extras, imagem.simbolos, programa,
+                              array('q', imagem.dados), imagem.base_dados, layout, rotulos=imagem.rotulos)
+
+
+def test_registradores_fora_do_vetor_sao_recusados(tmp_path, saidas):
+    fonte = escrever_programa(tmp_path, ".data\nv: .word 7\n.text\n la $t0, v\n lw $a0, 0($t0)\n")
+    caminho, _ = salvar(fonte, tmp_path)
+    with imagem_binaria.ImagemPrograma(caminho) as imagem:
+        (la,) = imagem.extras
+        palavras = array('I', imagem.palavras)
+
+    adulteradas = {
+        # O registrador do extra vai para o código gerado pelo motor de blocos
+        "extra.mbin": dict(extras=[("la", -5, la[2], la[3])]),
+        # rt = 31 no lw (vetor_reg tem 11 registradores)
+        "palavra.mbin": dict(palavras=array('I', [palavras[0], palavras[1] | 31 << 16])),
+    }
+    for nome, mudancas in adulteradas.items():
+        destino = str(tmp_path / nome)
+        regravar(caminho, destino, **mudancas)
+        with pytest.raises(imagem_binaria.ErroImagem, match="registrador"):
+            imagem_binaria.ImagemPrograma(destino)
+        back_end.resetar_estado()
+        assert back_end.carregar_programa(destino) == (None, None, None), nome
+        assert "registrador" in back_end.erros[-1]
+
+
+def test_layout_desconhecido_vira_erro_de_carregamento(tmp_path, saidas):
+    caminho, _ = salvar(ARQUIVOS_ASSEMBLY[3], tmp_path)
+    destino = str(tmp_path / "layout.mbin")
+    regravar(caminho, destino, layout="xx")
+    back_end.resetar_estado()
+    assert back_end.carregar_programa(destino) == (None, None, None)
+    assert "Layout de memória desconhecido" in back_end.erros[-1]
+    assert back_end.layout_memoria == "compacto"
+
+
+class MapaContado(mmap.mmap):
+    """mmap que guarda cada arquivo mapeado, para conferir que todos foram fechados."""
+    abertos = []
+
+    def __new__(cls, *args, **kwargs):
+        mapa = super().__new__(cls, *args, **kwargs)
+        cls.abertos.append(mapa)
+        return mapa
+
+
+@pytest.mark.parametrize("posicao, valor", [
+    (6, 7),                          # modo (0 = palavra, 1 = byte)
+    (7, 9),                          # ordem dos bytes
+    (20, 12),                        # tamanho da .data que não é múltiplo de 8 no modo palavra
+    (28, 3),                         # tamanho dos metadados cortando o JSON
+    (32, 0xFF),                      # 1ª palavra com opcode 0x3F e extra inexistente
+])
+def test_cabecalho_adulterado_e_recusado_e_fechado(posicao, valor, tmp_path, monkeypatch):
+    caminho, _ = salvar(ARQUIVOS_ASSEMBLY[1], tmp_path)
+    conteudo = bytearray(open(caminho, "rb").read())
+    conteudo[posicao] = valor
+    if posicao == 32:
+        conteudo[32:36] = (montador.OPCODE_EXTRA << 26 | 999).to_bytes(4, "little")
+    open(caminho, "wb").write(conteudo)
+
+    monkeypatch.setattr(imagem_binaria.mmap, "mmap", MapaContado)
+    MapaContado.abertos.clear()
+    with pytest.raises(imagem_binaria.ErroImagem):
+        imagem_binaria.ImagemPrograma(caminho)
+    (mapa,) = MapaContado.abertos
+    assert mapa.closed
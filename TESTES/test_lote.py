@@ -0,0 +1,124 @@
+"""Correção em lote: relatório JSONL/CSV, limite de instruções, prazo e trabalhadores que travam ou morrem"""
+
+import csv
+import io
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import back_end
+import lote
+from conftest import ARQUIVOS_ASSEMBLY, escrever_programa
+from test_motores import rodar
+
+LACO_INFINITO = ".text\nlaco:\n    addi $t0, $t0, 1\n    j laco\n"
+
+# Os trabalhadores herdam o back_end do processo do teste (com o carregar_programa trocado) só no fork
+so_com_fork = pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                                 reason="os trabalhadores só herdam o monkeypatch com fork")
+
+
+@pytest.fixture
+def lote_no_stdout(monkeypatch):
+    """Os trabalhadores escrevem a saída das syscalls no stdout (que o simular_job captura), não na lista do teste."""
+    monkeypatch.setattr(back_end, "destino_saida", None)
+
+
+def rodar_lote(arquivos, formato="jsonl", **opcoes):
+    """Roda o lote em memória. Devolve (resultados por arquivo, contagem de status, texto do relatório)."""
+    saida = io.StringIO()
+    contagem = lote.rodar_lote(arquivos, lote.Relatorio(saida, formato), **opcoes)
+    texto = saida.getvalue()
+    if formato == "csv":
+        linhas = list(csv.DictReader(io.StringIO(texto)))
+    else:
+        linhas = [json.loads(linha) for linha in texto.splitlines()]
+    return {linha["arquivo"]: linha for linha in linhas}, contagem, texto
+
+
+def test_relatorio_jsonl_igual_a_execucao_direta(lote_no_stdout, saidas):
+    resultados, contagem, _ = rodar_lote(ARQUIVOS_ASSEMBLY, processos=2)
+    assert contagem == {"ok": len(ARQUIVOS_ASSEMBLY)}
+    for arquivo in ARQUIVOS_ASSEMBLY:
+        esperado = rodar(arquivo, "blocos", saidas)
+        resultado = resultados[arquivo]
+        assert set(resultado) == set(lote.CAMPOS_CSV)
+        assert resultado["instrucoes"] == esperado["executadas"]
+        assert resultado["hash_memoria"] == esperado["memoria"]
+        assert list(resultado["registradores"].values()) == esperado["registradores"]
+        assert resultado["erros"] == esperado["erros"]
+
+
+def test_relatorio_csv(lote_no_stdout, tmp_path):
+    resultados, _, texto = rodar_lote(ARQUIVOS_ASSEMBLY, "csv", processos=2)
+    assert texto.splitlines()[0] == ",".join(lote.CAMPOS_CSV)
+    resultado = resultados[ARQUIVOS_ASSEMBLY[3]]
+    assert resultado["status"] == "ok" and resultado["instrucoes"] == "49"
+    assert resultado["saida"].startswith("Soma do vetor: \n35\n")
+    assert json.loads(resultado["registradores"])["$ra"] == 21
+    # O teste-3 tem linhas com erro: a lista vai como JSON em uma coluna
+    assert json.loads(resultados[ARQUIVOS_ASSEMBLY[2]]["erros"])
+
+
+def test_limite_de_instrucoes_e_arquivo_inexistente(lote_no_stdout, tmp_path):
+    laco = escrever_programa(tmp_path, LACO_INFINITO)
+    inexistente = str(tmp_path / "nao_existe.s")
+    resultados, contagem, _ = rodar_lote([laco, inexistente], limite_instrucoes=1001)
+    assert contagem == {"limite_instrucoes": 1, "erro_leitura": 1}
+    assert resultados[laco]["instrucoes"] == 1001
+
+
+def test_laco_infinito_sai_por_tempo_e_os_outros_terminam(lote_no_stdout, tmp_path):
+    laco = escrever_programa(tmp_path, LACO_INFINITO)
+    resultados, contagem, _ = rodar_lote([laco, *ARQUIVOS_ASSEMBLY], processos=2, tempo_limite=0.3)
+    assert contagem == {"tempo_esgotado": 1, "ok": len(ARQUIVOS_ASSEMBLY)}
+    # Parou pelo prazo do próprio job (com o estado da máquina no relatório), não pelo processo pai
+    assert resultados[laco]["instrucoes"] > 0 and resultados[laco]["registradores"]
+
+
+def carregar_com_defeito(original):
+    """carregar_programa que trava em 'trava.s' e derruba o trabalhador em 'derruba.s'."""
+    def carregar(arquivo):
+        nome = os.path.basename(arquivo)
+        if nome == "trava.s":
+            time.sleep(60)
+        elif nome == "derruba.s":
+            os._exit(1)
+        return original(arquivo)
+    return carregar
+
+
+@so_com_fork
+def test_trabalhador_travado_e_encerrado_pelo_pai(lote_no_stdout, tmp_path, monkeypatch):
+    monkeypatch.setattr(back_end, "carregar_programa", carregar_com_defeito(back_end.carregar_programa))
+    monkeypatch.setattr(lote, "FOLGA_PRAZO", 0.2)
+    trava = escrever_programa(tmp_path, LACO_INFINITO, "trava.s")
+    inicio = time.monotonic()
+    resultados, contagem, _ = rodar_lote([trava, *ARQUIVOS_ASSEMBLY], processos=2, tempo_limite=0.3)
+    assert time.monotonic() - inicio < 10
+    assert contagem == {"tempo_esgotado": 1, "ok": len(ARQUIVOS_ASSEMBLY)}
+    assert "encerrado pelo lote" in resultados[trava]["erros"][0]
+
+
+@so_com_fork
+def test_trabalhador_que_morre_so_derruba_o_proprio_arquivo(lote_no_stdout, tmp_path, monkeypatch):
+    monkeypatch.setattr(back_end, "carregar_programa", carregar_com_defeito(back_end.carregar_programa))
+    derruba = escrever_programa(tmp_path, LACO_INFINITO, "derruba.s")
+    arquivos = [ARQUIVOS_ASSEMBLY[0], derruba, *ARQUIVOS_ASSEMBLY[1:]]
+    resultados, contagem, _ = rodar_lote(arquivos, processos=3)
+    assert contagem == {"falha": 1, "ok": len(ARQUIVOS_ASSEMBLY)}
+    assert resultados[derruba]["status"] == "falha"
+    assert "BrokenProcessPool" in resultados[derruba]["erros"][0]
+    assert all(resultados[arquivo]["status"] == "ok" for arquivo in ARQUIVOS_ASSEMBLY)
+
+
+def test_main_grava_o_relatorio(lote_no_stdout, tmp_path, capsys):
+    destino = tmp_path / "relatorio.csv"
+    assert lote.main([os.path.dirname(ARQUIVOS_ASSEMBLY[0]), "--saida", str(destino), "--processos", "2"]) == 0
+    with open(destino, encoding="utf-8", newline="") as f:
+        linhas = list(csv.DictReader(f))
+    assert len(linhas) == len(lote.listar_arquivos([os.path.dirname(ARQUIVOS_ASSEMBLY[0])]))
+    assert "ok:" in capsys.readouterr().err
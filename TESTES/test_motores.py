@@ -0,0 +1,114 @@
+"""Todos os motores do back_end chegam ao mesmo resultado que o motor de referência"""
+
+import os
+
+import pytest
+
+import back_end
+from conftest import ARQUIVOS_ASSEMBLY, escrever_programa
+
+# (layout, endereçamento, tamanho da memória compacta)
+CONFIGURACOES = [
+    ("compacto", "palavra", 256),
+    ("compacto", "palavra", 4096),
+    ("compacto", "byte", 4096),
+    ("mars", "palavra", 256),
+    ("mars", "byte", 256),
+    ("spim", "palavra", 256),
+    ("spim", "byte", 256),
+]
+
+
+def rodar(arquivo, modo, saidas):
+    """Carrega e roda o arquivo do início no motor 'modo'. Devolve tudo o que dá para comparar entre motores."""
+    saidas.clear()
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    assert matriz_programa is not None
+    executadas = back_end.executar(matriz_programa, programa_decodificado, data_table, modo)
+    return {
+        "executadas": executadas,
+        "PC": back_end.PC,
+        "registradores": list(back_end.vetor_reg),
+        "memoria": back_end.hash_memoria(),
+        "erros": list(back_end.erros),
+        "saidas": list(saidas),
+    }
+
+
+@pytest.mark.parametrize("layout, enderecamento, tamanho", CONFIGURACOES)
+@pytest.mark.parametrize("arquivo", ARQUIVOS_ASSEMBLY, ids=os.path.basename)
+def test_motores_equivalentes(arquivo, layout, enderecamento, tamanho, saidas):
+    back_end.configurar_memoria(layout, tamanho, enderecamento)
+    referencia = rodar(arquivo, "referencia", saidas)
+    for modo in back_end.MOTORES[1:]:
+        assert rodar(arquivo, modo, saidas) == referencia, modo
+
+
+@pytest.mark.parametrize("modo", back_end.MOTORES)
+def test_desvios_e_funcao(modo, saidas):
+    back_end.configurar_memoria("compacto", 4096)
+    resultado = rodar(ARQUIVOS_ASSEMBLY[3], modo, saidas)
+    assert resultado["saidas"][:4] == ["Soma do vetor: ", "35", "Dobro da soma: ", "70"]
+    assert resultado["erros"] == []
+    assert back_end.vetor_reg[back_end.reg_dic["$ra"]] == 21
+
+
+@pytest.mark.parametrize("modo", back_end.MOTORES)
+def test_laco_longo(modo, tmp_path, saidas):
+    # Soma de 1 a 1000 em um laço: nos blocos traduzidos o laço roda de bloco em bloco
+    arquivo = escrever_programa(tmp_path, (
+        ".text\n"
+        "    addi $t1, $zero, 1000\n"
+        "laco:\n"
+        "    addi $t0, $t0, 1\n"
+        "    add $t2, $t2, $t0\n"
+        "    bne $t0, $t1, laco\n"
+        "    add $a0, $t2, $zero\n"
+        "    addi $v0, $zero, 1\n"
+        "    syscall\n"
+    ))
+    resultado = rodar(arquivo, modo, saidas)
+    assert resultado["saidas"][0] == str(1000 * 1001 // 2)
+    assert resultado["executadas"] == 1 + 3 * 1000 + 3
+
+
+@pytest.mark.parametrize("modo", back_end.MOTORES)
+def test_limite_de_instrucoes_continua_igual(modo, saidas):
+    # Rodar em fatias (como a interface faz) chega ao mesmo estado que rodar de uma vez
+    back_end.configurar_memoria("compacto", 4096)
+    inteiro = rodar(ARQUIVOS_ASSEMBLY[3], modo, saidas)
+    saidas.clear()
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(ARQUIVOS_ASSEMBLY[3])
+    executadas = 0
+    while back_end.PC < len(matriz_programa):
+        executadas += back_end.executar(matriz_programa, programa_decodificado, data_table, modo, limite_instrucoes=3)
+    assert executadas == inteiro["executadas"]
+    assert list(back_end.vetor_reg) == inteiro["registradores"]
+    assert list(saidas) == inteiro["saidas"]
+
+
+@pytest.mark.parametrize("enderecamento", ["palavra", "byte"])
+@pytest.mark.parametrize("modo", back_end.MOTORES_ANOTAM_ESCRITAS)
+@pytest.mark.parametrize("arquivo", ARQUIVOS_ASSEMBLY, ids=os.path.basename)
+def test_escritas_anotadas(arquivo, modo, enderecamento, saidas):
+    # Anotar não muda a execução, e tudo o que mudou nos registradores e na memória foi anotado
+    back_end.configurar_memoria("compacto", 4096, enderecamento)
+    esperado = rodar(arquivo, modo, saidas)
+    back_end.regs_escritos, back_end.enderecos_escritos = set(), set()
+    saidas.clear()
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    registradores, memoria = list(back_end.vetor_reg), list(back_end.memoria)
+    back_end.executar(matriz_programa, programa_decodificado, data_table, modo)
+    assert list(back_end.vetor_reg) == esperado["registradores"] and list(saidas) == esperado["saidas"]
+
+    mudaram = {i for i, valor in enumerate(back_end.vetor_reg) if valor != registradores[i]}
+    assert mudaram <= back_end.regs_escritos
+    # No modo byte cada endereço anotado cobre a palavra inteira
+    largura = 4 if enderecamento == "byte" else 1
+    cobertos = {endereco + i for endereco in back_end.enderecos_escritos for i in range(largura)}
+    assert {i for i, valor in enumerate(back_end.memoria) if valor != memoria[i]} <= cobertos
+    # Só o teste-2 escreve na memória
+    assert bool(back_end.enderecos_escritos) == (arquivo == ARQUIVOS_ASSEMBLY[1])
@@ -0,0 +1,108 @@
+"""Perfil de execução: contagens por PC, por instrução, por endereço e por syscall, e a exportação JSON/CSV"""
+
+import csv
+import json
+import os
+
+import pytest
+
+import back_end
+import perfil
+from conftest import escrever_programa
+
+# Soma 10 + 9 + ... + 1 acumulando na memória: o laço (PCs 2 a 6) roda 10 vezes, o resto uma vez
+SOMA_NA_MEMORIA = (
+    ".data\n"
+    "v: .word 0\n"
+    ".text\n"
+    "    addi $t1, $zero, 10\n"
+    "    la $t0, v\n"
+    "laco:\n"
+    "    lw $t2, 0($t0)\n"
+    "    add $t2, $t2, $t1\n"
+    "    sw $t2, 0($t0)\n"
+    "    addi $t1, $t1, -1\n"
+    "    bne $t1, $zero, laco\n"
+    "    lw $a0, 0($t0)\n"
+    "    addi $v0, $zero, 1\n"
+    "    syscall\n"
+)
+EXECUCOES_POR_PC = [1, 1, 10, 10, 10, 10, 10, 1, 1, 1]
+POR_INSTRUCAO = {"addi": 12, "lw": 11, "add": 10, "sw": 10, "bne": 10, "la": 1, "syscall": 1}
+
+
+def rodar_com_perfil(arquivo, modo="tabela", fatia=None):
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    back_end.perfil_execucao = contadores = back_end.novo_perfil(programa_decodificado)
+    while back_end.PC < len(matriz_programa):
+        back_end.executar(matriz_programa, programa_decodificado, data_table, modo, limite_instrucoes=fatia)
+    back_end.perfil_execucao = None
+    return contadores, matriz_programa, data_table, programa_decodificado
+
+
+@pytest.mark.parametrize("layout, enderecamento", [("compacto", "palavra"), ("compacto", "byte"), ("mars", "byte")])
+def test_contagens(layout, enderecamento, tmp_path, saidas):
+    back_end.configurar_memoria(layout, 4096, enderecamento)
+    arquivo = escrever_programa(tmp_path, SOMA_NA_MEMORIA)
+    contadores, matriz_programa, data_table, programa_decodificado = rodar_com_perfil(arquivo)
+    assert saidas[0] == "55"
+    assert list(contadores.execucoes) == EXECUCOES_POR_PC
+    assert contadores.total() == sum(EXECUCOES_POR_PC)
+    assert contadores.por_instrucao(programa_decodificado, back_end.NOMES_INSTRUCOES) == POR_INSTRUCAO
+    assert dict(contadores.syscalls) == {1: 1}
+    # Todas as leituras e escritas são no 'v' (na memória paginada as contagens ficam em um Counter)
+    v = data_table["v"]
+    assert list(perfil._nao_zero(contadores.leituras)) == [(v, 11)]
+    assert list(perfil._nao_zero(contadores.escritas)) == [(v, 10)]
+    # Os 5 PCs do laço são os pontos quentes, na ordem do programa quando empatam
+    assert contadores.pontos_quentes(5) == [(pc, 10) for pc in range(2, 7)]
+    assert len(contadores.pontos_quentes()) == len(EXECUCOES_POR_PC)
+
+
+@pytest.mark.parametrize("modo", back_end.MOTORES)
+def test_motores_e_fatias_contam_igual(modo, tmp_path, saidas):
+    # O laço do perfil é o mesmo em todos os motores, e as contagens continuam de um executar() para o outro
+    arquivo = escrever_programa(tmp_path, SOMA_NA_MEMORIA)
+    inteiro, matriz_programa, _, programa_decodificado = rodar_com_perfil(arquivo)
+    em_fatias = rodar_com_perfil(arquivo, modo, fatia=4)[0]
+    nomes = back_end.NOMES_INSTRUCOES
+    assert em_fatias.relatorio(matriz_programa, programa_decodificado, nomes) == \
+        inteiro.relatorio(matriz_programa, programa_decodificado, nomes)
+
+
+def test_perfil_de_outro_programa_e_recusado(tmp_path, saidas):
+    arquivo = escrever_programa(tmp_path, SOMA_NA_MEMORIA)
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    back_end.perfil_execucao = perfil.Perfil(3, len(back_end.memoria))
+    with pytest.raises(ValueError):
+        back_end.executar(matriz_programa, programa_decodificado, data_table)
+
+
+def test_exportar_json(tmp_path, saidas):
+    arquivo = escrever_programa(tmp_path, SOMA_NA_MEMORIA)
+    assert back_end.simular_arquivo(arquivo, "blocos", exportar_perfil="json") == sum(EXECUCOES_POR_PC)
+    assert back_end.perfil_execucao is None
+    with open(os.path.splitext(arquivo)[0] + perfil.EXTENSOES["json"], encoding="utf-8") as f:
+        relatorio = json.load(f)
+    assert relatorio["instrucoes"] == sum(EXECUCOES_POR_PC)
+    assert [(linha["pc"], linha["execucoes"]) for linha in relatorio["por_pc"]] == list(enumerate(EXECUCOES_POR_PC))
+    assert relatorio["por_pc"][2]["instrucao"] == "lw $t2 0 $t0"
+    assert relatorio["por_instrucao"] == POR_INSTRUCAO
+    assert relatorio["syscalls"] == {"1": 1}
+    assert relatorio["leituras"] == {"0": 11} and relatorio["escritas"] == {"0": 10}
+
+
+def test_exportar_csv(tmp_path, saidas):
+    arquivo = escrever_programa(tmp_path, SOMA_NA_MEMORIA)
+    back_end.simular_arquivo(arquivo, "tabela", exportar_perfil="csv")
+    with open(os.path.splitext(arquivo)[0] + perfil.EXTENSOES["csv"], encoding="utf-8", newline="") as f:
+        linhas = list(csv.DictReader(f))
+    por_secao = {}
+    for linha in linhas:
+        por_secao.setdefault(linha["secao"], {})[linha["chave"]] = int(linha["contagem"])
+    assert por_secao["pc"] == {str(pc): n for pc, n in enumerate(EXECUCOES_POR_PC)}
+    assert por_secao["instrucao"] == POR_INSTRUCAO
+    assert por_secao["syscall"] == {"1": 1}
+    assert por_secao["leitura"] == {"0": 11} and por_secao["escrita"] == {"0": 10}
@@ -0,0 +1,105 @@
+"""Modelo de pipeline: ciclos, paradas e descartes de programas pequenos, contados à mão"""
+
+import pytest
+
+import back_end
+import pipeline
+from conftest import ARQUIVOS_ASSEMBLY, escrever_programa
+
+# Duas cargas usadas logo em seguida (carga-uso) e o $LO lido logo depois do mult
+DEPENDENCIAS = (
+    ".data\n"
+    "v: .word 5, 6\n"
+    ".text\n"
+    "    la $t0, v\n"
+    "    lw $t1, 0($t0)\n"
+    "    add $t2, $t1, $t1\n"
+    "    lw $t3, 1($t0)\n"
+    "    addi $t3, $t3, 1\n"
+    "    sub $t2, $t2, $t3\n"
+    "    mult $t2, $t3\n"
+    "    add $a0, $LO, $zero\n"
+)
+
+# bne tomado duas vezes e um j: só descartes com adiantamento
+DESVIOS = (
+    ".text\n"
+    "    addi $t1, $zero, 3\n"
+    "laco:\n"
+    "    addi $t0, $t0, 1\n"
+    "    bne $t0, $t1, laco\n"
+    "    j fim\n"
+    "    addi $t2, $zero, 9\n"
+    "fim:\n"
+)
+
+
+def rodar(arquivo, adiantamento, fatia=None):
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    back_end.modelo_pipeline = modelo = back_end.novo_pipeline(adiantamento)
+    while back_end.PC < len(matriz_programa):
+        back_end.executar(matriz_programa, programa_decodificado, data_table, limite_instrucoes=fatia)
+    back_end.modelo_pipeline = None
+    return modelo
+
+
+# (programa, adiantamento) -> (instruções, ciclos, paradas, paradas de carga-uso, descartes)
+# Com adiantamento só a carga usada logo depois para (1 ciclo); sem adiantamento toda dependência próxima para
+# até 2 ciclos. bne tomado descarta 2 ciclos e j descarta 1. Ciclos = ID da última instrução + 4 (enchimento)
+ESPERADO = {
+    (DEPENDENCIAS, True): (8, 10 + 4, 2, 2, 0),
+    (DEPENDENCIAS, False): (8, 20 + 4, 12, 4, 0),
+    (DESVIOS, True): (8, 13 + 4, 0, 0, 5),
+    (DESVIOS, False): (8, 19 + 4, 6, 0, 5),
+}
+
+
+@pytest.mark.parametrize("programa, adiantamento", list(ESPERADO), ids=["dependencias-adiantamento", "dependencias-sem",
+                                                                         "desvios-adiantamento", "desvios-sem"])
+def test_contagens(programa, adiantamento, tmp_path, saidas):
+    modelo = rodar(escrever_programa(tmp_path, programa), adiantamento)
+    instrucoes, ciclos, paradas, paradas_carga, descartes = ESPERADO[programa, adiantamento]
+    assert (modelo.instrucoes, modelo.ciclos(), modelo.paradas, modelo.paradas_carga, modelo.descartes) == ESPERADO[programa, adiantamento]
+    assert modelo.cpi() == pytest.approx(ciclos / instrucoes)
+    assert modelo.bolhas() == paradas + descartes
+
+
+def test_paradas_por_pc(tmp_path, saidas):
+    modelo = rodar(escrever_programa(tmp_path, DEPENDENCIAS), True)
+    # As duas instruções que usam uma carga logo depois dela
+    assert modelo.paradas_por_pc == {2: 1, 4: 1}
+    assert modelo.relatorio()["paradas_por_pc"] == {"2": 1, "4": 1}
+
+
+@pytest.mark.parametrize("adiantamento", [True, False])
+def test_fatias_contam_igual(adiantamento, saidas):
+    # O modelo continua de um executar() para o outro: rodar em fatias dá as mesmas contagens
+    inteiro = rodar(ARQUIVOS_ASSEMBLY[3], adiantamento)
+    em_fatias = rodar(ARQUIVOS_ASSEMBLY[3], adiantamento, fatia=3)
+    assert em_fatias.relatorio() == inteiro.relatorio()
+    assert inteiro.instrucoes == 49
+
+
+def test_sem_adiantamento_nunca_e_mais_rapido(saidas):
+    for arquivo in ARQUIVOS_ASSEMBLY:
+        com, sem = rodar(arquivo, True), rodar(arquivo, False)
+        assert com.instrucoes == sem.instrucoes
+        assert com.ciclos() <= sem.ciclos() and com.paradas <= sem.paradas
+
+
+def test_latencias():
+    assert pipeline.latencias(True) == (1, 2)
+    assert pipeline.latencias(False) == (3, 3)
+    assert pipeline.ModeloPipeline().ciclos() == 0 and pipeline.ModeloPipeline().cpi() == 0.0
+
+
+def test_resumo_no_modo_silencioso(monkeypatch, capsys):
+    # Sem a lista do teste: a linha de comando escreve no stdout / stderr
+    monkeypatch.setattr(back_end, "destino_saida", None)
+    monkeypatch.setattr(back_end, "silencioso", False)
+    assert back_end.main([ARQUIVOS_ASSEMBLY[3], "-q", "--pipeline", "adiantamento"]) == 0
+    saida = capsys.readouterr()
+    assert saida.out.startswith("Soma do vetor: \n35\n")
+    assert "CPI" in saida.err
+    assert "CPI" not in saida.out
@@ -0,0 +1,100 @@
+"""Rastreio .mtr: os passos lidos de volta são os que o motor executou, mesmo com o PC refeito pelo leitor"""
+
+import os
+
+import pytest
+
+import back_end
+import rastreio
+from conftest import ARQUIVOS_ASSEMBLY, escrever_programa
+
+# mult, sw, lw, jal/jr e um laço: todos os tipos de passo do rastreio
+PROGRAMA = (
+    ".data\n"
+    "v: .word 0, 0\n"
+    ".text\n"
+    "    addi $t1, $zero, 20\n"
+    "    la $t3, v\n"
+    "laco:\n"
+    "    addi $t0, $t0, 1\n"
+    "    mult $t0, $t1\n"
+    "    sw $t0, 4($t3)\n"
+    "    lw $a0, 4($t3)\n"
+    "    jal dobra\n"
+    "    bne $t0, $t1, laco\n"
+    "    addi $v0, $zero, 10\n"
+    "    syscall\n"
+    "dobra:\n"
+    "    add $a0, $a0, $a0\n"
+    "    jr $ra\n"
+)
+
+
+def passo_a_passo(arquivo):
+    """PC e registradores antes de cada instrução, executando uma de cada vez."""
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    passos = []
+    while back_end.PC < len(matriz_programa):
+        passos.append(back_end.PC)
+        back_end.executar(matriz_programa, programa_decodificado, data_table, "tabela", limite_instrucoes=1)
+    return passos, list(back_end.vetor_reg)
+
+
+def gravar(arquivo, caminho, fatia=None):
+    """Roda o arquivo com o rastreio ligado (em fatias de 'fatia' instruções, se pedido)."""
+    back_end.resetar_estado()
+    matriz_programa, data_table, programa_decodificado = back_end.carregar_programa(arquivo)
+    with back_end.novo_rastreio(caminho, programa_decodificado) as gravador:
+        back_end.gravador_rastreio = gravador
+        while back_end.PC < len(matriz_programa):
+            back_end.executar(matriz_programa, programa_decodificado, data_table, "tabela", limite_instrucoes=fatia)
+        back_end.gravador_rastreio = None
+    return list(rastreio.ler(caminho))
+
+
+@pytest.mark.parametrize("enderecamento", ["palavra", "byte"])
+@pytest.mark.parametrize("arquivo", ARQUIVOS_ASSEMBLY + [None], ids=lambda a: os.path.basename(a) if a else "laco")
+def test_rastreio_refaz_os_passos(arquivo, enderecamento, tmp_path, saidas):
+    back_end.configurar_memoria("compacto", 4096, enderecamento)
+    arquivo = arquivo or escrever_programa(tmp_path, PROGRAMA)
+    pcs, registradores = passo_a_passo(arquivo)
+    caminho = str(tmp_path / ("programa" + rastreio.EXTENSAO))
+    passos = gravar(arquivo, caminho)
+    assert [passo[0] for passo in passos] == pcs
+    # Em fatias (vários lotes, cada um com o seu PC inicial) o rastreio é o mesmo
+    assert gravar(arquivo, caminho, fatia=7) == passos
+    # O último valor gravado de cada registrador é o valor final dele
+    finais = {registrador: valor for _, registrador, valor, _, _ in passos if registrador >= 0}
+    assert all(registradores[registrador] == valor for registrador, valor in finais.items())
+
+
+def test_passos_gravados(tmp_path, saidas):
+    arquivo = escrever_programa(tmp_path, PROGRAMA)
+    caminho = str(tmp_path / ("programa" + rastreio.EXTENSAO))
+    passos = gravar(arquivo, caminho)
+    t0, a0, ra = (back_end.reg_dic[nome] for nome in ("$t0", "$a0", "$ra"))
+    assert passos[:10] == [
+        (0, back_end.reg_dic["$t1"], 20, rastreio.SEM_ENDERECO, 0),
+        (1, back_end.reg_dic["$t3"], 0, rastreio.SEM_ENDERECO, 0),
+        (2, t0, 1, rastreio.SEM_ENDERECO, 0),
+        (3, rastreio.REGISTRADOR_HI_LO, 20, rastreio.SEM_ENDERECO, 0),
+        (4, rastreio.SEM_REGISTRADOR, 0, 4, 1),
+        (5, a0, 1, rastreio.SEM_ENDERECO, 0),
+        (6, ra, 7, rastreio.SEM_ENDERECO, 0),
+        (10, a0, 2, rastreio.SEM_ENDERECO, 0),
+        (11, rastreio.SEM_REGISTRADOR, 0, rastreio.SEM_ENDERECO, 0),
+        (7, rastreio.SEM_REGISTRADOR, 0, rastreio.SEM_ENDERECO, 0),
+    ]
+    # Um addi grava só o valor, um bne só o destino: bem menos que os 32 bytes por passo do formato antigo
+    assert os.path.getsize(caminho) < 12 * len(passos)
+
+
+def test_rastreio_truncado(tmp_path, saidas):
+    arquivo = escrever_programa(tmp_path, PROGRAMA)
+    caminho = str(tmp_path / ("programa" + rastreio.EXTENSAO))
+    gravar(arquivo, caminho)
+    with open(caminho, "r+b") as f:
+        f.truncate(os.path.getsize(caminho) - 3)
+    with pytest.raises(rastreio.ErroRastreio):
+        list(rastreio.ler(caminho))
@@ -0,0 +1,47 @@
+# teste_desvios.s
+# Soma um vetor com um laço (bne), chama uma função com jal / jr $ra
+# e usa beq para pular um trecho. Os rótulos da .text viram o PC do alvo na montagem.
+
+.data
+vetor:     .word 3, 5, 7, 9, 11
+tamanho:   .word 5
+msg_soma:  .asciiz "Soma do vetor: "
+msg_dobro: .asciiz "Dobro da soma: "
+
+.text
+    la $t0, vetor          # $t0 = endereço do elemento atual
+    la $t1, tamanho
+    lw $t1, 0($t1)         # $t1 = quantos elementos faltam
+    add $t2, $zero, $zero  # $t2 = soma
+
+laco:
+    lw $t3, 0($t0)
+    add $t2, $t2, $t3
+    addi $t0, $t0, 1
+    addi $t1, $t1, -1
+    bne $t1, $zero, laco
+
+    la $a0, msg_soma
+    addi $v0, $zero, 4
+    syscall
+    add $a0, $t2, $zero
+    jal imprime_inteiro
+
+    # Dobra a soma (se ela não for zero)
+    beq $t2, $zero, fim
+    add $t2, $t2, $t2
+    la $a0, msg_dobro
+    addi $v0, $zero, 4
+    syscall
+    add $a0, $t2, $zero
+    jal imprime_inteiro
+
+fim:
+    addi $v0, $zero, 10
+    syscall
+
+# Função: imprime o inteiro em $a0 e volta para quem chamou
+imprime_inteiro:
+    addi $v0, $zero, 1
+    syscall
+    jr $ra